@@ -0,0 +1,14 @@
+"""
+Settings for ai_tool_hub, split by environment:
+
+- base.py: everything shared, with development defaults;
+- prod.py: production overrides, read from the environment.
+
+DJANGO_ENV=production selects prod.py; anything else runs base.py as is.
+"""
+import os
+
+if os.environ.get('DJANGO_ENV') == 'production':
+    from .prod import *  # noqa: F401,F403
+else:
+    from .base import *  # noqa: F401,F403
@@ -0,0 +1,248 @@
+"""
+Django settings for ai_tool_hub project.
+
+Generated by 'django-admin startproject' using Django 5.2.4.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/5.2/topics/settings/
+
+For the full list of settings and their values, see
+https://docs.djangoproject.com/en/5.2/ref/settings/
+"""
+
+from pathlib import Path
+
+from .database import sqlite_databases
+
+# Build paths inside the project like this: BASE_DIR / 'subdir'.
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+# Quick-start development settings - unsuitable for production
+# See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = 'django-insecure-ped2wg3kyq4=a3z8zvs_7-gd&_2zvb453)v2-+ycfu%+6w$u0j'
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = True
+
+ALLOWED_HOSTS = ['*']
+
+
+# Application definition
+
+INSTALLED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'app',
+    'rest_framework',
+]
+
+MIDDLEWARE = [
+    'app.metrics.MetricsMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+ROOT_URLCONF = 'ai_tool_hub.urls'
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [BASE_DIR / 'templates'],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'ai_tool_hub.wsgi.application'
+
+
+# Database
+# https://docs.djangoproject.com/en/5.2/ref/settings/#databases
+# WAL, busy timeout and persistent connections; see settings/database.py.
+
+DATABASES = sqlite_databases(BASE_DIR / 'db.sqlite3')
+DATABASE_ROUTERS = ['app.db_router.ReadWriteRouter']
+
+
+# Password validation
+# https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/5.2/topics/i18n/
+
+LANGUAGE_CODE = 'en-us'
+
+TIME_ZONE = 'Asia/Karachi'
+
+USE_I18N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/5.2/howto/static-files/
+
+STATIC_URL = 'static/'
+STATICFILES_DIRS = [BASE_DIR / 'static']
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+MEDIA_URL = 'media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# Django REST framework
+# Every list endpoint is keyset-paginated; see app/pagination.py. JSON is
+# rendered and parsed with orjson (app/renderers.py, app/parsers.py).
+
+REST_FRAMEWORK = {
+    'DEFAULT_PAGINATION_CLASS': 'app.pagination.KeysetPagination',
+    'PAGE_SIZE': 20,
+    'DEFAULT_RENDERER_CLASSES': [
+        'app.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'app.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
+
+# Cached per-object API representations (app/representations.py): an
+# in-process LRU of LOCAL_MAX_BYTES in front of the CACHE alias.
+
+REPRESENTATION_CACHE = {
+    'CACHE': 'default',
+    'LOCAL_MAX_BYTES': 32 * 1024 * 1024,
+}
+
+# Buffered view counters (app/counters.py): flush every FLUSH_INTERVAL
+# seconds or once FLUSH_THRESHOLD views are pending, whichever comes first.
+
+VIEW_COUNTER = {
+    'FLUSH_INTERVAL': 5,
+    'FLUSH_THRESHOLD': 1000,
+}
+
+# Resized WebP/JPEG variants of uploaded images (app/images.py), generated
+# by a background job after each upload.
+
+IMAGE_DERIVATIVES = {
+    'WIDTHS': (64, 160, 320, 640, 1280),
+    'FORMATS': ('webp', 'jpeg'),
+}
+
+# Background jobs (app/queue.py), run by `manage.py run_workers`. With
+# EAGER they run inline as soon as they are queued.
+
+TASKS = {
+    'EAGER': False,
+    'POLL_INTERVAL': 1.0,
+}
+
+# Newsletter sending (app/newsletter.py). RATE is messages per second per
+# worker process.
+
+NEWSLETTER = {
+    'BATCH_SIZE': 1000,
+    'RATE': 10,
+    'SITE_URL': 'http://localhost:8000',
+}
+
+# Precomputed related tools (app/similarity.py); the model files under
+# PATH are shared by the web and worker processes.
+
+SIMILARITY = {
+    'PATH': BASE_DIR / 'cache' / 'similarity',
+    'K': 10,
+}
+
+# Typeahead prefix index (app/autocomplete.py); memory-mapped from PATH by
+# every web process.
+
+AUTOCOMPLETE = {
+    'PATH': BASE_DIR / 'cache' / 'autocomplete',
+    'LIMIT': 8,
+}
+
+# Facet counts for /api/ai-tools/browse/ (app/facets.py): each process
+# rebuilds its index at most every REBUILD_INTERVAL seconds after a change.
+
+FACETS = {
+    'REBUILD_INTERVAL': 10,
+}
+
+# Comparison matrices (app/comparisons.py); cached entries are keyed by
+# each tool's version, so TIMEOUT only bounds memory.
+
+COMPARISON_MATRIX = {
+    'MAX_TOOLS': 10,
+    'TIMEOUT': 24 * 60 * 60,
+}
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Precomputed homepage (app/homepage.py): a stale snapshot is served for up
+# to STALE_WHILE_REVALIDATE seconds while a single rebuild runs.
+
+HOMEPAGE_SNAPSHOT = {
+    'STALE_WHILE_REVALIDATE': 30,
+    'ASYNC_REBUILD': True,
+}
+
+# Request metrics (app/metrics.py), scraped from /metrics by INTERNAL_IPS.
+# Requests slower than SLOW_REQUEST_MS are logged with their slowest SQL,
+# sampled at SLOW_SAMPLE_RATE.
+
+METRICS = {
+    'ENABLED': True,
+    'SLOW_REQUEST_MS': 500,
+    'SLOW_SAMPLE_RATE': 0.1,
+}
+
+INTERNAL_IPS = ['127.0.0.1']
+
+# Default primary key field type
+# https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
+
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -0,0 +1,60 @@
+"""
+SQLite configuration tuned for concurrent readers and writers.
+
+- WAL: readers never block the writer and the writer never blocks readers.
+  The mode is stored in the file, so migration 0010_sqlite_wal sets it
+  once instead of every connection rewriting the file header.
+- synchronous=NORMAL: with WAL, commits only fsync at checkpoints; a power
+  loss can drop the last transactions but cannot corrupt the file.
+- mmap_size: reads come straight from the page cache instead of read().
+- timeout: the busy timeout, i.e. how long to wait for the write lock
+  before "database is locked".
+- transaction_mode=IMMEDIATE: transactions take the write lock when they
+  begin. A deferred transaction that reads and then writes cannot wait
+  for the lock (SQLite fails it at once to avoid a deadlock), so writers
+  now queue up behind each other on the busy timeout instead.
+- CONN_MAX_AGE with health checks: keep connections (and their page
+  cache and mmap) across requests, dropping ones that went bad.
+
+``replica`` opens the same file read-only; app/db_router.py sends reads
+there and every write (and every read inside a transaction) to
+``default``.
+"""
+from pathlib import Path
+
+PRAGMAS = (
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA mmap_size=268435456',
+    'PRAGMA temp_store=MEMORY',
+)
+
+BUSY_TIMEOUT = 20  # seconds
+CONN_MAX_AGE = 600
+
+
+def sqlite_databases(path):
+    """Return DATABASES for a SQLite file at ``path``: a writer and a read-only replica."""
+    return {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': path,
+            'CONN_MAX_AGE': CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'init_command': ';'.join(PRAGMAS),
+                'transaction_mode': 'IMMEDIATE',
+                'timeout': BUSY_TIMEOUT,
+            },
+        },
+        'replica': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': f'{Path(path).resolve().as_uri()}?mode=ro',
+            'CONN_MAX_AGE': CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'init_command': ';'.join(PRAGMAS),
+                'timeout': BUSY_TIMEOUT,
+            },
+            'TEST': {'MIRROR': 'default'},
+        },
+    }
@@ -0,0 +1,77 @@
+"""
+Production settings: DEBUG off, secrets and hosts from the environment,
+hashed static files served by WhiteNoise and a cache shared by all worker
+processes.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .base import *  # noqa: F401,F403
+from .base import BASE_DIR, MIDDLEWARE
+from .database import sqlite_databases
+
+
+def env_list(name, default=''):
+    return [value.strip() for value in os.environ.get(name, default).split(',') if value.strip()]
+
+
+DEBUG = False
+
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY')
+if not SECRET_KEY:
+    raise ImproperlyConfigured('Set DJANGO_SECRET_KEY to run with DJANGO_ENV=production.')
+
+ALLOWED_HOSTS = env_list('DJANGO_ALLOWED_HOSTS', 'localhost,127.0.0.1')
+CSRF_TRUSTED_ORIGINS = env_list('DJANGO_CSRF_TRUSTED_ORIGINS')
+INTERNAL_IPS = env_list('DJANGO_INTERNAL_IPS', '127.0.0.1')
+
+DATABASES = sqlite_databases(os.environ.get('DJANGO_DB_PATH', BASE_DIR / 'db.sqlite3'))
+
+# Behind a TLS-terminating proxy.
+SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
+SESSION_COOKIE_SECURE = CSRF_COOKIE_SECURE = os.environ.get('DJANGO_SECURE_COOKIES', '1') == '1'
+
+# Static files
+# collectstatic writes content-hashed copies (plus .gz/.br) to STATIC_ROOT;
+# WhiteNoise serves them from the app server with far-future cache headers,
+# since a changed file gets a new name.
+
+# WhiteNoise goes right after SecurityMiddleware. The subclass also runs
+# in an async chain, so ASGI requests stay async; see app/middleware.py.
+_after = MIDDLEWARE.index('django.middleware.security.SecurityMiddleware') + 1
+MIDDLEWARE = [*MIDDLEWARE[:_after], 'app.middleware.AsyncWhiteNoiseMiddleware', *MIDDLEWARE[_after:]]
+
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage'},
+}
+WHITENOISE_MAX_AGE = 365 * 24 * 60 * 60
+
+# Cache
+# Homepage snapshots, dirty marks and the view-counter flush signal must be
+# visible to every worker process, so the per-process locmem cache is out.
+# REDIS_URL selects Redis; otherwise a file cache on the local disk is
+# shared by the workers of one host.
+
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('DJANGO_CACHE_DIR', str(BASE_DIR / 'cache')),
+        }
+    }
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {'console': {'class': 'logging.StreamHandler'}},
+    'root': {'handlers': ['console'], 'level': os.environ.get('DJANGO_LOG_LEVEL', 'INFO')},
+}
@@ -1,5 +1,7 @@
 from django.contrib import admin
+from django.utils import timezone
 from django.utils.html import format_html
+from . import images, ratings, tasks
 from .models import (
     Category, 
     PricingPlan, 
@@ -11,18 +13,31 @@ from .models import (
     Comparison,
     Article,
     NewsletterSubscriber,
+    NewsletterCampaign,
     ContactSubmission,
     ToolSubmission,
-    SiteStat
+    SiteStat,
+    Job
 )
 
+# Review actions touching more tools than this recount them in the
+# background (see app/tasks.py) instead of before the page reloads.
+INLINE_RATING_RECOMPUTE_LIMIT = 100
+
+def thumbnail_url(file, digest, width):
+    # A resized variant (app/images.py), or the original for files uploaded
+    # before variants existed.
+    return images.variant_url(digest, width) if digest else file.url
+
 class ToolImageInline(admin.TabularInline):
     model = ToolImage
     extra = 1
     readonly_fields = ['preview_image']
     
     def preview_image(self, obj):
-        return format_html('<img src="{}" height="100" />', obj.image.url) if obj.image else '-'
+        if not obj.image:
+            return '-'
+        return format_html('<img src="{}" height="100" />', thumbnail_url(obj.image, obj.image_digest, 320))
     preview_image.short_description = 'Preview'
 
 class ToolVideoInline(admin.TabularInline):
@@ -43,6 +58,12 @@ class CategoryAdmin(admin.ModelAdmin):
     search_fields = ('name', 'description')
     prepopulated_fields = {'slug': ('name',)}
     list_per_page = 20
+    actions = ['recount_tools']
+
+    def recount_tools(self, request, queryset):
+        tasks.refresh_category_counts.enqueue(category_ids=list(queryset.values_list('pk', flat=True)))
+        self.message_user(request, 'Tool counts will be refreshed in the background.')
+    recount_tools.short_description = "Recount tools in selected categories"
 
 @admin.register(PricingPlan)
 class PricingPlanAdmin(admin.ModelAdmin):
@@ -54,13 +75,14 @@ class PricingPlanAdmin(admin.ModelAdmin):
 @admin.register(AITool)
 class AIToolAdmin(admin.ModelAdmin):
     list_display = ('name', 'display_logo', 'short_description', 'website_link', 
-                   'pricing_type', 'is_verified', 'featured', 'views', 'created_at')
+                   'pricing_type', 'is_verified', 'featured', 'views', 'rating_average',
+                   'rating_count', 'created_at')
     list_filter = ('pricing_type', 'is_verified', 'featured', 'categories', 'created_at')
     search_fields = ('name', 'short_description', 'long_description')
     prepopulated_fields = {'slug': ('name',)}
     inlines = [ToolImageInline, ToolVideoInline, FeatureInline, PricingPlanInline]
     filter_horizontal = ('categories',)
-    readonly_fields = ('views', 'created_at', 'updated_at')
+    readonly_fields = ('views', 'rating_average', 'rating_count', 'created_at', 'updated_at')
     list_per_page = 20
     fieldsets = (
         ('Basic Information', {
@@ -73,7 +95,7 @@ class AIToolAdmin(admin.ModelAdmin):
             'fields': ('categories', 'pricing_type', 'pricing_plans', 'launch_date')
         }),
         ('Status', {
-            'fields': ('featured', 'is_verified', 'views')
+            'fields': ('featured', 'is_verified', 'views', 'rating_average', 'rating_count')
         }),
         ('Dates', {
             'fields': ('created_at', 'updated_at')
@@ -86,7 +108,7 @@ class AIToolAdmin(admin.ModelAdmin):
 
     def display_logo(self, obj):
         if obj.logo:
-            return format_html('<img src="{}" height="30" />', obj.logo.url)
+            return format_html('<img src="{}" height="30" />', thumbnail_url(obj.logo, obj.logo_digest, 64))
         elif obj.logo_url:
             return format_html('<img src="{}" height="30" />', obj.logo_url)
         return '-'
@@ -102,13 +124,23 @@ class ReviewAdmin(admin.ModelAdmin):
     actions = ['approve_reviews', 'disapprove_reviews']
 
     def approve_reviews(self, request, queryset):
-        queryset.update(is_approved=True)
+        self.set_approved(queryset, True)
     approve_reviews.short_description = "Approve selected reviews"
 
     def disapprove_reviews(self, request, queryset):
-        queryset.update(is_approved=False)
+        self.set_approved(queryset, False)
     disapprove_reviews.short_description = "Disapprove selected reviews"
 
+    def set_approved(self, queryset, is_approved):
+        tool_ids = sorted(set(queryset.values_list('tool_id', flat=True)))
+        queryset.update(is_approved=is_approved)
+        # update() skips the review signals, so refresh the tools' aggregates
+        # now, or in the background for large selections.
+        if len(tool_ids) > INLINE_RATING_RECOMPUTE_LIMIT:
+            tasks.recompute_ratings.enqueue(tool_ids=tool_ids)
+        else:
+            ratings.recompute(tool_ids)
+
 @admin.register(Comparison)
 class ComparisonAdmin(admin.ModelAdmin):
     list_display = ('title', 'author', 'is_published', 'created_at')
@@ -154,6 +186,26 @@ class NewsletterSubscriberAdmin(admin.ModelAdmin):
     readonly_fields = ('subscribed_at', 'unsubscribe_token')
     list_per_page = 20
 
+@admin.register(NewsletterCampaign)
+class NewsletterCampaignAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'status', 'recipients', 'sent_count', 'started_at', 'finished_at')
+    list_filter = ('status',)
+    search_fields = ('subject',)
+    readonly_fields = ('status', 'recipients', 'sent_count', 'created_at', 'started_at', 'finished_at')
+    list_per_page = 20
+    actions = ['send_campaigns']
+
+    def get_readonly_fields(self, request, obj=None):
+        # The content is rendered once per worker; it must not change mid-send.
+        if obj is not None and obj.status != NewsletterCampaign.DRAFT:
+            return self.readonly_fields + ('subject', 'body_text', 'body_html')
+        return self.readonly_fields
+
+    def send_campaigns(self, request, queryset):
+        for campaign in queryset.filter(status=NewsletterCampaign.DRAFT):
+            tasks.send_newsletter.enqueue(key=f'newsletter:{campaign.pk}', campaign_id=campaign.pk)
+    send_campaigns.short_description = "Send selected draft campaigns"
+
 @admin.register(ContactSubmission)
 class ContactSubmissionAdmin(admin.ModelAdmin):
     list_display = ('name', 'email', 'subject', 'submitted_at', 'is_processed')
@@ -194,4 +246,19 @@ class SiteStatAdmin(admin.ModelAdmin):
     list_filter = ('is_active',)
     search_fields = ('stat_name', 'stat_value')
     list_editable = ('stat_value', 'icon', 'is_active')
-    list_per_page = 20
\ No newline at end of file
+    list_per_page = 20
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'status', 'attempts', 'max_attempts', 'run_at', 'finished_at', 'locked_by')
+    list_filter = ('status', 'name')
+    search_fields = ('name', 'idempotency_key', 'last_error')
+    readonly_fields = [field.name for field in Job._meta.fields]
+    list_per_page = 50
+    actions = ['retry_jobs']
+
+    def retry_jobs(self, request, queryset):
+        queryset.exclude(status=Job.RUNNING).update(
+            status=Job.PENDING, attempts=0, run_at=timezone.now(), finished_at=None,
+        )
+    retry_jobs.short_description = "Retry selected jobs now"
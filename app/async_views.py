@@ -0,0 +1,80 @@
+# ai_tools/async_views.py
+"""
+Async variants of the hot read endpoints, served under /api/async/ when the
+site runs under ASGI (see gunicorn.conf.py). They reuse the viewsets'
+filtering, pagination and serializers; only the database access differs:
+it goes through the async ORM, so a request waiting on the database or on
+a slow client holds no worker thread.
+"""
+import functools
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ObjectDoesNotExist
+from django.http import JsonResponse
+from rest_framework.exceptions import APIException, NotFound
+from rest_framework.request import Request
+
+from . import homepage, search as search_index
+from .viewsets import AIToolViewSet, CategoryViewSet, SearchViewSet
+
+
+def api_errors(view_func):
+    """Turn DRF exceptions into JSON error responses shaped like DRF's own."""
+    @functools.wraps(view_func)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            return await view_func(request, *args, **kwargs)
+        except APIException as exc:
+            detail = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+            return JsonResponse(detail, status=exc.status_code, safe=False)
+    return wrapper
+
+
+def _viewset(viewset_class, request, action, **kwargs):
+    view = viewset_class(action=action, kwargs=kwargs, format_kwarg=None)
+    view.request = Request(request)
+    return view
+
+
+async def _paginated_list(view):
+    queryset = view.filter_queryset(view.get_queryset())
+    page = await view.paginator.apaginate_queryset(queryset, view.request, view=view)
+    data = view.get_serializer(page, many=True).data
+    return JsonResponse(view.paginator.get_paginated_response(data).data)
+
+
+@api_errors
+async def tool_list(request):
+    return await _paginated_list(_viewset(AIToolViewSet, request, 'list'))
+
+
+@api_errors
+async def tool_detail(request, pk):
+    view = _viewset(AIToolViewSet, request, 'retrieve', pk=pk)
+    try:
+        tool = await view.filter_queryset(view.get_queryset()).aget(pk=pk)
+    except ObjectDoesNotExist:
+        raise NotFound
+    return JsonResponse(view.get_serializer(tool).data)
+
+
+@api_errors
+async def category_list(request):
+    return await _paginated_list(_viewset(CategoryViewSet, request, 'list'))
+
+
+async def homepage_data(request):
+    # Snapshot sections; a rebuild runs the section queries together.
+    snapshot = await homepage.aget_snapshot()
+    return JsonResponse(snapshot['context'])
+
+
+@api_errors
+async def search(request):
+    view = _viewset(SearchViewSet, request, 'list')
+    query, kinds, page, page_size = view.search_params()
+    # Raw FTS5 SQL, which the async ORM cannot express.
+    results = await sync_to_async(search_index.search)(
+        query, kinds, limit=page_size + 1, offset=(page - 1) * page_size
+    )
+    return JsonResponse(view.paginated(results, page, page_size))
@@ -0,0 +1,354 @@
+# ai_tools/autocomplete.py
+"""
+Typeahead over verified tools' names and slugs and category names.
+
+``rebuild()`` writes, for tools and for categories, a set of numpy arrays
+that every process memory-maps, so each machine holds one copy of the
+index in its page cache rather than one per worker:
+
+- ``keys``: each normalized name and slug, and each of its suffixes that
+  starts at a word, as fixed-width UTF-8 byte strings in sorted order;
+- ``entries``: the tool or category each key belongs to;
+- ``scores``: the key's entry's rank (featured tools first, then by
+  views; categories by tool count);
+- ``best``: a sparse table whose row ``j`` holds, for each position ``i``,
+  the best-ranked key in ``keys[i:i + 2**j]``;
+- ``records`` and ``offsets``: each entry's JSON, concatenated.
+
+A prefix selects a range of keys with two binary searches. The top k
+entries in it come off a heap of sub-ranges, each split at its best key
+(two ``best`` lookups), so a query costs O(k log k) whatever the number of
+matches.
+
+Saves and deletes call ``mark_stale()``. The next request to find the
+snapshot older than the mark rebuilds it (in a background thread by
+default, under a cache lock so a burst of edits costs one rebuild) and
+keeps answering from the old one meanwhile; every process switches over
+when ``index.json`` is replaced. Each snapshot lives in its own versioned
+directory, and a rebuild only removes versions older than the one
+``index.json`` names, so overlapping rebuilds cannot delete each other's
+files. View counts are flushed without signals
+(app/counters.py), so also rebuild periodically with
+``manage.py rebuild_autocomplete`` to keep the ranking current.
+"""
+import contextlib
+import heapq
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+
+from .models import AITool, Category
+
+logger = logging.getLogger(__name__)
+
+DIRTY_KEY = 'autocomplete:dirty'
+REBUILD_LOCK_KEY = 'autocomplete:rebuild-lock'
+
+NON_WORD = re.compile(r'[\W_]+')
+KINDS = ('tools', 'categories')
+ARRAYS = ('keys', 'entries', 'scores', 'best', 'records', 'offsets')
+# Featured tools rank above any view count.
+FEATURED_RANK = 2 ** 40
+
+
+def _config():
+    return {
+        'PATH': os.path.join(settings.BASE_DIR, 'cache', 'autocomplete'),
+        # Keys (and queries) are cut to this many UTF-8 bytes.
+        'KEY_BYTES': 32,
+        'LIMIT': 8,
+        'MAX_LIMIT': 20,
+        'LOCK_TIMEOUT': 300,
+        'ASYNC_REBUILD': True,
+        **getattr(settings, 'AUTOCOMPLETE', {}),
+    }
+
+
+def normalize(text):
+    return NON_WORD.sub(' ', text.casefold()).strip()
+
+
+def _encode(text, size):
+    # Cut at a character boundary.
+    return text.encode()[:size].decode(errors='ignore').encode()
+
+
+def _suffixes(text):
+    words = normalize(text).split()
+    return {' '.join(words[start:]) for start in range(len(words))}
+
+
+def _successor(prefix):
+    # The smallest byte string after every string starting with ``prefix``;
+    # UTF-8 never uses 0xff, so the last byte can always be incremented.
+    return prefix[:-1] + bytes([prefix[-1] + 1])
+
+
+def _sparse_table(scores):
+    """Row ``j``: the position of the best score in each window of ``2**j`` (the first on ties)."""
+    count = len(scores)
+    rows = [np.arange(count, dtype=np.int32)]
+    width = 1
+    while width * 2 <= count:
+        previous = rows[-1]
+        left, right = previous[:count - 2 * width + 1], previous[width:count - width + 1]
+        rows.append(np.where(scores[right] > scores[left], right, left))
+        width *= 2
+    table = np.zeros((len(rows), count), dtype=np.int32)
+    for level, row in enumerate(rows):
+        table[level, :len(row)] = row
+    return table
+
+
+class PrefixIndex:
+    """The arrays for one kind of entry; see the module docstring."""
+
+    def __init__(self, keys, entries, scores, best, records, offsets):
+        self.keys = keys
+        self.entries = entries
+        self.scores = scores
+        self.best = best
+        self.records = records
+        self.offsets = offsets
+
+    @classmethod
+    def build(cls, items, key_bytes):
+        """``items``: ``(record, texts, rank)`` per entry, in tie-breaking order."""
+        pairs, blobs, ranks = [], [], []
+        for entry, (record, texts, rank) in enumerate(items):
+            blobs.append(json.dumps(record, separators=(',', ':')).encode())
+            ranks.append(rank)
+            keys = {_encode(key, key_bytes) for text in texts for key in _suffixes(text)}
+            pairs.extend((key, entry) for key in keys if key)
+        pairs.sort()
+        entries = np.array([entry for key, entry in pairs], dtype=np.int32)
+        scores = np.array(ranks, dtype=np.int64)[entries]
+        return cls(
+            keys=np.array([key for key, entry in pairs], dtype=f'S{key_bytes}'),
+            entries=entries,
+            scores=scores,
+            best=_sparse_table(scores),
+            records=np.frombuffer(b''.join(blobs), dtype=np.uint8),
+            offsets=np.cumsum([0] + [len(blob) for blob in blobs], dtype=np.int64),
+        )
+
+    def _best(self, start, stop):
+        level = (stop - start).bit_length() - 1
+        left, right = int(self.best[level, start]), int(self.best[level, stop - (1 << level)])
+        return right if self.scores[right] > self.scores[left] else left
+
+    def record(self, entry):
+        return json.loads(self.records[self.offsets[entry]:self.offsets[entry + 1]].tobytes())
+
+    def top(self, prefix, k):
+        """The ``k`` best-ranked entries with a key starting with ``prefix`` (bytes)."""
+        heap, seen, results = [], set(), []
+
+        def push(start, stop):
+            if start < stop:
+                position = self._best(start, stop)
+                heapq.heappush(heap, (-int(self.scores[position]), position, start, stop))
+
+        push(int(np.searchsorted(self.keys, prefix)), int(np.searchsorted(self.keys, _successor(prefix))))
+        while heap and len(results) < k:
+            _, position, start, stop = heapq.heappop(heap)
+            entry = int(self.entries[position])
+            if entry not in seen:
+                seen.add(entry)
+                results.append(self.record(entry))
+            push(start, position)
+            push(position + 1, stop)
+        return results
+
+
+def _items(kind):
+    if kind == 'tools':
+        rows = AITool.objects.filter(is_verified=True).order_by('name', 'pk').values_list(
+            'pk', 'name', 'slug', 'featured', 'views',
+        )
+        for pk, name, slug, featured, views in rows:
+            yield {'id': pk, 'name': name, 'slug': slug}, (name, slug), featured * FEATURED_RANK + views
+    else:
+        rows = Category.objects.order_by('name', 'pk').values_list('pk', 'name', 'slug', 'tool_count')
+        for pk, name, slug, tool_count in rows:
+            yield {'id': pk, 'name': name, 'slug': slug}, (name,), tool_count
+
+
+def _build(path):
+    config = _config()
+    # Stamp before querying so an edit landing mid-build stays stale.
+    built = time.time()
+    indexes = {kind: PrefixIndex.build(_items(kind), config['KEY_BYTES']) for kind in KINDS}
+    _save(indexes, built, path)
+    return {kind: len(index.offsets) - 1 for kind, index in indexes.items()}
+
+
+@contextlib.contextmanager
+def _rebuild_lock():
+    """Hold the rebuild lock, waiting for a rebuild in progress elsewhere; it expires after LOCK_TIMEOUT."""
+    while not cache.add(REBUILD_LOCK_KEY, True, timeout=_config()['LOCK_TIMEOUT']):
+        time.sleep(0.1)
+    try:
+        yield
+    finally:
+        cache.delete(REBUILD_LOCK_KEY)
+
+
+def rebuild(path=None):
+    """Build the index from the database and save it; returns the number of entries of each kind."""
+    with _rebuild_lock():
+        return _build(path or _config()['PATH'])
+
+
+def _save(indexes, built, path):
+    """
+    Write the arrays into a directory named after the new version; readers
+    switch over when ``index.json`` is replaced.
+    """
+    os.makedirs(path, exist_ok=True)
+    version = str(time.time_ns())
+    staging = os.path.join(path, f'.{version}.tmp')
+    os.makedirs(staging)
+    for kind, index in indexes.items():
+        for name in ARRAYS:
+            np.save(os.path.join(staging, f'{kind}-{name}.npy'), getattr(index, name))
+    os.rename(staging, os.path.join(path, version))
+    temporary = os.path.join(path, f'index-{version}.json')
+    with open(temporary, 'w') as file:
+        json.dump({'version': version, 'built': built}, file)
+    os.replace(temporary, os.path.join(path, 'index.json'))
+    _collect(path)
+
+
+def _collect(path):
+    """
+    Remove the versions older than the one ``index.json`` names. Newer ones
+    may belong to an overlapping rebuild about to switch over; processes
+    that mapped an older one keep its files until they switch too.
+    """
+    try:
+        with open(os.path.join(path, 'index.json')) as file:
+            current_version = int(json.load(file)['version'])
+    except FileNotFoundError:
+        return
+    for name in os.listdir(path):
+        if name.isdigit() and int(name) < current_version:
+            shutil.rmtree(os.path.join(path, name), ignore_errors=True)
+
+
+def load(path=None):
+    """
+    Return ``(built, {kind: PrefixIndex})``, memory-mapped, or None before
+    the first rebuild or if the files ``index.json`` names are gone.
+    """
+    path = path or _config()['PATH']
+    try:
+        with open(os.path.join(path, 'index.json')) as file:
+            data = json.load(file)
+        directory = os.path.join(path, data['version'])
+        return data['built'], {
+            kind: PrefixIndex(**{
+                name: np.load(os.path.join(directory, f'{kind}-{name}.npy'), mmap_mode='r')
+                for name in ARRAYS
+            })
+            for kind in KINDS
+        }
+    except FileNotFoundError:
+        return None
+
+
+def mark_stale():
+    """Have the next request rebuild the index."""
+    cache.set(DIRTY_KEY, time.time(), timeout=None)
+
+
+def _claim_rebuild(built):
+    """Whether the snapshot built at ``built`` is stale and this request took the rebuild lock."""
+    marked = cache.get(DIRTY_KEY)
+    if marked is None or marked < built:
+        return False
+    return cache.add(REBUILD_LOCK_KEY, True, timeout=_config()['LOCK_TIMEOUT'])
+
+
+def _rebuild_holding_lock():
+    try:
+        _build(_config()['PATH'])
+    finally:
+        cache.delete(REBUILD_LOCK_KEY)
+
+
+def _rebuild_in_background():
+    try:
+        _rebuild_holding_lock()
+    except Exception:
+        logger.exception('Autocomplete index rebuild failed')
+    finally:
+        close_old_connections()
+
+
+def _rebuild_missing(path):
+    """Build a snapshot where there is none to load, once across processes."""
+    with _rebuild_lock():
+        # Another process may have built it while this one waited.
+        if load(path) is None:
+            _build(path)
+
+
+# The snapshot this process has mapped: the identity of its index.json,
+# when it was built and its indexes.
+_current = (None, None, None)
+
+
+def current():
+    """
+    This process's indexes: the latest snapshot, built first if there is
+    none yet (or its files are gone); see the module docstring for when it
+    is rebuilt.
+    """
+    global _current
+    config = _config()
+    path = config['PATH']
+    for attempt in range(3):
+        try:
+            stat = os.stat(os.path.join(path, 'index.json'))
+        except FileNotFoundError:
+            _rebuild_missing(path)
+            continue
+        identity = (path, stat.st_ino, stat.st_mtime_ns)
+        if _current[0] != identity:
+            loaded = load(path)
+            if loaded is None:
+                _rebuild_missing(path)
+                continue
+            _current = (identity, *loaded)
+        built, indexes = _current[1:]
+        if _claim_rebuild(built):
+            if config['ASYNC_REBUILD']:
+                threading.Thread(
+                    target=_rebuild_in_background, name='autocomplete-rebuild', daemon=True,
+                ).start()
+            else:
+                _rebuild_holding_lock()
+                continue
+        return indexes
+    raise RuntimeError(f'No autocomplete index could be loaded from {path}.')
+
+
+def complete(query, limit=None):
+    """Return ``{'tools': [...], 'categories': [...]}`` starting with ``query``, best first."""
+    config = _config()
+    limit = min(limit or config['LIMIT'], config['MAX_LIMIT'])
+    prefix = _encode(normalize(query), config['KEY_BYTES'])
+    if not prefix:
+        return {kind: [] for kind in KINDS}
+    indexes = current()
+    return {kind: indexes[kind].top(prefix, limit) for kind in KINDS}
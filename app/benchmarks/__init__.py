@@ -0,0 +1,8 @@
+# ai_tools/benchmarks
+"""
+Offline benchmark suite: a deterministic data seeder (seed.py), the request
+scenarios to measure (scenarios.py) and the runner that times them and
+compares against a saved baseline (runner.py). Run it with
+``manage.py bench``; ``manage.py bench_serialization`` measures the
+serializer, renderer and parser throughput (serialization.py).
+"""
@@ -0,0 +1,71 @@
+# ai_tools/benchmarks/loadtest.py
+import threading
+import time
+from http.client import HTTPConnection
+from itertools import cycle
+from urllib.parse import urlsplit
+
+from .runner import percentile
+
+DEFAULT_PATHS = ('/', '/api/ai-tools/', '/api/categories/', '/api/articles/', '/api/search/?q=image')
+
+# Sync read routes and their async twins in app/async_views.py.
+ASYNC_PATHS = {
+    '/api/ai-tools/': '/api/async/ai-tools/',
+    '/api/ai-tools/?ordering=-views&pricing_type=free': '/api/async/ai-tools/?ordering=-views&pricing_type=free',
+    '/api/categories/': '/api/async/categories/',
+    '/api/search/?q=image': '/api/async/search/?q=image',
+}
+
+
+def load_test(base_url, paths=DEFAULT_PATHS, concurrency=8, duration=10.0):
+    """
+    Hit a running server at ``base_url`` from ``concurrency`` keep-alive
+    clients for ``duration`` seconds, cycling through ``paths``. Returns the
+    throughput, latency percentiles and error count.
+    """
+    url = urlsplit(base_url)
+    deadline = time.perf_counter() + duration
+    samples, errors, lock = [], [0], threading.Lock()
+
+    def client(offset):
+        connection = HTTPConnection(url.hostname, url.port or 80, timeout=30)
+        local, failed = [], 0
+        for path in cycle(paths[offset % len(paths):] + paths[:offset % len(paths)]):
+            if time.perf_counter() >= deadline:
+                break
+            started = time.perf_counter()
+            try:
+                connection.request('GET', path)
+                response = connection.getresponse()
+                response.read()
+                if response.status >= 400:
+                    failed += 1
+            except OSError:
+                failed += 1
+                connection.close()
+                connection = HTTPConnection(url.hostname, url.port or 80, timeout=30)
+                continue
+            local.append((time.perf_counter() - started) * 1000)
+        connection.close()
+        with lock:
+            samples.extend(local)
+            errors[0] += failed
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    samples.sort()
+    return {
+        'requests': len(samples),
+        'errors': errors[0],
+        'rps': round(len(samples) / elapsed, 1),
+        'p50_ms': round(percentile(samples, 0.50), 2) if samples else None,
+        'p95_ms': round(percentile(samples, 0.95), 2) if samples else None,
+        'p99_ms': round(percentile(samples, 0.99), 2) if samples else None,
+    }
@@ -0,0 +1,150 @@
+# ai_tools/benchmarks/runner.py
+import fnmatch
+import gc
+import statistics
+import time
+import tracemalloc
+from contextlib import ExitStack
+
+from django.contrib.auth.models import User
+from django.db import connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from .scenarios import scenarios
+
+# Latency regressions smaller than this are treated as noise.
+MIN_LATENCY_DELTA_MS = 2.0
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    index = min(len(samples) - 1, max(0, round(fraction * len(samples)) - 1))
+    return samples[index]
+
+
+def measure(client, path, params, iterations=30, warmup=3):
+    for _ in range(warmup):
+        client.get(path, params)
+
+    gc.collect()
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        response = client.get(path, params)
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+
+    # Query count and memory come from one extra request each, as both
+    # instruments slow the request down. The timed requests have opened
+    # every connection (writer or replica) the route uses.
+    captures = [
+        CaptureQueriesContext(connection)
+        for connection in connections.all(initialized_only=True) if connection.connection is not None
+    ]
+    with ExitStack() as stack:
+        for capture in captures:
+            stack.enter_context(capture)
+        client.get(path, params)
+    # Read now: the next request resets the connections' query logs.
+    query_count = sum(len(capture) for capture in captures)
+    tracemalloc.start()
+    try:
+        client.get(path, params)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'status': response.status_code,
+        'p50_ms': round(percentile(samples, 0.50), 3),
+        'p95_ms': round(percentile(samples, 0.95), 3),
+        'p99_ms': round(percentile(samples, 0.99), 3),
+        'mean_ms': round(sum(samples) / len(samples), 3),
+        'queries': query_count,
+        'peak_kb': round(peak / 1024, 1),
+        'bytes': len(response.content),
+    }
+
+
+def _clients():
+    staff = User.objects.filter(username='bench-admin').first() or User.objects.create_superuser(
+        'bench-admin', 'bench-admin@example.com', 'bench-admin'
+    )
+    admin = Client()
+    admin.force_login(staff)
+    return {False: Client(), True: admin}
+
+
+def run(iterations=30, warmup=3, only=None, progress=None):
+    """
+    Run every scenario (or those whose name matches the ``only`` glob)
+    against the current database and return ``{name: measurements}``.
+    """
+    clients = _clients()
+    results = {}
+    for name, path, params, as_staff in scenarios():
+        if only and not fnmatch.fnmatch(name, only):
+            continue
+        results[name] = measure(clients[as_staff], path, params, iterations, warmup)
+        if progress:
+            progress(name, results[name])
+    return results
+
+
+def confirm(baseline, results, threshold=0.25, retries=2, iterations=30, warmup=3):
+    """
+    Re-measure scenarios that look slower than ``baseline`` up to ``retries``
+    times, keeping the fastest median. Noise only ever adds time, so a
+    regression that survives this is real. Updates ``results`` in place.
+    """
+    clients = _clients()
+    by_name = {name: (path, params, as_staff) for name, path, params, as_staff in scenarios()}
+    for _ in range(retries):
+        suspects = {name for name, metric, *_ in compare(baseline, results, threshold) if metric == 'p50_ms'}
+        if not suspects:
+            break
+        for name in suspects:
+            path, params, as_staff = by_name[name]
+            retry = measure(clients[as_staff], path, params, iterations, warmup)
+            if retry['p50_ms'] < results[name]['p50_ms']:
+                results[name] = retry
+    return results
+
+
+def drift(baseline, results):
+    """
+    Median ratio of this run's p50 latencies to the baseline's: how much
+    faster or slower the whole machine is, as opposed to single scenarios.
+    """
+    ratios = [
+        result['p50_ms'] / baseline[name]['p50_ms']
+        for name, result in results.items() if baseline.get(name, {}).get('p50_ms')
+    ]
+    return statistics.median(ratios) if ratios else 1.0
+
+
+def compare(baseline, results, threshold=0.25):
+    """
+    Return ``[(name, metric, before, after), ...]`` for scenarios that got
+    worse than ``baseline``: median latency (corrected for ``drift``) or
+    peak memory up by more than ``threshold`` (a fraction), any extra query,
+    or a changed status code. Tail percentiles are reported but too noisy
+    to gate on.
+    """
+    regressions = []
+    scale = drift(baseline, results)
+    for name, after in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        if after['status'] != before['status']:
+            regressions.append((name, 'status', before['status'], after['status']))
+        if after['queries'] > before['queries']:
+            regressions.append((name, 'queries', before['queries'], after['queries']))
+        expected = before['p50_ms'] * scale
+        if after['p50_ms'] > expected * (1 + threshold) and after['p50_ms'] - expected >= MIN_LATENCY_DELTA_MS:
+            regressions.append((name, 'p50_ms', before['p50_ms'], after['p50_ms']))
+        if after['peak_kb'] > before['peak_kb'] * (1 + threshold):
+            regressions.append((name, 'peak_kb', before['peak_kb'], after['peak_kb']))
+    return regressions
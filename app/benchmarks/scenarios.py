@@ -0,0 +1,37 @@
+# ai_tools/benchmarks/scenarios.py
+from django.contrib import admin
+from django.urls import NoReverseMatch, reverse
+
+from ..router import router
+
+# Query parameters for list routes that need them.
+LIST_PARAMS = {
+    'search': {'q': 'image generator'},
+}
+
+
+def scenarios():
+    """
+    Return ``[(name, path, params, as_staff), ...]``: the homepage, the list
+    and detail route of every registered viewset, and every admin changelist.
+    """
+    found = [('index', reverse('index'), {}, False)]
+
+    for prefix, viewset, basename in router.registry:
+        try:
+            found.append((f'api:{basename}-list', reverse(f'{basename}-list'), LIST_PARAMS.get(basename, {}), False))
+        except NoReverseMatch:
+            pass
+        queryset = getattr(viewset, 'queryset', None)
+        if queryset is not None and hasattr(viewset, 'retrieve'):
+            pk = queryset.model._default_manager.order_by('pk').values_list('pk', flat=True).first()
+            if pk is not None:
+                found.append((f'api:{basename}-detail', reverse(f'{basename}-detail', args=[pk]), {}, False))
+
+    for model in admin.site._registry:
+        opts = model._meta
+        found.append((
+            f'admin:{opts.app_label}.{opts.model_name}',
+            reverse(f'admin:{opts.app_label}_{opts.model_name}_changelist'), {}, True,
+        ))
+    return found
@@ -0,0 +1,166 @@
+# ai_tools/benchmarks/seed.py
+import random
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+
+from .. import ratings, search
+from ..categories import refresh_tool_counts
+from ..models import (
+    Category, PricingPlan, AITool, ToolImage, ToolVideo, Feature, Review, Comparison,
+    Article, NewsletterSubscriber, ContactSubmission, ToolSubmission, SiteStat
+)
+
+WORDS = (
+    'assistant', 'image', 'video', 'writing', 'code', 'voice', 'music', 'chat', 'search',
+    'design', 'data', 'analytics', 'translate', 'summarize', 'marketing', 'seo', 'avatar',
+    'meeting', 'notes', 'email', 'sales', 'research', 'legal', 'finance', 'education',
+    'generator', 'editor', 'detector', 'automation', 'agent', 'model', 'studio', 'copilot',
+)
+
+# Rows created per tool (or per N tools) for each related model.
+RATIOS = {
+    'features': 5,
+    'images': 2,
+    'videos': 1,
+    'reviews': 4,
+    'tools_per_category': 50,
+    'tools_per_article': 10,
+    'tools_per_comparison': 20,
+    'subscribers': 2,
+    'tools_per_contact': 2,
+    'tools_per_submission': 10,
+}
+
+BATCH_SIZE = 2000
+
+
+def _text(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+
+def seed(tools=1000, seed=0):
+    """
+    Fill an empty database with a catalog of ``tools`` tools and
+    proportionally sized related data. The same ``tools`` and ``seed`` always
+    produce the same rows, so timings are comparable between runs.
+
+    Returns ``{model label: row count}``.
+    """
+    rng = random.Random(seed)
+    today = date(2025, 1, 1)
+
+    users = User.objects.bulk_create([
+        User(username=f'user{i}', email=f'user{i}@example.com') for i in range(20)
+    ])
+    categories = Category.objects.bulk_create([
+        Category(name=f'Category {i}', slug=f'category-{i}', icon='fa-robot', description=_text(rng, 12))
+        for i in range(max(5, min(50, tools // RATIOS['tools_per_category'])))
+    ])
+    plans = PricingPlan.objects.bulk_create([
+        PricingPlan(name=name, price=price, is_free=price == 0)
+        for name, price in (('Free', 0), ('Starter', 9), ('Pro', 29), ('Team', 99), ('Enterprise', 499))
+    ])
+
+    pricing_types = [choice for choice, _ in AITool.PRICING_TYPES]
+    tool_rows = AITool.objects.bulk_create([
+        AITool(
+            name=f'{_text(rng, 2).title()} {i}', slug=f'tool-{i}',
+            short_description=_text(rng, 15), long_description=_text(rng, 120),
+            website_url=f'https://tool-{i}.example.com', pricing_type=rng.choice(pricing_types),
+            featured=rng.random() < 0.05, is_verified=rng.random() < 0.7,
+            launch_date=today - timedelta(days=rng.randrange(3650)), views=rng.randrange(10000),
+        )
+        for i in range(tools)
+    ], batch_size=BATCH_SIZE)
+
+    category_through = AITool.categories.through
+    plan_through = AITool.pricing_plans.through
+    category_through.objects.bulk_create([
+        category_through(aitool_id=tool.pk, category_id=category.pk)
+        for tool in tool_rows for category in rng.sample(categories, rng.randint(1, 3))
+    ], batch_size=BATCH_SIZE)
+    plan_through.objects.bulk_create([
+        plan_through(aitool_id=tool.pk, pricingplan_id=plan.pk)
+        for tool in tool_rows for plan in rng.sample(plans, rng.randint(1, 3))
+    ], batch_size=BATCH_SIZE)
+
+    Feature.objects.bulk_create([
+        Feature(tool=tool, name=_text(rng, 3).title(), description=_text(rng, 20), icon='fa-check')
+        for tool in tool_rows for _ in range(RATIOS['features'])
+    ], batch_size=BATCH_SIZE)
+    ToolImage.objects.bulk_create([
+        ToolImage(tool=tool, image=f'tool_images/{tool.slug}-{n}.png', caption=_text(rng, 4), is_featured=n == 0)
+        for tool in tool_rows for n in range(RATIOS['images'])
+    ], batch_size=BATCH_SIZE)
+    ToolVideo.objects.bulk_create([
+        ToolVideo(tool=tool, video_url=f'https://videos.example.com/{tool.slug}/{n}', caption=_text(rng, 4))
+        for tool in tool_rows for n in range(RATIOS['videos'])
+    ], batch_size=BATCH_SIZE)
+    Review.objects.bulk_create([
+        Review(
+            tool=tool, user=rng.choice(users), rating=rng.choice((1, 2, 3, 4, 4, 5, 5, 5)),
+            title=_text(rng, 4), content=_text(rng, 40), is_approved=rng.random() < 0.8,
+        )
+        for tool in tool_rows for _ in range(RATIOS['reviews'])
+    ], batch_size=BATCH_SIZE)
+
+    articles = Article.objects.bulk_create([
+        Article(
+            title=f'{_text(rng, 5).title()} {i}', slug=f'article-{i}', content=_text(rng, 400),
+            excerpt=_text(rng, 25), author=rng.choice(users), is_published=rng.random() < 0.9,
+            views=rng.randrange(5000),
+        )
+        for i in range(max(1, tools // RATIOS['tools_per_article']))
+    ], batch_size=BATCH_SIZE)
+    Article.categories.through.objects.bulk_create([
+        Article.categories.through(article_id=article.pk, category_id=rng.choice(categories).pk)
+        for article in articles
+    ], batch_size=BATCH_SIZE)
+    Article.related_tools.through.objects.bulk_create([
+        Article.related_tools.through(article_id=article.pk, aitool_id=tool.pk)
+        for article in articles for tool in rng.sample(tool_rows, min(3, len(tool_rows)))
+    ], batch_size=BATCH_SIZE)
+
+    comparisons = Comparison.objects.bulk_create([
+        Comparison(
+            title=f'{_text(rng, 4).title()} {i}', slug=f'comparison-{i}', content=_text(rng, 200),
+            author=rng.choice(users), is_published=rng.random() < 0.9,
+        )
+        for i in range(max(1, tools // RATIOS['tools_per_comparison']))
+    ], batch_size=BATCH_SIZE)
+    Comparison.tools.through.objects.bulk_create([
+        Comparison.tools.through(comparison_id=comparison.pk, aitool_id=tool.pk)
+        for comparison in comparisons for tool in rng.sample(tool_rows, min(rng.randint(2, 4), len(tool_rows)))
+    ], batch_size=BATCH_SIZE)
+
+    NewsletterSubscriber.objects.bulk_create([
+        NewsletterSubscriber(email=f'reader{i}@example.com', name=f'Reader {i}', unsubscribe_token=f'token-{i}',
+                             is_active=rng.random() < 0.9)
+        for i in range(tools * RATIOS['subscribers'])
+    ], batch_size=BATCH_SIZE)
+    ContactSubmission.objects.bulk_create([
+        ContactSubmission(name=f'Contact {i}', email=f'contact{i}@example.com', subject=_text(rng, 5),
+                          message=_text(rng, 60), is_processed=rng.random() < 0.5)
+        for i in range(max(1, tools // RATIOS['tools_per_contact']))
+    ], batch_size=BATCH_SIZE)
+    ToolSubmission.objects.bulk_create([
+        ToolSubmission(tool_name=_text(rng, 2).title(), tool_url=f'https://submitted-{i}.example.com',
+                       description=_text(rng, 40), submitted_by=rng.choice(users))
+        for i in range(max(1, tools // RATIOS['tools_per_submission']))
+    ], batch_size=BATCH_SIZE)
+    SiteStat.objects.bulk_create([
+        SiteStat(stat_name=name, stat_value=value, icon='fa-chart-line')
+        for name, value in (('Tools', str(tools)), ('Categories', str(len(categories))),
+                            ('Reviews', str(tools * RATIOS['reviews'])), ('Users', '10K+'))
+    ])
+
+    # bulk_create skips the signals that keep these in sync.
+    refresh_tool_counts()
+    ratings.recompute()
+    search.rebuild_index()
+
+    models = (User, Category, PricingPlan, AITool, Feature, ToolImage, ToolVideo, Review, Article,
+              Comparison, NewsletterSubscriber, ContactSubmission, ToolSubmission, SiteStat)
+    return {model._meta.label: model.objects.count() for model in models}
+
@@ -0,0 +1,64 @@
+# ai_tools/benchmarks/serialization.py
+import io
+import time
+
+from rest_framework import parsers, renderers, serializers
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from ..models import AITool
+from ..parsers import JSONParser
+from ..renderers import JSONRenderer
+from ..serializers import AIToolListSerializer, AIToolSerializer
+
+
+def throughput(func, count, repeat=5):
+    """Objects per second for ``func`` handling ``count`` objects, from its fastest of ``repeat`` runs."""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return round(count / best) if best else float('inf')
+
+
+def stages(tools=1000):
+    """
+    Return ``[(stage, before, after, objects), ...]``: callables running
+    each stage with DRF's stock class and with this app's, on up to
+    ``tools`` tools of the current database (list cards for serializers,
+    full nested tools for renderers and parsers).
+    """
+    request = Request(APIRequestFactory().get('/api/ai-tools/'))
+    context = {'request': request}
+    cards = list(AITool.objects.prefetch_related('categories')[:tools])
+    detailed = list(AITool.objects.prefetch_related(
+        'categories', 'pricing_plans', 'features', 'images', 'videos', 'reviews',
+    )[:tools])
+    data = AIToolSerializer(detailed, many=True, context=context).data
+    body = renderers.JSONRenderer().render(data)
+
+    def parse(parser):
+        return lambda: parser.parse(io.BytesIO(body), parser_context={'encoding': 'utf-8'})
+
+    return [
+        (
+            'serialize list cards',
+            lambda: serializers.ListSerializer(cards, child=AIToolListSerializer(), context=context).data,
+            lambda: AIToolListSerializer(cards, many=True, context=context).data,
+            len(cards),
+        ),
+        ('render full tools', lambda: renderers.JSONRenderer().render(data), lambda: JSONRenderer().render(data),
+         len(data)),
+        ('parse full tools', parse(parsers.JSONParser()), parse(JSONParser()), len(data)),
+    ]
+
+
+def run(tools=1000, repeat=5, progress=None):
+    """Measure every stage; returns ``{stage: {'before': objects/s, 'after': objects/s}}``."""
+    results = {}
+    for name, before, after, count in stages(tools):
+        results[name] = {'before': throughput(before, count, repeat), 'after': throughput(after, count, repeat)}
+        if progress:
+            progress(name, results[name])
+    return results
@@ -0,0 +1,153 @@
+# ai_tools/benchmarks/stress.py
+import os
+import random
+import tempfile
+import threading
+import time
+
+from django.contrib.auth.models import Group, Permission, User
+from django.contrib.contenttypes.models import ContentType
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+from django.db.models import F
+
+from ai_tool_hub.settings.database import sqlite_databases
+
+from ..models import AITool, Category, ContactSubmission, PricingPlan
+
+# Operation mix: (name, weight).
+MIX = (('read', 70), ('view', 20), ('contact', 10))
+
+
+def plain_databases(path):
+    """The stock configuration: one connection, rollback journal, Django defaults."""
+    return {'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': path}}
+
+
+CONFIGS = {
+    'plain': plain_databases,
+    'tuned': sqlite_databases,
+}
+
+
+def _register(name, databases):
+    """Add ``databases`` as ``stress-<name>-<alias>`` connections; return (write, read) aliases."""
+    aliases = {f'stress-{name}-{alias}': config for alias, config in databases.items()}
+    configured = connections.configure_settings(
+        {DEFAULT_DB_ALIAS: connections.settings[DEFAULT_DB_ALIAS], **aliases}
+    )
+    for alias in aliases:
+        connections.settings[alias] = configured[alias]
+    write = f'stress-{name}-default'
+    read = f'stress-{name}-replica' if f'stress-{name}-replica' in aliases else write
+    return write, read
+
+
+def _unregister(aliases):
+    for alias in aliases:
+        connections[alias].close()
+        del connections.settings[alias]
+
+
+def _create_schema(alias, tools):
+    with connections[alias].schema_editor() as editor:
+        # AITool.created_by needs the auth tables to exist.
+        for model in (ContentType, Permission, Group, User, Category, PricingPlan, AITool, ContactSubmission):
+            editor.create_model(model)
+    Category.objects.using(alias).bulk_create(
+        Category(name=f'Category {index}', slug=f'category-{index}') for index in range(10)
+    )
+    AITool.objects.using(alias).bulk_create(
+        AITool(
+            name=f'Tool {index}', slug=f'tool-{index}', short_description='Stress tool',
+            long_description='Stress tool', website_url='https://example.com', pricing_type='free',
+        )
+        for index in range(tools)
+    )
+    return list(AITool.objects.using(alias).values_list('pk', flat=True))
+
+
+def _read(write, read, rng, tool_ids):
+    list(AITool.objects.using(read).order_by('-views').values_list('pk', 'name')[:20])
+    AITool.objects.using(read).filter(pk=rng.choice(tool_ids)).values('name', 'views').first()
+
+
+def _view(write, read, rng, tool_ids):
+    AITool.objects.using(write).filter(pk=rng.choice(tool_ids)).update(views=F('views') + 1)
+
+
+def _contact(write, read, rng, tool_ids):
+    # Read then write in one transaction, like a form that validates
+    # against the database before saving.
+    with transaction.atomic(using=write):
+        tool = AITool.objects.using(write).only('name').get(pk=rng.choice(tool_ids))
+        ContactSubmission.objects.using(write).create(
+            name='Stress', email='stress@example.com', subject=tool.name, message='Stress test',
+        )
+
+
+OPERATIONS = {'read': _read, 'view': _view, 'contact': _contact}
+
+
+def _run(write, read, tool_ids, threads, duration, seed):
+    deadline = time.perf_counter() + duration
+    lock = threading.Lock()
+    totals = {name: {'ok': 0, 'locked': 0} for name, _ in MIX}
+    names, weights = zip(*MIX)
+
+    def worker(index):
+        rng = random.Random(seed + index)
+        counts = {name: {'ok': 0, 'locked': 0} for name in names}
+        try:
+            while time.perf_counter() < deadline:
+                name = rng.choices(names, weights)[0]
+                try:
+                    OPERATIONS[name](write, read, rng, tool_ids)
+                except OperationalError as exc:
+                    if 'locked' not in str(exc):
+                        raise
+                    counts[name]['locked'] += 1
+                else:
+                    counts[name]['ok'] += 1
+        finally:
+            connections.close_all()
+        with lock:
+            for name, count in counts.items():
+                totals[name]['ok'] += count['ok']
+                totals[name]['locked'] += count['locked']
+
+    workers = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return totals, elapsed
+
+
+def stress(config='tuned', threads=8, duration=5.0, tools=500, seed=0):
+    """
+    Run ``threads`` threads of mixed reads, view increments and
+    read-then-write transactions (see ``MIX``) for ``duration`` seconds
+    against a scratch SQLite file set up with the ``config`` from
+    ``CONFIGS``. Returns throughput and "database is locked" counts.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        databases = CONFIGS[config](os.path.join(directory, 'stress.sqlite3'))
+        write, read = _register(config, databases)
+        aliases = [write] if read == write else [write, read]
+        try:
+            tool_ids = _create_schema(write, tools)
+            connections[write].close()
+            totals, elapsed = _run(write, read, tool_ids, threads, duration, seed)
+        finally:
+            _unregister(aliases)
+
+    ok = sum(count['ok'] for count in totals.values())
+    return {
+        'config': config,
+        'operations': ok,
+        'ops_per_second': round(ok / elapsed, 1),
+        'locked': sum(count['locked'] for count in totals.values()),
+        'by_operation': totals,
+    }
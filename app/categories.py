@@ -0,0 +1,48 @@
+# ai_tools/categories.py
+from django.db.models import Count, Exists, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Category, AITool
+
+
+def refresh_tool_counts(category_ids=None, category_model=Category, tool_model=AITool):
+    """
+    Recount the tools linked to ``category_ids`` (every category when None)
+    with one correlated UPDATE over the M2M table.
+    """
+    through = tool_model.categories.through
+    count = (
+        through.objects.filter(category_id=OuterRef('pk'))
+        .order_by().values('category_id').annotate(total=Count('pk')).values('total')
+    )
+    queryset = category_model._default_manager.all()
+    if category_ids is not None:
+        queryset = queryset.filter(pk__in=list(category_ids))
+    return queryset.update(
+        tool_count=Coalesce(Subquery(count), Value(0)),
+        updated_at=timezone.now(),
+    )
+
+
+# Above this many tools a category listing walks the tool ordering index
+# instead of sorting the category's tools; see tools_in_category().
+PROBE_THRESHOLD = 1000
+
+
+def tools_in_category(category, queryset=None):
+    """
+    Return the tools in ``category`` in a shape the database can page
+    through cheaply, picked from the stored ``tool_count``.
+
+    Small categories join from the link table and sort their few rows.
+    Large ones filter with a correlated EXISTS, so the planner walks the
+    (filter, featured, created_at) indexes in order and probes the link
+    table until a page is filled; the cost then depends on the page size
+    and the category's share of the catalog, not on the catalog size.
+    """
+    queryset = AITool.objects.all() if queryset is None else queryset
+    if category.tool_count <= PROBE_THRESHOLD:
+        return queryset.filter(categories=category)
+    links = AITool.categories.through.objects.filter(aitool_id=OuterRef('pk'), category_id=category.pk)
+    return queryset.filter(Exists(links))
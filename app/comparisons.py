@@ -0,0 +1,135 @@
+# ai_tools/comparisons.py
+"""
+Side-by-side comparison matrix for a set of tools.
+
+``matrix(identifiers)`` returns the tools' cards with rating aggregates,
+a feature-by-tool grid (feature names matched case- and punctuation-
+insensitively) and a pricing-plan-by-tool grid. It costs one query when
+the matrix is cached and four when it is built, however many tools are
+compared.
+
+The cache key is the tool set plus each tool's ``updated_at`` and stored
+rating aggregates. Changes to features, plan links and plans bump
+``updated_at`` (see ``touch_*`` in app/signals.py), so a changed tool
+never serves a stale matrix.
+"""
+import hashlib
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from . import images
+from .models import AITool, Feature
+
+CACHE_KEY = 'comparison-matrix:{}'
+NON_WORD = re.compile(r'[\W_]+')
+TOOL_FIELDS = (
+    'id', 'name', 'slug', 'short_description', 'website_url', 'logo_digest', 'logo_url',
+    'pricing_type', 'is_verified', 'rating_count', 'rating_average',
+    'rating_1_count', 'rating_2_count', 'rating_3_count', 'rating_4_count', 'rating_5_count',
+)
+
+
+def _config():
+    return {
+        'MAX_TOOLS': 10,
+        'TIMEOUT': 24 * 60 * 60,
+        **getattr(settings, 'COMPARISON_MATRIX', {}),
+    }
+
+
+def max_tools():
+    return _config()['MAX_TOOLS']
+
+
+class UnknownTools(LookupError):
+    """Raised with the identifiers that match no tool."""
+
+
+def resolve(identifiers):
+    """
+    Return ``[(pk, version), ...]`` for tool primary keys or slugs, in the
+    given order, from one query. Raises UnknownTools for those not found.
+    """
+    pks = [int(value) for value in identifiers if str(value).isdigit()]
+    slugs = [value for value in identifiers if not str(value).isdigit()]
+    rows = AITool.objects.filter(Q(pk__in=pks) | Q(slug__in=slugs)).values_list(
+        'pk', 'slug', 'updated_at', 'rating_count', 'rating_average',
+    )
+    by_pk, by_slug = {}, {}
+    for pk, slug, *version in rows:
+        by_pk[pk] = by_slug[slug] = (pk, '|'.join(map(str, version)))
+    resolved, unknown = [], []
+    for value in identifiers:
+        row = by_pk.get(int(value)) if str(value).isdigit() else by_slug.get(value)
+        if row is None:
+            unknown.append(str(value))
+        elif row not in resolved:
+            resolved.append(row)
+    if unknown:
+        raise UnknownTools(unknown)
+    return resolved
+
+
+def feature_key(name):
+    return NON_WORD.sub(' ', name).strip().casefold()
+
+
+def build(tool_ids):
+    """Build the matrix for ``tool_ids`` (in that order) from three queries."""
+    tools = {row['id']: row for row in AITool.objects.filter(pk__in=tool_ids).values(*TOOL_FIELDS)}
+    tool_ids = [pk for pk in tool_ids if pk in tools]
+    column = {pk: index for index, pk in enumerate(tool_ids)}
+
+    features = {}
+    feature_rows = Feature.objects.filter(tool_id__in=tool_ids).order_by('pk').values_list('tool_id', 'name')
+    for tool_id, name in feature_rows:
+        key = feature_key(name)
+        if not key:
+            continue
+        # The first spelling seen labels the row.
+        row = features.setdefault(key, {'name': name.strip(), 'tools': [False] * len(tool_ids)})
+        row['tools'][column[tool_id]] = True
+
+    plans = {}
+    through = AITool.pricing_plans.through.objects.filter(aitool_id__in=tool_ids)
+    for tool_id, plan_id, name, price, is_free in through.values_list(
+        'aitool_id', 'pricingplan_id', 'pricingplan__name', 'pricingplan__price', 'pricingplan__is_free',
+    ):
+        row = plans.setdefault(plan_id, {
+            'id': plan_id, 'name': name, 'price': None if price is None else str(price), 'is_free': is_free,
+            'tools': [False] * len(tool_ids),
+        })
+        row['tools'][column[tool_id]] = True
+
+    return {
+        'tools': [_card(tools[pk]) for pk in tool_ids],
+        # Features most of the tools share first.
+        'features': sorted(features.values(), key=lambda row: (-sum(row['tools']), row['name'].casefold())),
+        'pricing_plans': sorted(
+            plans.values(), key=lambda row: (row['price'] is not None, float(row['price'] or 0), row['name'])
+        ),
+    }
+
+
+def _card(row):
+    histogram = {str(rating): row.pop(f'rating_{rating}_count') for rating in range(1, 6)}
+    return {
+        **{field: value for field, value in row.items() if field != 'logo_digest'},
+        'logo_variants': images.variant_urls(row['logo_digest']),
+        'rating_histogram': histogram,
+    }
+
+
+def matrix(identifiers):
+    """The matrix for tool primary keys or slugs; see the module docstring."""
+    resolved = resolve(identifiers)
+    fingerprint = ';'.join(f'{pk}:{version}' for pk, version in resolved)
+    key = CACHE_KEY.format(hashlib.md5(fingerprint.encode()).hexdigest())
+    data = cache.get(key)
+    if data is None:
+        data = build([pk for pk, _ in resolved])
+        cache.set(key, data, timeout=_config()['TIMEOUT'])
+    return data
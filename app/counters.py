@@ -0,0 +1,149 @@
+# ai_tools/counters.py
+import atexit
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+FLUSH_REQUEST_KEY = 'view-counter:flush-request'
+
+
+class ViewCounter:
+    """
+    Write-behind buffer for ``views`` counters.
+
+    Increments are summed in process memory and written out in batches with
+    ``UPDATE ... SET views = views + n``, so a page view never rewrites the
+    row, never touches ``updated_at`` and never loses a concurrent increment.
+    A background thread flushes the buffer every ``FLUSH_INTERVAL`` seconds,
+    as soon as it reaches ``FLUSH_THRESHOLD`` pending views and when
+    ``manage.py flush_view_counts`` asks for it; it is also flushed at
+    interpreter exit. Flushes never run in a request thread, whose
+    transaction could roll back the UPDATE after the counts left the
+    buffer.
+    """
+    field = 'views'
+
+    def __init__(self, flush_interval=None, flush_threshold=None):
+        self._flush_interval = flush_interval
+        self._flush_threshold = flush_threshold
+        self._pending = defaultdict(int)
+        self._pending_total = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._wake = threading.Event()
+        self._flush_generation = None
+
+    @property
+    def flush_interval(self):
+        if self._flush_interval is not None:
+            return self._flush_interval
+        return getattr(settings, 'VIEW_COUNTER', {}).get('FLUSH_INTERVAL', 5)
+
+    @property
+    def flush_threshold(self):
+        if self._flush_threshold is not None:
+            return self._flush_threshold
+        return getattr(settings, 'VIEW_COUNTER', {}).get('FLUSH_THRESHOLD', 1000)
+
+    def increment(self, instance, amount=1):
+        key = (instance._meta.concrete_model, instance.pk)
+        with self._lock:
+            self._pending[key] += amount
+            self._pending_total += amount
+            pending_total = self._pending_total
+
+        if self.flush_threshold and pending_total >= self.flush_threshold:
+            self._wake.set()
+            self._ensure_thread()
+        elif self.flush_interval:
+            self._ensure_thread()
+
+    def pending(self, instance):
+        with self._lock:
+            return self._pending.get((instance._meta.concrete_model, instance.pk), 0)
+
+    def flush(self):
+        """Write all buffered increments to the database; return how many."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, defaultdict(int)
+                self._pending_total = 0
+            if not pending:
+                return 0
+
+            # Rows that received the same number of views share one UPDATE.
+            batches = defaultdict(list)
+            for (model, pk), amount in pending.items():
+                batches[(model, amount)].append(pk)
+            try:
+                with transaction.atomic():
+                    for (model, amount), pks in batches.items():
+                        model._default_manager.filter(pk__in=pks).update(
+                            **{self.field: F(self.field) + amount}
+                        )
+            except Exception:
+                # Put the counts back so the next flush retries them.
+                with self._lock:
+                    for key, amount in pending.items():
+                        self._pending[key] += amount
+                        self._pending_total += amount
+                raise
+            return sum(pending.values())
+
+    def request_flush(self):
+        """Ask every process sharing the cache to flush on its next tick."""
+        try:
+            cache.incr(FLUSH_REQUEST_KEY)
+        except ValueError:
+            cache.add(FLUSH_REQUEST_KEY, 1, timeout=None)
+
+    def _ensure_thread(self):
+        # Checked outside the lock first: this runs on every page view.
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='view-counter', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        last_flush = time.monotonic()
+        while True:
+            woken = self._wake.wait(1)
+            self._wake.clear()
+            interval = self.flush_interval
+            if not interval and not woken:
+                # Only started for a threshold flush; the next one restarts it.
+                return
+            generation = cache.get(FLUSH_REQUEST_KEY)
+            requested = generation != self._flush_generation
+            self._flush_generation = generation
+            if not woken and not requested and time.monotonic() - last_flush < interval:
+                continue
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Failed to flush buffered view counts')
+            finally:
+                close_old_connections()
+            last_flush = time.monotonic()
+
+
+def _flush_at_exit():
+    try:
+        view_counter.flush()
+    except Exception:
+        logger.exception('Failed to flush buffered view counts at exit')
+
+
+view_counter = ViewCounter()
+atexit.register(_flush_at_exit)
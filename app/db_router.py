@@ -0,0 +1,28 @@
+# ai_tools/db_router.py
+from django.db import connections
+
+WRITE_ALIAS = 'default'
+READ_ALIAS = 'replica'
+
+
+class ReadWriteRouter:
+    """
+    Send reads to the read-only ``replica`` connection and writes to
+    ``default``. Reads made while ``default`` has a transaction open stay
+    on it, so code sees its own uncommitted writes.
+    """
+
+    def db_for_read(self, model, **hints):
+        if connections[WRITE_ALIAS].in_atomic_block:
+            return WRITE_ALIAS
+        return READ_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return WRITE_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases are the same database.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != READ_ALIAS
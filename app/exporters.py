@@ -0,0 +1,141 @@
+# ai_tools/exporters.py
+import csv
+import io
+import zlib
+from datetime import datetime, time
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.text import slugify
+
+from .importers import CSV_LIST_SEPARATOR, TOOL_FIELDS
+from .models import AITool
+from .ratings import AGGREGATE_FIELDS
+
+# Tool columns in the order they are exported. Everything the importer
+# reads is included, so an export can be imported elsewhere as is.
+EXPORT_FIELDS = ('id', *TOOL_FIELDS, 'views', *AGGREGATE_FIELDS, 'created_at', 'updated_at')
+RELATED_FIELDS = ('categories', 'pricing_plans', 'features', 'images')
+CONTENT_TYPES = {'jsonl': 'application/x-ndjson', 'csv': 'text/csv'}
+
+# Rendered lines are joined into chunks of about this size before being
+# handed to the response (or compressor).
+BUFFER_SIZE = 64 * 1024
+
+
+def parse_since(value):
+    """
+    Parse an ISO 8601 date or date and time; naive values are in the
+    current time zone. Returns None when ``value`` is not valid.
+    """
+    try:
+        moment = parse_datetime(value)
+        if moment is None and parse_date(value) is not None:
+            moment = datetime.combine(parse_date(value), time.min)
+    except ValueError:
+        return None
+    if moment is not None and timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def export_queryset(since=None):
+    queryset = AITool.objects.order_by('pk').only(*EXPORT_FIELDS).prefetch_related(*RELATED_FIELDS)
+    if since is not None:
+        queryset = queryset.filter(updated_at__gte=since)
+    return queryset
+
+
+def export_records(since=None, chunk_size=1000):
+    """
+    Yield one dict per tool, oldest first. Rows are read ``chunk_size`` at a
+    time with the related lookups prefetched per chunk, so memory does not
+    grow with the catalog.
+    """
+    for tool in export_queryset(since).iterator(chunk_size=chunk_size):
+        record = {field: getattr(tool, field) for field in EXPORT_FIELDS}
+        record['categories'] = [category.slug for category in tool.categories.all()]
+        # Plans have no slug column; the importer matches them by slugified name.
+        record['pricing_plans'] = [slugify(plan.name) for plan in tool.pricing_plans.all()]
+        record['features'] = [
+            {'name': feature.name, 'description': feature.description, 'icon': feature.icon}
+            for feature in tool.features.all()
+        ]
+        record['images'] = [
+            {'image': image.image.name, 'caption': image.caption, 'is_featured': image.is_featured}
+            for image in tool.images.all()
+        ]
+        yield record
+
+
+def render_jsonl(records):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for record in records:
+        yield encoder.encode(record) + '\n'
+
+
+def render_csv(records):
+    # Related objects are flattened to ``;``-separated slugs/names, the
+    # format the CSV importer reads.
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([*EXPORT_FIELDS, *RELATED_FIELDS])
+    for record in records:
+        writer.writerow([
+            *('' if record[field] is None else record[field] for field in EXPORT_FIELDS),
+            CSV_LIST_SEPARATOR.join(record['categories']),
+            CSV_LIST_SEPARATOR.join(record['pricing_plans']),
+            CSV_LIST_SEPARATOR.join(feature['name'] for feature in record['features']),
+            CSV_LIST_SEPARATOR.join(image['image'] for image in record['images']),
+        ])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+RENDERERS = {'jsonl': render_jsonl, 'csv': render_csv}
+
+
+def _buffered(lines):
+    chunk, size = [], 0
+    for line in lines:
+        encoded = line.encode()
+        chunk.append(encoded)
+        size += len(encoded)
+        if size >= BUFFER_SIZE:
+            yield b''.join(chunk)
+            chunk, size = [], 0
+    if chunk:
+        yield b''.join(chunk)
+
+
+def _gzipped(chunks):
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_tools(file_format='jsonl', since=None, compress=False, chunk_size=1000):
+    """Yield the encoded export as byte chunks, gzip-compressed if asked."""
+    chunks = _buffered(RENDERERS[file_format](export_records(since, chunk_size)))
+    return _gzipped(chunks) if compress else chunks
+
+
+async def async_chunks(chunks):
+    """
+    Hand the sync ``chunks`` iterator (database reads included) to an async
+    response one chunk per thread hop. Under ASGI, Django would otherwise
+    read a sync iterator into a list before sending a byte.
+    """
+    fetch = sync_to_async(next)
+    try:
+        while (chunk := await fetch(chunks, None)) is not None:
+            yield chunk
+    finally:
+        # The client may go away mid-export; release the cursor.
+        await sync_to_async(chunks.close)()
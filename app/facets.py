@@ -0,0 +1,279 @@
+# ai_tools/facets.py
+"""
+Faceted browsing of tools: filtered results plus, in the same response,
+how many tools match each category, pricing type, price band, launch year
+and verified/featured flag.
+
+The counts come from an in-process index of bitsets: one Python int per
+facet value, with bit ``i`` set when the ``i``-th tool (by primary key)
+has that value. A value's count is the popcount of its bitset ANDed with
+the selection on every *other* facet (values of one facet combine with
+OR), so a request costs a few hundred big-int operations instead of a
+GROUP BY per facet.
+
+The index is built from four queries. ``mark_stale()`` (called from
+app/signals.py and the importer) replaces a generation token in the cache;
+the next request in each process that sees a new token rebuilds, one
+thread at a time and at most every REBUILD_INTERVAL seconds, while other
+threads keep counting on the previous index. The results themselves are
+filtered by the database, so they are exact even while the counts are a
+rebuild behind.
+"""
+import datetime
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef, Q
+from rest_framework.exceptions import ValidationError
+
+from .filters import parse_bool, parse_pricing_type
+from .models import AITool, Category
+
+GENERATION_KEY = 'facets:generation'
+
+# (value, label, lower bound, upper bound) on PricingPlan.price, the upper
+# bound exclusive. Plans marked free or priced 0 are 'free' only.
+PRICE_BANDS = (
+    ('free', 'Free', None, None),
+    ('under-10', 'Under $10', 0, 10),
+    ('10-50', '$10 to $50', 10, 50),
+    ('50-100', '$50 to $100', 50, 100),
+    ('100-plus', '$100 and up', 100, None),
+)
+
+
+def _config():
+    return {
+        'REBUILD_INTERVAL': 10,
+        **getattr(settings, 'FACETS', {}),
+    }
+
+
+def parse_price_band(value):
+    if value not in {band[0] for band in PRICE_BANDS}:
+        raise ValueError(value)
+    return value
+
+
+def parse_year(value):
+    if not value.isdigit() or not datetime.MINYEAR <= int(value) < datetime.MAXYEAR:
+        raise ValueError(value)
+    return int(value)
+
+
+# Query parameter (also the facet's name) and the parser for its values.
+FACETS = {
+    'category': str,
+    'pricing_type': parse_pricing_type,
+    'price_band': parse_price_band,
+    'launch_year': parse_year,
+    'is_verified': parse_bool,
+    'featured': parse_bool,
+}
+
+
+def price_band(price, is_free):
+    if is_free or price == 0:
+        return 'free'
+    if price is None:
+        return None
+    for value, label, lower, upper in PRICE_BANDS[1:]:
+        if price >= lower and (upper is None or price < upper):
+            return value
+    return None
+
+
+def _price_band_q(value):
+    lower, upper = next(band[2:] for band in PRICE_BANDS if band[0] == value)
+    if value == 'free':
+        return Q(pricingplan__is_free=True) | Q(pricingplan__price=0)
+    q = Q(pricingplan__is_free=False, pricingplan__price__gt=0, pricingplan__price__gte=lower)
+    return q & Q(pricingplan__price__lt=upper) if upper is not None else q
+
+
+def parse_selection(params):
+    """
+    Return ``{facet: set of values}`` from query parameters; a parameter may
+    hold several comma-separated values.
+    """
+    selection = {}
+    for facet, parse in FACETS.items():
+        raw = params.get(facet, '')
+        values = [value.strip() for value in raw.split(',') if value.strip()]
+        if not values:
+            continue
+        try:
+            selection[facet] = {parse(value) for value in values}
+        except ValueError:
+            raise ValidationError({facet: f'Invalid value {raw!r}.'})
+    return selection
+
+
+def filter_queryset(queryset, selection):
+    """Filter tools by ``selection`` in the database; the counterpart of the index."""
+    lookups = Q()
+    if 'category' in selection:
+        links = AITool.categories.through.objects.filter(
+            aitool_id=OuterRef('pk'), category__slug__in=selection['category'],
+        )
+        lookups &= Exists(links)
+    if 'pricing_type' in selection:
+        lookups &= Q(pricing_type__in=selection['pricing_type'])
+    if 'price_band' in selection:
+        bands = Q()
+        for value in selection['price_band']:
+            bands |= _price_band_q(value)
+        lookups &= Exists(AITool.pricing_plans.through.objects.filter(bands, aitool_id=OuterRef('pk')))
+    if 'launch_year' in selection:
+        years = Q()
+        for year in selection['launch_year']:
+            years |= Q(launch_date__gte=datetime.date(year, 1, 1), launch_date__lt=datetime.date(year + 1, 1, 1))
+        lookups &= years
+    for flag in ('is_verified', 'featured'):
+        if flag in selection:
+            lookups &= Q(**{f'{flag}__in': selection[flag]})
+    return queryset.filter(lookups)
+
+
+def _bitset(positions, size):
+    bits = bytearray((size + 7) // 8)
+    for position in positions:
+        bits[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(bits, 'little')
+
+
+class Index:
+    """Per facet, ``{value: bitset}`` over the tools at build time; see the module docstring."""
+
+    def __init__(self, size, bitsets, labels, generation):
+        self.everything = (1 << size) - 1
+        self.bitsets = bitsets
+        self.labels = labels
+        self.generation = generation
+        self.built = time.monotonic()
+
+    @classmethod
+    def build(cls):
+        # Read the token first so a change landing mid-build triggers the
+        # next rebuild.
+        cache.add(GENERATION_KEY, uuid.uuid4().hex, timeout=None)
+        generation = cache.get(GENERATION_KEY)
+
+        positions = {facet: {} for facet in FACETS}
+        labels = {facet: {} for facet in FACETS}
+
+        def add(facet, value, position):
+            positions[facet].setdefault(value, []).append(position)
+
+        tools = AITool.objects.order_by('pk').values_list(
+            'pk', 'pricing_type', 'launch_date', 'is_verified', 'featured',
+        )
+        position_of = {}
+        for position, (pk, pricing_type, launch_date, is_verified, featured) in enumerate(tools):
+            position_of[pk] = position
+            add('pricing_type', pricing_type, position)
+            if launch_date is not None:
+                add('launch_year', launch_date.year, position)
+            add('is_verified', is_verified, position)
+            add('featured', featured, position)
+
+        slugs = {}
+        for pk, slug, name in Category.objects.order_by('name').values_list('pk', 'slug', 'name'):
+            slugs[pk] = slug
+            labels['category'][slug] = name
+            positions['category'][slug] = []
+        for tool_id, category_id in AITool.categories.through.objects.values_list('aitool_id', 'category_id'):
+            # Tools created since the tools query was run are left out.
+            if tool_id in position_of and category_id in slugs:
+                add('category', slugs[category_id], position_of[tool_id])
+
+        plans = AITool.pricing_plans.through.objects.values_list(
+            'aitool_id', 'pricingplan__price', 'pricingplan__is_free',
+        )
+        for tool_id, price, is_free in plans:
+            band = price_band(price, is_free)
+            if tool_id in position_of and band is not None:
+                add('price_band', band, position_of[tool_id])
+
+        labels['pricing_type'] = dict(AITool.PRICING_TYPES)
+        labels['price_band'] = {value: label for value, label, *bounds in PRICE_BANDS}
+        labels['launch_year'] = {year: str(year) for year in sorted(positions['launch_year'], reverse=True)}
+        labels['is_verified'] = labels['featured'] = {True: 'Yes', False: 'No'}
+
+        size = len(position_of)
+        bitsets = {
+            # In the order of the labels: names, choices, bands, newest year first.
+            facet: {
+                value: _bitset(positions[facet].get(value, ()), size)
+                for value in labels[facet]
+            }
+            for facet in FACETS
+        }
+        return cls(size, bitsets, labels, generation)
+
+    def _mask(self, facet, values):
+        mask = 0
+        for value in values:
+            mask |= self.bitsets[facet].get(value, 0)
+        return mask
+
+    def counts(self, selection):
+        """
+        Return ``(total, {facet: [{'value', 'label', 'count'}, ...]})`` for
+        ``selection``. Each facet is counted under the selection on the other
+        facets; values with no tools are left out unless selected.
+        """
+        masks = {facet: self._mask(facet, values) for facet, values in selection.items()}
+        matching = self.everything
+        for mask in masks.values():
+            matching &= mask
+
+        facets = {}
+        for facet, bitsets in self.bitsets.items():
+            base = self.everything
+            for other, mask in masks.items():
+                if other != facet:
+                    base &= mask
+            selected = selection.get(facet, ())
+            facets[facet] = [
+                {'value': value, 'label': self.labels[facet][value], 'count': count}
+                for value, bits in bitsets.items()
+                if (count := (base & bits).bit_count()) or value in selected
+            ]
+        return matching.bit_count(), facets
+
+
+_index = None
+_lock = threading.Lock()
+
+
+def mark_stale():
+    """Have every process rebuild its index on its next request."""
+    cache.set(GENERATION_KEY, uuid.uuid4().hex, timeout=None)
+
+
+def _is_stale(index):
+    return (
+        cache.get(GENERATION_KEY) != index.generation
+        and time.monotonic() - index.built >= _config()['REBUILD_INTERVAL']
+    )
+
+
+def get_index():
+    """The process's index, rebuilt first if it is stale and no other thread is rebuilding it."""
+    global _index
+    index = _index
+    if index is not None and not _is_stale(index):
+        return index
+    # Without an index there is nothing to serve meanwhile, so wait.
+    if not _lock.acquire(blocking=index is None):
+        return index
+    try:
+        if _index is None or _is_stale(_index):
+            _index = Index.build()
+        return _index
+    finally:
+        _lock.release()
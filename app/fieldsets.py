@@ -0,0 +1,155 @@
+# ai_tools/fieldsets.py
+"""
+Sparse fieldsets and expansion for API reads.
+
+- ``?fields=name,slug,logo_variants`` limits a representation to those
+  fields. Dotted names reach into nested serializers:
+  ``?fields=title,tools.name`` keeps only the title and each tool's name.
+- ``?expand=reviews,features`` lists the nested relations (fields that are
+  serializers themselves) to include, again with dotted names for deeper
+  levels (``?expand=tools,tools.features``). Without ``expand`` every
+  nested relation is included, as before; with it, only those listed.
+
+``select`` applies the selection to a serializer's fields (see
+``DynamicFieldsModelSerializer`` in app/serializers.py) and ``restrict``
+to the view's queryset (see ``SparseFieldsetMixin`` in app/mixins.py), so
+only the columns behind the selected fields are fetched (``.only()``) and
+only the selected relations are prefetched. Writes always use every field.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from django.db.models.constants import LOOKUP_SEP
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+READ_METHODS = ('GET', 'HEAD')
+
+
+def _tree(value):
+    """``'a,b.c,b.d'`` as ``{'a': {}, 'b': {'c': {}, 'd': {}}}``."""
+    tree = {}
+    for path in value.split(','):
+        names = [name.strip() for name in path.split('.')]
+        if not all(names):
+            continue
+        node = tree
+        for name in names:
+            node = node.setdefault(name, {})
+    return tree
+
+
+def _dump(tree):
+    return ','.join(f'{name}({_dump(tree[name])})' if tree[name] else name for name in sorted(tree))
+
+
+class Selection:
+    """The parsed ``fields`` and ``expand`` trees; None where the parameter was not given."""
+
+    def __init__(self, fields, expand):
+        self.fields = fields
+        self.expand = expand
+        # Canonical, so equivalent query strings share cached representations.
+        self.key = ';'.join(
+            f"{name}={'*' if tree is None else _dump(tree)}"
+            for name, tree in (('fields', fields), ('expand', expand))
+        )
+
+    def at(self, path):
+        """``(fields, expand)`` for the serializer at ``path``: the names it may keep, None for all."""
+        fields = self.fields
+        for name in path:
+            fields = (fields or {}).get(name)
+        expand = self.expand
+        for name in path:
+            expand = None if expand is None else expand.get(name, {})
+        # A nested serializer named without dotted children keeps all its fields.
+        return fields or None, expand
+
+
+def from_request(request):
+    """The request's Selection, or None if it asks for the full representation."""
+    if request is None or request.method not in READ_METHODS:
+        return None
+    params = request.query_params
+    fields = _tree(params.get('fields', '')) or None
+    expand = _tree(params['expand']) if 'expand' in params else None
+    if fields is None and expand is None:
+        return None
+    return Selection(fields, expand)
+
+
+def _path(serializer):
+    names = []
+    while serializer.parent is not None:
+        # A list serializer's child is bound with an empty name.
+        if serializer.field_name:
+            names.append(serializer.field_name)
+        serializer = serializer.parent
+    return tuple(reversed(names))
+
+
+def _nested(field):
+    """The serializer a field nests (a list serializer's child), or None."""
+    if isinstance(field, serializers.ListSerializer):
+        return field.child
+    return field if isinstance(field, serializers.BaseSerializer) else None
+
+
+def select(serializer, fields):
+    """The subset of ``fields`` (a serializer's fields) the request selects."""
+    selection = from_request(serializer.context.get('request'))
+    if selection is None:
+        return fields
+    path = _path(serializer)
+    keep, expand = selection.at(path)
+    expandable = {name for name, field in fields.items() if _nested(field) is not None}
+    prefix = ''.join(f'{name}.' for name in path)
+    for parameter, names, allowed in (('fields', keep, fields), ('expand', expand, expandable)):
+        unknown = sorted(set(names or ()) - set(allowed))
+        if unknown:
+            raise ValidationError({parameter: f"Unknown fields: {', '.join(prefix + name for name in unknown)}."})
+    return {
+        name: field for name, field in fields.items()
+        if (keep is None or name in keep) and (expand is None or name not in expandable or name in expand)
+    }
+
+
+def _keeps(serializer, lookup):
+    """Whether the prefetch ``lookup`` feeds a field ``serializer`` still has."""
+    for part in lookup.split(LOOKUP_SEP):
+        if serializer is None:
+            # Past the representation (e.g. primary keys); keep it.
+            return True
+        field = next((field for field in serializer.fields.values() if field.source == part), None)
+        if field is None:
+            return False
+        serializer = _nested(field)
+    return True
+
+
+def restrict(queryset, serializer, required=()):
+    """
+    ``queryset`` fetching only the columns of ``serializer``'s selected fields
+    plus ``required``, and prefetching only the lookups they use.
+    """
+    serializer = _nested(serializer)
+    opts = queryset.model._meta
+    columns = {opts.pk.name, *required}
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        try:
+            model_field = opts.get_field(field.source)
+        except FieldDoesNotExist:
+            # A property or method may read any column.
+            columns = None
+            break
+        if model_field.concrete and not model_field.many_to_many:
+            columns.add(model_field.name)
+
+    lookups = [
+        lookup for lookup in queryset._prefetch_related_lookups
+        if _keeps(serializer, lookup.prefetch_through if isinstance(lookup, Prefetch) else lookup)
+    ]
+    queryset = queryset.prefetch_related(None).prefetch_related(*lookups)
+    return queryset if columns is None else queryset.only(*columns)
@@ -0,0 +1,59 @@
+# ai_tools/filters.py
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from .models import AITool
+
+
+def parse_bool(value):
+    lowered = value.lower()
+    if lowered in ('1', 'true', 'yes'):
+        return True
+    if lowered in ('0', 'false', 'no'):
+        return False
+    raise ValueError(value)
+
+
+def parse_pricing_type(value):
+    if value not in dict(AITool.PRICING_TYPES):
+        raise ValueError(value)
+    return value
+
+
+class AIToolFilter(BaseFilterBackend):
+    """
+    Query-parameter filters for tool listings. Each parameter maps onto a
+    lookup and a parser for its value.
+    """
+    filters = {
+        'pricing_type': ('pricing_type', parse_pricing_type),
+        'is_verified': ('is_verified', parse_bool),
+        'featured': ('featured', parse_bool),
+        'min_rating': ('rating_average__gte', float),
+        'max_rating': ('rating_average__lte', float),
+        'min_reviews': ('rating_count__gte', int),
+    }
+
+    def filter_queryset(self, request, queryset, view):
+        lookups = {}
+        for param, (lookup, parse) in self.filters.items():
+            value = request.query_params.get(param)
+            if value in (None, ''):
+                continue
+            try:
+                lookups[lookup] = parse(value)
+            except ValueError:
+                raise ValidationError({param: f'Invalid value {value!r}.'})
+        return queryset.filter(**lookups) if lookups else queryset
+
+    def get_schema_operation_parameters(self, view):
+        types = {float: 'number', int: 'integer', parse_bool: 'boolean', parse_pricing_type: 'string'}
+        return [
+            {
+                'name': param,
+                'required': False,
+                'in': 'query',
+                'schema': {'type': types[parse]},
+            }
+            for param, (lookup, parse) in self.filters.items()
+        ]
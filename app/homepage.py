@@ -0,0 +1,213 @@
+# ai_tools/homepage.py
+import asyncio
+import logging
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.template.loader import render_to_string
+
+from .models import Category, AITool, SiteStat, Article
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_KEY = 'homepage:snapshot'
+REBUILD_LOCK_KEY = 'homepage:rebuild-lock'
+DIRTY_KEY = 'homepage:dirty:{}'
+
+TOOL_FIELDS = ('id', 'name', 'slug', 'short_description', 'logo', 'logo_url', 'website_url',
+               'pricing_type', 'featured', 'views')
+
+
+def categories():
+    # tool_count is stored on the row; see app/categories.py
+    return Category.objects.order_by('name').values('id', 'name', 'slug', 'icon', 'tool_count')
+
+
+def featured_tools():
+    return AITool.objects.filter(featured=True).order_by('-created_at').values(*TOOL_FIELDS)[:6]
+
+
+def latest_tools():
+    return AITool.objects.filter(is_verified=True).order_by('-created_at').values(*TOOL_FIELDS)[:6]
+
+
+def stats():
+    return SiteStat.objects.filter(is_active=True).values('stat_name', 'stat_value', 'icon')
+
+
+def articles():
+    return (
+        Article.objects.filter(is_published=True).order_by('-created_at')
+        .values('id', 'title', 'slug', 'excerpt', 'featured_image', 'created_at')[:3]
+    )
+
+
+# Context sections of the homepage and the query that builds each of them.
+# The sections are independent of each other.
+SECTIONS = {
+    'categories': categories,
+    'featured_tools': featured_tools,
+    'latest_tools': latest_tools,
+    'stats': stats,
+    'articles': articles,
+}
+
+
+async def _alist(queryset):
+    return [row async for row in queryset]
+
+
+# Sections affected by a change to each model.
+DEPENDENCIES = {
+    AITool: ('categories', 'featured_tools', 'latest_tools'),
+    Category: ('categories',),
+    Article: ('articles',),
+    SiteStat: ('stats',),
+}
+
+
+def _config():
+    return {
+        'STALE_WHILE_REVALIDATE': 30,
+        'LOCK_TIMEOUT': 60,
+        'ASYNC_REBUILD': True,
+        **getattr(settings, 'HOMEPAGE_SNAPSHOT', {}),
+    }
+
+
+def mark_stale(model):
+    """Flag the sections that depend on ``model`` for the next rebuild."""
+    now = time.time()
+    cache.set_many({DIRTY_KEY.format(section): now for section in DEPENDENCIES[model]}, timeout=None)
+
+
+def stale_sections(snapshot):
+    """Return ``{section: marked_at}`` for sections changed since they were built."""
+    marks = cache.get_many([DIRTY_KEY.format(section) for section in SECTIONS])
+    stale = {}
+    for section in SECTIONS:
+        marked_at = marks.get(DIRTY_KEY.format(section))
+        if marked_at is not None and marked_at >= snapshot['built'][section]:
+            stale[section] = marked_at
+    return stale
+
+
+def _sections_to_build(snapshot, sections):
+    if snapshot is None:
+        return {'context': {}, 'built': {}}, list(SECTIONS)
+    if sections is None:
+        return snapshot, list(stale_sections(snapshot))
+    return snapshot, list(sections)
+
+
+def _store(snapshot, built, values):
+    context = {**snapshot['context'], **values}
+    snapshot = {
+        'context': context,
+        'built': {**snapshot['built'], **built},
+        'html': render_to_string('index.html', context),
+    }
+    cache.set(SNAPSHOT_KEY, snapshot, timeout=None)
+    return snapshot
+
+
+def rebuild(sections=None):
+    """
+    Recompute ``sections`` (all when None, or the stale ones when a snapshot
+    already exists), re-render the page and store the new snapshot.
+    """
+    snapshot, sections = _sections_to_build(cache.get(SNAPSHOT_KEY), sections)
+    built, values = {}, {}
+    for section in sections:
+        # Stamp before querying so an edit landing mid-build stays stale.
+        built[section] = time.time()
+        values[section] = list(SECTIONS[section]())
+    return _store(snapshot, built, values)
+
+
+async def arebuild(sections=None):
+    """``rebuild`` for async views: the section queries are awaited together."""
+    snapshot, sections = _sections_to_build(await cache.aget(SNAPSHOT_KEY), sections)
+    now = time.time()
+    results = await asyncio.gather(*(_alist(SECTIONS[section]()) for section in sections))
+    return await sync_to_async(_store)(
+        snapshot, dict.fromkeys(sections, now), dict(zip(sections, results))
+    )
+
+
+def _rebuild_in_background():
+    try:
+        rebuild()
+    except Exception:
+        logger.exception('Homepage snapshot rebuild failed')
+    finally:
+        cache.delete(REBUILD_LOCK_KEY)
+        close_old_connections()
+
+
+def _claim_rebuild(snapshot):
+    """
+    Return what a request holding ``snapshot`` should do about stale
+    sections: None (serve it as is), 'background' or 'inline'. The last two
+    hold the rebuild lock.
+    """
+    stale = stale_sections(snapshot)
+    if not stale:
+        return None
+
+    config = _config()
+    if not cache.add(REBUILD_LOCK_KEY, True, timeout=config['LOCK_TIMEOUT']):
+        return None
+
+    expired = time.time() - min(stale.values()) > config['STALE_WHILE_REVALIDATE']
+    return 'background' if config['ASYNC_REBUILD'] and not expired else 'inline'
+
+
+def _start_background_rebuild():
+    threading.Thread(target=_rebuild_in_background, name='homepage-rebuild', daemon=True).start()
+
+
+def get_snapshot():
+    """
+    Return the current homepage snapshot without touching the database
+    unless there is none yet.
+
+    A stale snapshot keeps being served while a single rebuild runs; the
+    cache lock means a burst of edits triggers one rebuild, not one per
+    request. Only if the snapshot has been stale for longer than the
+    stale-while-revalidate window does a request rebuild inline.
+    """
+    snapshot = cache.get(SNAPSHOT_KEY)
+    if snapshot is None:
+        return rebuild()
+
+    action = _claim_rebuild(snapshot)
+    if action == 'background':
+        _start_background_rebuild()
+    elif action == 'inline':
+        try:
+            return rebuild()
+        finally:
+            cache.delete(REBUILD_LOCK_KEY)
+    return snapshot
+
+
+async def aget_snapshot():
+    """``get_snapshot`` for async views."""
+    snapshot = await cache.aget(SNAPSHOT_KEY)
+    if snapshot is None:
+        return await arebuild()
+
+    action = await sync_to_async(_claim_rebuild)(snapshot)
+    if action == 'background':
+        _start_background_rebuild()
+    elif action == 'inline':
+        try:
+            return await arebuild()
+        finally:
+            await cache.adelete(REBUILD_LOCK_KEY)
+    return snapshot
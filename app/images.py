@@ -0,0 +1,151 @@
+# ai_tools/images.py
+"""
+Resized derivatives of uploaded images (tool logos, tool screenshots,
+article images).
+
+Every image field has a ``<field>_digest`` column holding the SHA-256 of
+the uploaded file. Variants are stored content-addressed under
+``derivatives/<digest[:2]>/<digest>/<width>.<format>``, so their URLs can
+be built from the row alone, identical uploads share variants, and a
+variant never changes once written (it is served as immutable).
+
+Variants are generated by a background job queued with the upload (see
+app/signals.py and app/tasks.py). A request for a variant that does not
+exist yet - a cold storage volume, a new width in settings - is handled by
+``views.image_variant``, which generates it on the spot.
+"""
+import hashlib
+import threading
+from io import BytesIO
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+# model label: image fields with a ``<field>_digest`` column.
+IMAGE_FIELDS = {
+    'app.AITool': ('logo',),
+    'app.ToolImage': ('image',),
+    'app.Article': ('featured_image',),
+}
+
+CONTENT_TYPES = {'webp': 'image/webp', 'jpeg': 'image/jpeg'}
+DIRECTORY = 'derivatives'
+
+
+def _config():
+    return {
+        'WIDTHS': (64, 160, 320, 640, 1280),
+        'FORMATS': ('webp', 'jpeg'),
+        'QUALITY': {'webp': 80, 'jpeg': 82},
+        **getattr(settings, 'IMAGE_DERIVATIVES', {}),
+    }
+
+
+def file_digest(file):
+    """SHA-256 of ``file``, read in chunks and rewound afterwards."""
+    digest = hashlib.sha256()
+    file.seek(0)
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def parse_variant(shard, digest, variant):
+    """Return ``(width, format)`` for a variant URL's parts, or None if it is not a configured one."""
+    config = _config()
+    width, _, file_format = variant.partition('.')
+    if (
+        len(digest) != 64 or shard != digest[:2] or not width.isdigit()
+        or int(width) not in config['WIDTHS'] or file_format not in config['FORMATS']
+    ):
+        return None
+    try:
+        int(digest, 16)
+    except ValueError:
+        return None
+    return int(width), file_format
+
+
+def variant_path(digest, width, file_format):
+    return f'{DIRECTORY}/{digest[:2]}/{digest}/{width}.{file_format}'
+
+
+def variant_url(digest, width, file_format='webp'):
+    return default_storage.url(variant_path(digest, width, file_format))
+
+
+def variant_urls(digest):
+    """Return ``{format: {width: url}}`` for every configured variant, or {} without a digest."""
+    if not digest:
+        return {}
+    config = _config()
+    return {
+        file_format: {str(width): variant_url(digest, width, file_format) for width in config['WIDTHS']}
+        for file_format in config['FORMATS']
+    }
+
+
+def _resize(image, width, file_format, quality):
+    # Never upscale: a variant wider than the original is the original size.
+    if image.width > width:
+        image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+    if file_format == 'jpeg' and image.mode != 'RGB':
+        background = Image.new('RGB', image.size, 'white')
+        rgba = image.convert('RGBA')
+        background.paste(rgba, mask=rgba.getchannel('A'))
+        image = background
+    output = BytesIO()
+    image.save(output, file_format.upper(), quality=quality, optimize=True)
+    return output.getvalue()
+
+
+# Striped per-digest locks: a request waiting for a variant blocks until
+# the job writing the same image is done instead of racing it.
+_locks = [threading.Lock() for _ in range(64)]
+
+
+def generate(name, digest, variants=None):
+    """
+    Write the missing variants of the stored file ``name`` (all configured
+    ``(width, format)`` pairs unless ``variants`` is given). Returns the
+    paths written.
+    """
+    config = _config()
+    if variants is None:
+        variants = [(width, file_format) for width in config['WIDTHS'] for file_format in config['FORMATS']]
+    with _locks[int(digest[:8], 16) % len(_locks)]:
+        missing = [
+            (width, file_format) for width, file_format in variants
+            if not default_storage.exists(variant_path(digest, width, file_format))
+        ]
+        if not missing:
+            return []
+        with default_storage.open(name, 'rb') as source:
+            image = ImageOps.exif_transpose(Image.open(source))
+            image.load()
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA')
+        written = []
+        for width, file_format in missing:
+            path = variant_path(digest, width, file_format)
+            content = _resize(image, width, file_format, config['QUALITY'][file_format])
+            written.append(default_storage.save(path, ContentFile(content)))
+        return written
+
+
+def find_source(digest):
+    """Return the stored name of an uploaded image with ``digest``, or None."""
+    for label, fields in IMAGE_FIELDS.items():
+        model = apps.get_model(label)
+        for field in fields:
+            name = (
+                model._default_manager.filter(**{f'{field}_digest': digest})
+                .exclude(**{field: ''}).values_list(field, flat=True).first()
+            )
+            if name:
+                return name
+    return None
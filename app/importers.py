@@ -0,0 +1,284 @@
+# ai_tools/importers.py
+import csv
+import io
+import json
+import time
+from collections import defaultdict
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.utils.text import slugify
+
+from . import autocomplete, categories, facets, homepage, images, representations, search, tasks
+from .models import Category, PricingPlan, AITool, Feature, ToolImage, Comparison
+
+# Columns copied straight from a record onto AITool.
+TOOL_FIELDS = (
+    'name', 'slug', 'short_description', 'long_description', 'website_url', 'logo_url',
+    'pricing_type', 'featured', 'is_verified', 'launch_date',
+)
+BOOLEAN_FIELDS = ('featured', 'is_verified')
+# Record keys of the related rows an import replaces, and the row keys
+# they are cleaned into.
+RELATIONS = {'categories': 'categories', 'pricing_plans': 'plans', 'features': 'features', 'images': 'images'}
+# CSV cells holding several values separate them with this character.
+CSV_LIST_SEPARATOR = ';'
+# Errors kept for the report; later ones are only counted.
+MAX_REPORTED_ERRORS = 1000
+
+
+def read_records(stream, file_format):
+    """
+    Yield ``(line_number, record)`` pairs from a JSONL or CSV text stream
+    one line at a time. Unparseable JSON lines yield an ``Exception``
+    instead of a dict.
+    """
+    if file_format == 'jsonl':
+        for line_number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except ValueError as exc:
+                yield line_number, exc
+    elif file_format == 'csv':
+        for line_number, row in enumerate(csv.DictReader(stream), 2):
+            yield line_number, {
+                key: _split(value) if key in ('categories', 'pricing_plans', 'features', 'images') else value
+                for key, value in row.items()
+            }
+    else:
+        raise ValueError(f'Unsupported import format: {file_format!r}')
+
+
+def format_for_filename(filename):
+    return 'csv' if filename.lower().endswith('.csv') else 'jsonl'
+
+
+def _split(value):
+    return [part.strip() for part in (value or '').split(CSV_LIST_SEPARATOR) if part.strip()]
+
+
+def _children(items, required, optional):
+    # Child rows are given as plain strings (the required field) or objects.
+    children = []
+    for item in items or []:
+        if not isinstance(item, dict):
+            item = {required: item}
+        if not item.get(required):
+            raise ValueError(f'Missing {required!r} in {item!r}')
+        children.append({key: item[key] for key in (required, *optional) if key in item})
+    return children
+
+
+class ToolImporter:
+    """
+    Upsert tools by slug in batches.
+
+    Each batch is one transaction: tools are written with ``bulk_create``
+    upserts on slug and their features, images and category/plan links
+    replaced with ``bulk_create``. A record updates only the fields and
+    relations it includes (a CSV row: its file's columns), so known tools
+    keep the rest. Categories and pricing plans are resolved by slug from
+    lookups loaded once; a plan slug shared by several plans is an error.
+    A batch that violates a database constraint is rolled back and its
+    records reported as failed. Because bulk writes skip model signals, the stored
+    category counts, search index, cached representations, homepage
+    snapshot, facet index and autocomplete index are refreshed, image
+    digests computed and variant and similar-tools jobs queued, per batch
+    here instead.
+    """
+
+    def __init__(self, batch_size=500, dry_run=False, progress=None):
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.progress = progress
+        self.category_ids = dict(Category.objects.values_list('slug', 'pk'))
+        self.plan_ids, self.ambiguous_plans = {}, set()
+        for pk, name in PricingPlan.objects.values_list('pk', 'name'):
+            slug = slugify(name)
+            if slug in self.plan_ids:
+                self.ambiguous_plans.add(slug)
+            self.plan_ids[slug] = pk
+        self.stats = {'processed': 0, 'created': 0, 'updated': 0, 'failed': 0, 'batches': 0, 'errors': []}
+        self.started = None
+
+    def run(self, records):
+        self.started = time.perf_counter()
+        records = iter(records)
+        while True:
+            batch = list(islice(records, self.batch_size))
+            if not batch:
+                break
+            self._import_batch(batch)
+            if self.progress:
+                self.progress(self.report())
+        return self.report()
+
+    def report(self):
+        elapsed = time.perf_counter() - self.started if self.started else 0
+        return {
+            **self.stats,
+            'elapsed': round(elapsed, 3),
+            'rate': round(self.stats['processed'] / elapsed, 1) if elapsed else 0,
+            'dry_run': self.dry_run,
+        }
+
+    def _import_batch(self, batch):
+        rows = []
+        for line_number, record in batch:
+            self.stats['processed'] += 1
+            try:
+                rows.append({**self._clean(record), 'line': line_number})
+            except (ValidationError, ValueError, TypeError, AttributeError) as exc:
+                self._fail(line_number, exc)
+
+        # Within a batch the last record for a slug wins.
+        rows = list({row['tool'].slug: row for row in rows}.values())
+        if rows:
+            try:
+                with transaction.atomic():
+                    updated = self._write(rows)
+                    if self.dry_run:
+                        transaction.set_rollback(True)
+            except IntegrityError as exc:
+                for row in rows:
+                    self._fail(row['line'], exc)
+            else:
+                self.stats['created'] += len(rows) - updated
+                self.stats['updated'] += updated
+        self.stats['batches'] += 1
+
+    def _fail(self, line_number, exc):
+        self.stats['failed'] += 1
+        if len(self.stats['errors']) >= MAX_REPORTED_ERRORS:
+            return
+        messages = exc.messages if isinstance(exc, ValidationError) else [str(exc)]
+        self.stats['errors'].append({'line': line_number, 'errors': messages})
+
+    def _clean(self, record):
+        if isinstance(record, Exception):
+            raise ValueError(f'Invalid JSON: {record}')
+        fields = {field: record[field] for field in TOOL_FIELDS if record.get(field) not in (None, '')}
+        for field in BOOLEAN_FIELDS:
+            if isinstance(fields.get(field), str):
+                fields[field] = fields[field].strip().lower() in ('1', 'true', 'yes')
+        if 'launch_date' in fields:
+            fields['launch_date'] = parse_date(str(fields['launch_date']))
+        tool = AITool(**fields)
+        tool.slug = tool.slug or slugify(tool.name or '')
+        tool.long_description = tool.long_description or ''
+        tool.clean_fields(exclude=['logo', 'created_by'])
+
+        unknown = [slug for slug in record.get('categories') or [] if slug not in self.category_ids]
+        unknown += [slug for slug in record.get('pricing_plans') or [] if slug not in self.plan_ids]
+        if unknown:
+            raise ValueError(f"Unknown category or pricing plan: {', '.join(unknown)}")
+        ambiguous = sorted({slug for slug in record.get('pricing_plans') or [] if slug in self.ambiguous_plans})
+        if ambiguous:
+            raise ValueError(f"Pricing plan slug matches several plans: {', '.join(ambiguous)}")
+
+        return {
+            'tool': tool,
+            'fields': tuple(field for field in TOOL_FIELDS if field in record and field != 'slug'),
+            'relations': {name for key, name in RELATIONS.items() if key in record},
+            'categories': {self.category_ids[slug] for slug in record.get('categories') or []},
+            'plans': {self.plan_ids[slug] for slug in record.get('pricing_plans') or []},
+            'features': _children(record.get('features'), 'name', ('description', 'icon')),
+            'images': _children(record.get('images'), 'image', ('caption', 'is_featured')),
+        }
+
+    def _write(self, rows):
+        """Write a batch of cleaned rows; returns how many were known tools."""
+        tools = [row['tool'] for row in rows]
+        existing = set(AITool.objects.filter(slug__in=[tool.slug for tool in tools])
+                       .values_list('slug', flat=True))
+        # One INSERT ... ON CONFLICT (slug) DO UPDATE per set of included
+        # fields, for new and known slugs alike; pks come back for both.
+        groups = defaultdict(list)
+        for row in rows:
+            groups[row['fields']].append(row['tool'])
+        for fields, group in groups.items():
+            AITool.objects.bulk_create(
+                group, batch_size=self.batch_size, update_conflicts=True, unique_fields=['slug'],
+                update_fields=[*fields, 'updated_at'],
+            )
+
+        # Upserted tools get the children and links their records include
+        # replaced wholesale.
+        old_ids = [tool.pk for tool in tools if tool.slug in existing]
+        replaced = {
+            name: [row['tool'].pk for row in rows if row['tool'].slug in existing and name in row['relations']]
+            for name in RELATIONS.values()
+        }
+        category_through = AITool.categories.through
+        plan_through = AITool.pricing_plans.through
+        previous_categories = set(
+            category_through.objects.filter(aitool_id__in=replaced['categories'])
+            .values_list('category_id', flat=True)
+        )
+        for model, field, name in ((Feature, 'tool_id', 'features'), (ToolImage, 'tool_id', 'images'),
+                                   (category_through, 'aitool_id', 'categories'),
+                                   (plan_through, 'aitool_id', 'plans')):
+            # A plain DELETE: the per-row signals would only touch the
+            # parent tools again, which this import does in bulk below.
+            queryset = model.objects.filter(**{f'{field}__in': replaced[name]})
+            queryset._raw_delete(queryset.db)
+
+        Feature.objects.bulk_create([
+            Feature(tool_id=row['tool'].pk, **feature) for row in rows for feature in row['features']
+        ], batch_size=self.batch_size)
+        tool_images = [ToolImage(tool_id=row['tool'].pk, **image) for row in rows for image in row['images']]
+        digests = self._image_digests({tool_image.image.name for tool_image in tool_images})
+        for tool_image in tool_images:
+            tool_image.image_digest = digests.get(tool_image.image.name, '')
+        ToolImage.objects.bulk_create(tool_images, batch_size=self.batch_size)
+        category_through.objects.bulk_create([
+            category_through(aitool_id=row['tool'].pk, category_id=category_id)
+            for row in rows for category_id in row['categories']
+        ], batch_size=self.batch_size)
+        plan_through.objects.bulk_create([
+            plan_through(aitool_id=row['tool'].pk, pricingplan_id=plan_id)
+            for row in rows for plan_id in row['plans']
+        ], batch_size=self.batch_size)
+
+        # Comparisons nest their tools, so their validators must change too.
+        Comparison.objects.filter(tools__in=old_ids).update(updated_at=timezone.now())
+
+        if not self.dry_run:
+            affected_categories = previous_categories.union(*(row['categories'] for row in rows))
+            categories.refresh_tool_counts(affected_categories)
+            search.index_objects(AITool, [row['tool'].pk for row in rows])
+            representations.invalidate(AITool, [row['tool'].pk for row in rows])
+            homepage.mark_stale(AITool)
+            facets.mark_stale()
+            autocomplete.mark_stale()
+            tasks.update_similar_tools.enqueue(tool_ids=[row['tool'].pk for row in rows])
+            for name, digest in digests.items():
+                tasks.generate_image_variants.enqueue(key=f'image-variants:{digest}', name=name, digest=digest)
+        return len(old_ids)
+
+    def _image_digests(self, names):
+        """Digests of the stored files ``names``; files that cannot be read get none."""
+        storage = ToolImage._meta.get_field('image').storage
+        digests = {}
+        for name in names:
+            try:
+                with storage.open(name, 'rb') as file:
+                    digests[name] = images.file_digest(file)
+            except OSError:
+                continue
+        return digests
+
+
+def import_tools(stream, file_format, **options):
+    """Import tools from a text ``stream``; see ``ToolImporter`` for ``options``."""
+    return ToolImporter(**options).run(read_records(stream, file_format))
+
+
+def text_stream(binary_file):
+    """Wrap an uploaded (binary) file so it can be read line by line as text."""
+    return io.TextIOWrapper(binary_file, encoding='utf-8-sig', newline='')
@@ -0,0 +1,88 @@
+import json
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.test.runner import DiscoverRunner
+
+from app.benchmarks import runner, seed
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a throwaway test database and benchmark the homepage, API routes and '
+        'admin changelists; optionally save or compare against a baseline.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tools', type=int, default=1000, help='Catalog size to seed.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--iterations', type=int, default=30)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--only', help='Glob of scenario names to run, e.g. "api:*".')
+        parser.add_argument('--save', metavar='PATH', help='Write the results to PATH as a baseline.')
+        parser.add_argument('--compare', metavar='PATH', help='Compare against the baseline at PATH.')
+        parser.add_argument(
+            '--threshold', type=float, default=0.25,
+            help='Allowed relative slowdown before a scenario counts as a regression.',
+        )
+        parser.add_argument(
+            '--retries', type=int, default=2,
+            help='Times to re-measure an apparently slower scenario before reporting it.',
+        )
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as stream:
+                    baseline = json.load(stream)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f'Cannot read baseline: {exc}')
+
+        # The test runner's databases are created from scratch (in memory for
+        # SQLite) and dropped afterwards, so nothing here touches real data.
+        setup_test_environment(debug=False)
+        test_runner = DiscoverRunner(verbosity=0, interactive=False)
+        old_config = test_runner.setup_databases()
+        try:
+            cache.clear()
+            counts = seed.seed(tools=options['tools'], seed=options['seed'])
+            self.stdout.write('Seeded ' + ', '.join(f'{count} {label}' for label, count in counts.items()))
+            self.stdout.write(f"{'scenario':<40} {'status':>6} {'p50':>8} {'p95':>8} {'p99':>8} "
+                              f"{'queries':>7} {'peak KB':>9}")
+            results = runner.run(
+                iterations=options['iterations'], warmup=options['warmup'], only=options['only'],
+                progress=self.report,
+            )
+            if baseline is not None:
+                runner.confirm(
+                    baseline['results'], results, options['threshold'], options['retries'],
+                    options['iterations'], options['warmup'],
+                )
+        finally:
+            test_runner.teardown_databases(old_config)
+            teardown_test_environment()
+
+        meta = {key: options[key] for key in ('tools', 'seed', 'iterations')}
+        if options['save']:
+            with open(options['save'], 'w') as stream:
+                json.dump({'meta': meta, 'results': results}, stream, indent=2, sort_keys=True)
+            self.stdout.write(f"Baseline written to {options['save']}.")
+
+        if baseline is not None:
+            if baseline.get('meta', {}).get('tools') != meta['tools']:
+                self.stderr.write('Warning: the baseline was recorded with a different catalog size.')
+            self.stdout.write(f"Overall speed vs baseline: {runner.drift(baseline['results'], results):.2f}x")
+            regressions = runner.compare(baseline['results'], results, options['threshold'])
+            for name, metric, before, after in regressions:
+                self.stdout.write(self.style.ERROR(f'{name}: {metric} {before} -> {after}'))
+            if regressions:
+                raise CommandError(f'{len(regressions)} regressions against {options["compare"]}.')
+            self.stdout.write(self.style.SUCCESS('No regressions.'))
+
+    def report(self, name, result):
+        self.stdout.write(
+            f"{name:<40} {result['status']:>6} {result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} "
+            f"{result['p99_ms']:>8.2f} {result['queries']:>7} {result['peak_kb']:>9.1f}"
+        )
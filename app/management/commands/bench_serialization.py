@@ -0,0 +1,38 @@
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.test.runner import DiscoverRunner
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from app.benchmarks import seed, serialization
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database and report serializer, renderer and parser throughput "
+        "in objects per second, with DRF's stock classes (before) and the app's (after)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tools', type=int, default=1000, help='Catalog size to seed and measure.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per stage; the fastest counts.')
+
+    def handle(self, *args, **options):
+        # As in ``bench``: nothing here touches real data.
+        setup_test_environment(debug=False)
+        test_runner = DiscoverRunner(verbosity=0, interactive=False)
+        old_config = test_runner.setup_databases()
+        try:
+            cache.clear()
+            seed.seed(tools=options['tools'], seed=options['seed'])
+            self.stdout.write(f"{'stage':<24} {'before/s':>10} {'after/s':>10} {'speedup':>8}")
+            serialization.run(tools=options['tools'], repeat=options['repeat'], progress=self.report)
+        finally:
+            test_runner.teardown_databases(old_config)
+            teardown_test_environment()
+
+    def report(self, name, result):
+        self.stdout.write(
+            f"{name:<24} {result['before']:>10} {result['after']:>10} "
+            f"{result['after'] / result['before']:>7.1f}x"
+        )
@@ -0,0 +1,38 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app import exporters
+
+
+class Command(BaseCommand):
+    help = 'Stream the AI tool catalog to a JSONL or CSV file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default='-', help='Output file; "-" (default) writes to stdout.')
+        parser.add_argument('--file-format', choices=tuple(exporters.RENDERERS), default='jsonl')
+        parser.add_argument('--since', help='Only tools updated at or after this ISO 8601 date or date and time.')
+        parser.add_argument('--gzip', action='store_true', help='Compress the output with gzip.')
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        since = options['since']
+        if since is not None:
+            since = exporters.parse_since(since)
+            if since is None:
+                raise CommandError('--since must be an ISO 8601 date or date and time.')
+        chunks = exporters.export_tools(
+            options['file_format'], since=since,
+            compress=options['gzip'], chunk_size=options['chunk_size'],
+        )
+        path = options['path']
+        if path == '-':
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+            return
+        written = 0
+        with open(path, 'wb') as output:
+            for chunk in chunks:
+                written += output.write(chunk)
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} bytes to {path}.'))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from app.counters import view_counter
+
+
+class Command(BaseCommand):
+    help = 'Flush buffered view counts to the database.'
+
+    def handle(self, *args, **options):
+        # Running workers pick the request up through the shared cache on
+        # their next tick; anything buffered in this process is written now.
+        view_counter.request_flush()
+        flushed = view_counter.flush()
+        self.stdout.write(self.style.SUCCESS(
+            f'Flushed {flushed} buffered views and requested a flush from running workers.'
+        ))
@@ -0,0 +1,54 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app import importers
+
+
+class Command(BaseCommand):
+    help = 'Import or update AI tools (matched by slug) from a JSONL or CSV file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import; "-" reads JSONL from stdin.')
+        parser.add_argument(
+            '--file-format', choices=('jsonl', 'csv'),
+            help='Input format (default: from the file extension).',
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Validate and write every batch, then roll it back.',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['file_format'] or importers.format_for_filename(path)
+
+        def progress(report):
+            self.stdout.write(
+                f"Batch {report['batches']}: {report['processed']} processed, "
+                f"{report['created']} created, {report['updated']} updated, "
+                f"{report['failed']} failed ({report['rate']:.0f} records/s)"
+            )
+
+        import_options = {
+            'batch_size': options['batch_size'], 'dry_run': options['dry_run'], 'progress': progress,
+        }
+        try:
+            if path == '-':
+                report = importers.import_tools(sys.stdin, file_format, **import_options)
+            else:
+                with open(path, encoding='utf-8-sig', newline='') as stream:
+                    report = importers.import_tools(stream, file_format, **import_options)
+        except OSError as exc:
+            raise CommandError(exc)
+
+        for error in report['errors']:
+            self.stderr.write(f"Line {error['line']}: {json.dumps(error['errors'])}")
+        verb = 'Would import' if report['dry_run'] else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {report['created'] + report['updated']} tools "
+            f"({report['created']} new, {report['updated']} updated, {report['failed']} failed) "
+            f"in {report['elapsed']:.2f}s."
+        ))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from app.benchmarks.loadtest import ASYNC_PATHS, DEFAULT_PATHS, load_test
+
+
+class Command(BaseCommand):
+    help = 'Load-test a running server (e.g. runserver vs gunicorn) and report throughput and latency.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('url', help='Base URL of the running server, e.g. http://127.0.0.1:8000')
+        parser.add_argument('--path', action='append', dest='paths', help='Path to request; repeatable.')
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--duration', type=float, default=10.0, help='Seconds.')
+        parser.add_argument(
+            '--compare-async', action='store_true',
+            help='Run the sync read routes, then their /api/async/ twins (serve the site under ASGI).',
+        )
+
+    def handle(self, *args, **options):
+        if options['compare_async']:
+            runs = [('sync', tuple(ASYNC_PATHS)), ('async', tuple(ASYNC_PATHS.values()))]
+        else:
+            runs = [(None, tuple(options['paths'] or DEFAULT_PATHS))]
+        for label, paths in runs:
+            result = load_test(
+                options['url'], paths, concurrency=options['concurrency'], duration=options['duration'],
+            )
+            self.report(label, result)
+
+    def report(self, label, result):
+        if label:
+            self.stdout.write(f'{label}: ', ending='')
+        self.stdout.write(
+            f"{result['requests']} requests, {result['errors']} errors, {result['rps']} req/s, "
+            f"p50 {result['p50_ms']}ms p95 {result['p95_ms']}ms p99 {result['p99_ms']}ms"
+        )
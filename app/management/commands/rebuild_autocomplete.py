@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from app import autocomplete
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the autocomplete prefix index (app/autocomplete.py).'
+
+    def handle(self, *args, **options):
+        counts = autocomplete.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {counts['tools']} tools and {counts['categories']} categories."
+        ))
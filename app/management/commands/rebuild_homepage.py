@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from app import homepage
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the precomputed homepage snapshot.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--stale-only', action='store_true',
+            help='Only recompute sections changed since the last build.',
+        )
+
+    def handle(self, *args, **options):
+        sections = None if options['stale_only'] else list(homepage.SECTIONS)
+        snapshot = homepage.rebuild(sections)
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt homepage snapshot ({len(snapshot['html'])} bytes)."
+        ))
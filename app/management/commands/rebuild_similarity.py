@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from app import similarity
+
+
+class Command(BaseCommand):
+    help = 'Recompute the related-tools index (app/similarity.py) for every tool.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('-k', type=int, help='Neighbours per tool (default: SIMILARITY["K"]).')
+
+    def handle(self, *args, **options):
+        timings = similarity.rebuild(k=options['k'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Stored {timings['pairs']} neighbours for {timings['tools']} tools in "
+            f"{sum(timings[step] for step in ('load', 'vectorize', 'score', 'store')):.2f}s "
+            f"(load {timings['load']:.2f}s, vectorize {timings['vectorize']:.2f}s, "
+            f"score {timings['score']:.2f}s, store {timings['store']:.2f}s)."
+        ))
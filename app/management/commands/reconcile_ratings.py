@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from app import ratings
+
+
+class Command(BaseCommand):
+    help = 'Recompute stored rating aggregates from approved reviews and report drift.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Report drift without writing the corrected values.',
+        )
+
+    def handle(self, *args, **options):
+        drifted = ratings.recompute(dry_run=options['dry_run'])
+        for tool_id, stored, actual in drifted:
+            changes = ', '.join(
+                f'{field} {stored[field]} -> {actual[field]}'
+                for field in ratings.AGGREGATE_FIELDS if stored[field] != actual[field]
+            )
+            self.stdout.write(f'Tool {tool_id}: {changes}')
+        verb = 'Found' if options['dry_run'] else 'Fixed'
+        self.stdout.write(self.style.SUCCESS(f'{verb} drift on {len(drifted)} tools.'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from app import categories
+
+
+class Command(BaseCommand):
+    help = 'Recount the stored number of tools in every category.'
+
+    def handle(self, *args, **options):
+        updated = categories.refresh_tool_counts()
+        self.stdout.write(self.style.SUCCESS(f'Recounted tools in {updated} categories.'))
@@ -0,0 +1,71 @@
+import multiprocessing
+import os
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from app import queue
+
+# Seconds between purges of old done jobs.
+PURGE_INTERVAL = 3600
+
+
+def _child(stop):
+    # Children stop through the shared event, set by the parent. (Setting
+    # it from a handler could deadlock on the lock held by stop.wait().)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    queue.work(stop)
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Run a pool of worker processes for the background task queue (see app/queue.py).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=os.cpu_count() or 1)
+        parser.add_argument(
+            '--once', action='store_true', help='Run the due jobs in this process and exit.',
+        )
+
+    def handle(self, *args, **options):
+        if options['once']:
+            count = queue.run_pending()
+            self.stdout.write(f'Ran {count} job(s).')
+            return
+
+        # Forked children must not share the parent's database connections.
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        stop = context.Event()
+        signals = []
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda signum, frame: signals.append(signum))
+
+        def spawn():
+            process = context.Process(target=_child, args=(stop,), daemon=True)
+            process.start()
+            return process
+
+        processes = [spawn() for _ in range(options['processes'])]
+        self.stdout.write(f'Started {len(processes)} worker(s).')
+        next_purge = time.monotonic()
+        while not signals:
+            for index, process in enumerate(processes):
+                if not process.is_alive():
+                    self.stderr.write(f'Worker {process.pid} exited with {process.exitcode}; restarting.')
+                    processes[index] = spawn()
+            if time.monotonic() >= next_purge:
+                purged = queue.purge()
+                connections.close_all()
+                next_purge = time.monotonic() + PURGE_INTERVAL
+                if purged:
+                    self.stdout.write(f'Purged {purged} finished job(s).')
+            time.sleep(1)
+
+        stop.set()
+        for process in processes:
+            process.join()
+        self.stdout.write('Workers stopped.')
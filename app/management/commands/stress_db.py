@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from app.benchmarks.stress import CONFIGS, stress
+
+
+class Command(BaseCommand):
+    help = (
+        'Run mixed read/write threads against scratch SQLite files with the stock and '
+        'the tuned database configuration and report throughput and lock errors.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--config', action='append', dest='configs', choices=sorted(CONFIGS))
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--duration', type=float, default=5.0, help='Seconds per configuration.')
+        parser.add_argument('--tools', type=int, default=500)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        for config in options['configs'] or ('plain', 'tuned'):
+            result = stress(
+                config, threads=options['threads'], duration=options['duration'],
+                tools=options['tools'], seed=options['seed'],
+            )
+            detail = ', '.join(
+                f"{name} {count['ok']} ok/{count['locked']} locked"
+                for name, count in result['by_operation'].items()
+            )
+            self.stdout.write(
+                f"{config:<6} {result['ops_per_second']:>8} ops/s  "
+                f"{result['locked']:>5} locked  ({detail})"
+            )
@@ -0,0 +1,273 @@
+# ai_tools/metrics.py
+import logging
+import random
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# name: (type, help, histogram buckets)
+METRICS = {
+    'http_requests_total': ('counter', 'Requests by route, method and status.', None),
+    'http_request_duration_seconds': (
+        'histogram', 'Wall time from the first middleware to the response.',
+        (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+    ),
+    'http_request_db_queries': (
+        'histogram', 'Database queries per request.', (0, 1, 2, 3, 5, 10, 20, 50, 100, 250),
+    ),
+    'http_request_db_duration_seconds': (
+        'histogram', 'Time spent executing database queries per request.',
+        (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+    ),
+    'http_response_serialize_seconds': (
+        'histogram', 'Time spent building serializer.data for API responses.',
+        (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+    ),
+    'http_response_render_seconds': (
+        'histogram', 'Time spent rendering template and API responses to bytes.',
+        (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+    ),
+    'http_response_size_bytes': (
+        'histogram', 'Response body size.', (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+    ),
+    'representation_cache_total': (
+        'counter', 'Cached API representations by event (local_hit, shared_hit, miss, eviction).', None,
+    ),
+}
+
+
+def _config():
+    return {
+        'ENABLED': True,
+        # Requests slower than this are candidates for the slow log ...
+        'SLOW_REQUEST_MS': 500,
+        # ... of which this fraction is actually logged.
+        'SLOW_SAMPLE_RATE': 0.1,
+        # Statements kept per request for the slow log, slowest first.
+        'SLOW_QUERIES_LOGGED': 10,
+        **getattr(settings, 'METRICS', {}),
+    }
+
+
+class Histogram:
+    """Fixed-bucket histogram: memory does not grow with observations."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+
+class Registry:
+    """
+    In-process metric store keyed by metric name and label values. Labels
+    are route names, so the number of series is bounded by the URLconf.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def increment(self, name, labels, amount=1):
+        key = (name, labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def observe(self, name, labels, value):
+        key = (name, labels)
+        with self._lock:
+            histogram = self._series.get(key)
+            if histogram is None:
+                histogram = self._series[key] = Histogram(METRICS[name][2])
+            histogram.observe(value)
+
+    def get(self, name, **labels):
+        # Label tuples are stored sorted by label name.
+        return self._series.get((name, tuple(sorted(labels.items()))))
+
+    def render(self):
+        """Return every series in the Prometheus text exposition format."""
+        with self._lock:
+            series = sorted(self._series.items(), key=lambda item: item[0])
+            lines = []
+            for name, (kind, help_text, _) in METRICS.items():
+                rows = [(labels, value) for (series_name, labels), value in series if series_name == name]
+                if not rows:
+                    continue
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {kind}')
+                for labels, value in rows:
+                    if kind == 'counter':
+                        lines.append(f'{name}{_labels(labels)} {value}')
+                        continue
+                    cumulative = 0
+                    for bound, count in zip((*value.buckets, '+Inf'), value.counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{_labels(labels + (("le", bound),))} {cumulative}')
+                    lines.append(f'{name}_sum{_labels(labels)} {value.sum}')
+                    lines.append(f'{name}_count{_labels(labels)} {value.count}')
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        (key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for key, value in labels
+    )
+    return '{' + ','.join(f'{key}="{value}"' for key, value in escaped) + '}'
+
+
+registry = Registry()
+
+
+class QueryRecorder:
+    """``execute_wrapper`` hook counting and timing every statement."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.duration += elapsed
+            self.statements.append((elapsed, sql))
+
+
+def route_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return '<unresolved>'
+    return match.view_name or match._func_path
+
+
+def serializer_data(serializer, request):
+    """
+    ``serializer.data``, adding the time it took to ``request``'s
+    serialization time; see ``SerializationMetricsMixin`` in app/mixins.py.
+    """
+    started = time.perf_counter()
+    try:
+        return serializer.data
+    finally:
+        # The Django request the middleware sees, not DRF's wrapper.
+        request = getattr(request, '_request', request)
+        request._metrics_serialize_duration = (
+            getattr(request, '_metrics_serialize_duration', 0.0) + time.perf_counter() - started
+        )
+
+
+class MetricsMiddleware:
+    """
+    Record wall time, query count and time, serialization and render time
+    and response size for every request, labelled by route; see
+    ``registry`` and the ``metrics`` view. Goes first in MIDDLEWARE so it
+    times the whole stack.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.config = _config()
+        if not self.config['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with self.record_queries(recorder):
+            response = self.get_response(request)
+        self.record(request, response, time.perf_counter() - started, recorder)
+        return response
+
+    async def __acall__(self, request):
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        # Connections belong to the thread that runs this request's ORM
+        # calls, so the recorder is attached (and removed) from there.
+        stack = await sync_to_async(self.record_queries)(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        self.record(request, response, time.perf_counter() - started, recorder)
+        return response
+
+    def record_queries(self, recorder):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        return stack
+
+    def record(self, request, response, duration, recorder):
+        route = route_name(request)
+        labels = (('method', request.method), ('view', route))
+        registry.increment('http_requests_total', (labels[0], ('status', response.status_code), labels[1]))
+        registry.observe('http_request_duration_seconds', labels, duration)
+        registry.observe('http_request_db_queries', labels, recorder.count)
+        registry.observe('http_request_db_duration_seconds', labels, recorder.duration)
+        serialize = getattr(request, '_metrics_serialize_duration', None)
+        if serialize is not None:
+            registry.observe('http_response_serialize_seconds', labels, serialize)
+        render = getattr(request, '_metrics_render_duration', None)
+        if render is not None:
+            registry.observe('http_response_render_seconds', labels, render)
+        if not response.streaming:
+            registry.observe('http_response_size_bytes', labels, len(response.content))
+
+        if (duration * 1000 >= self.config['SLOW_REQUEST_MS']
+                and random.random() < self.config['SLOW_SAMPLE_RATE']):
+            self.log_slow_request(request, route, duration, recorder)
+
+    def process_template_response(self, request, response):
+        # Called right before DRF / template responses are rendered; by then
+        # API views have built serializer.data, which is timed separately.
+        started = time.perf_counter()
+
+        def rendered(response):
+            request._metrics_render_duration = time.perf_counter() - started
+
+        response.add_post_render_callback(rendered)
+        return response
+
+    def log_slow_request(self, request, route, duration, recorder):
+        slowest = sorted(recorder.statements, key=lambda statement: -statement[0])
+        queries = '\n'.join(
+            f'  {elapsed * 1000:.1f}ms {sql}' for elapsed, sql in slowest[:self.config['SLOW_QUERIES_LOGGED']]
+        )
+        logger.warning(
+            'Slow request %s %s (%s): %.1fms, %d queries in %.1fms\n%s',
+            request.method, request.get_full_path(), route, duration * 1000,
+            recorder.count, recorder.duration * 1000, queries,
+        )
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.4 on 2026-10-18 14:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='aitool',
+            index=models.Index(fields=['featured', 'created_at'], name='aitool_featured_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['created_at'], name='article_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comparison',
+            index=models.Index(fields=['created_at'], name='comparison_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contactsubmission',
+            index=models.Index(fields=['submitted_at'], name='contact_submitted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['created_at'], name='review_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='toolsubmission',
+            index=models.Index(fields=['submitted_at'], name='toolsubmission_submitted_idx'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+from django.db import migrations
+
+# Frozen copies of app/search.py's table and document mapping, so later
+# changes there do not alter this migration.
+INDEX_TABLE = 'app_search_index'
+
+DOCUMENTS = {
+    'tool': ('AITool', ('name', 'short_description', 'long_description'), {}),
+    'article': ('Article', ('title', 'excerpt', 'content'), {'is_published': True}),
+    'comparison': ('Comparison', ('title', None, 'content'), {'is_published': True}),
+}
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    alias = schema_editor.connection.alias
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {INDEX_TABLE} USING fts5('
+            'kind UNINDEXED, object_id UNINDEXED, slug UNINDEXED, '
+            "title, summary, body, tokenize = 'porter unicode61')"
+        )
+        cursor.execute(f'DELETE FROM {INDEX_TABLE}')
+        for kind, (model_name, columns, public) in DOCUMENTS.items():
+            model = apps.get_model('app', model_name)
+            values = model._default_manager.using(alias).filter(**public).values_list(
+                'pk', 'slug', *(column for column in columns if column)
+            )
+            rows = []
+            for pk, slug, *texts in values.iterator():
+                texts = iter(texts)
+                rows.append((kind, pk, slug, *((next(texts) or '') if column else '' for column in columns)))
+            cursor.executemany(
+                f'INSERT INTO {INDEX_TABLE} (kind, object_id, slug, title, summary, body) '
+                'VALUES (%s, %s, %s, %s, %s, %s)',
+                rows,
+            )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {INDEX_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0002_ordering_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,93 @@
+# Generated by Django 5.2.4 on 2026-10-18 14:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+HISTOGRAM_FIELDS = {rating: f'rating_{rating}_count' for rating in range(1, 6)}
+
+
+def backfill_rating_aggregates(apps, schema_editor):
+    # Self-contained (not app.ratings.recompute), so later changes there
+    # do not alter this migration.
+    AITool = apps.get_model('app', 'AITool')
+    Review = apps.get_model('app', 'Review')
+    alias = schema_editor.connection.alias
+    histograms = {}
+    rows = (
+        Review._default_manager.using(alias).filter(is_approved=True)
+        .order_by().values_list('tool_id', 'rating').annotate(total=models.Count('pk'))
+    )
+    for tool_id, rating, total in rows:
+        histograms.setdefault(tool_id, {})[rating] = total
+
+    tools = []
+    for tool_id, histogram in histograms.items():
+        count = sum(histogram.values())
+        total = sum(rating * votes for rating, votes in histogram.items())
+        tools.append(AITool(
+            pk=tool_id, rating_count=count, rating_sum=total, rating_average=total / count,
+            **{field: histogram.get(rating, 0) for rating, field in HISTOGRAM_FIELDS.items()},
+        ))
+    AITool._default_manager.using(alias).bulk_update(
+        tools, ['rating_count', 'rating_sum', 'rating_average', *HISTOGRAM_FIELDS.values()], batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0003_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aitool',
+            name='rating_1_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='aitool',
+            name='rating_2_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='aitool',
+            name='rating_3_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='aitool',
+            name='rating_4_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='aitool',
+            name='rating_5_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='aitool',
+            name='rating_average',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='aitool',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='aitool',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='aitool',
+            index=models.Index(fields=['rating_average'], name='aitool_rating_average_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='aitool',
+            index=models.Index(fields=['rating_count'], name='aitool_rating_count_idx'),
+        ),
+        migrations.RunPython(backfill_rating_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.4 on 2026-10-18 14:53
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def backfill_tool_counts(apps, schema_editor):
+    # Self-contained (not app.categories.refresh_tool_counts), so later
+    # changes there do not alter this migration.
+    Category = apps.get_model('app', 'Category')
+    through = apps.get_model('app', 'AITool').categories.through
+    count = (
+        through._default_manager.filter(category_id=models.OuterRef('pk'))
+        .order_by().values('category_id').annotate(total=models.Count('pk')).values('total')
+    )
+    Category._default_manager.using(schema_editor.connection.alias).update(
+        tool_count=Coalesce(models.Subquery(count), models.Value(0)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0004_rating_aggregates'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='tool_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='aitool',
+            index=models.Index(fields=['pricing_type', 'featured', 'created_at'], name='aitool_pricing_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='aitool',
+            index=models.Index(fields=['is_verified', 'featured', 'created_at'], name='aitool_verified_order_idx'),
+        ),
+        # Covering index for "tools in category X": the default M2M indexes
+        # lead with aitool_id or hold category_id alone.
+        migrations.RunSQL(
+            'CREATE INDEX app_aitool_categories_category_tool_idx '
+            'ON app_aitool_categories (category_id, aitool_id)',
+            'DROP INDEX app_aitool_categories_category_tool_idx',
+        ),
+        migrations.RunPython(backfill_tool_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-18 15:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0005_category_tool_counts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aitool',
+            name='logo_digest',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='featured_image_digest',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='toolimage',
+            name='image_digest',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=64),
+        ),
+    ]
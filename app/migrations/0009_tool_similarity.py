@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-18 16:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0008_newsletter_campaigns'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ToolSimilarity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_to', to='app.aitool')),
+                ('tool', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similarities', to='app.aitool')),
+            ],
+            options={
+                'verbose_name_plural': 'tool similarities',
+                'indexes': [models.Index(fields=['tool', '-score'], name='toolsimilarity_score_idx')],
+                'constraints': [models.UniqueConstraint(fields=('tool', 'related'), name='toolsimilarity_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations
+
+
+def enable_wal(apps, schema_editor):
+    # journal_mode=WAL is stored in the database file, so it is set once
+    # here rather than on every connection (see settings/database.py).
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('PRAGMA journal_mode=WAL')
+
+
+def disable_wal(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('PRAGMA journal_mode=DELETE')
+
+
+class Migration(migrations.Migration):
+    # The journal mode cannot change inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('app', '0009_tool_similarity'),
+    ]
+
+    operations = [
+        migrations.RunPython(enable_wal, disable_wal, atomic=False),
+    ]
@@ -0,0 +1,212 @@
+# ai_tools/mixins.py
+import hashlib
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Count, Max, Sum, prefetch_related_objects
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from . import fieldsets, metrics, representations
+from .renderers import JSONRenderer, RawJSON
+
+
+class ConditionalGetMixin:
+    """
+    ETag / Last-Modified support for list and retrieve.
+
+    Validators come from a cheap query on ``last_modified_field`` (the max and
+    row count for lists, the row's own value for detail), so a matching
+    ``If-None-Match`` or ``If-Modified-Since`` is answered with 304 before
+    anything is fetched or serialized. Changes to nested children bump the
+    parent's timestamp; see ``touch_*`` in app/signals.py.
+    """
+    last_modified_field = 'updated_at'
+    # Columns changed without touching ``last_modified_field`` (e.g. the
+    # buffered ``views`` counter) that must still change the ETag.
+    validator_extra_fields = ()
+
+    def list(self, request, *args, **kwargs):
+        if not self.last_modified_field:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset()).order_by()
+        row = queryset.aggregate(
+            _last=Max(self.last_modified_field),
+            _count=Count('pk'),
+            **{f'_{field}': Sum(field) for field in self.validator_extra_fields},
+        )
+        last_modified = row.pop('_last')
+        return self._conditional(last_modified, row, super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        if not self.last_modified_field:
+            return super().retrieve(request, *args, **kwargs)
+        if hasattr(self, 'get_lookup_filter'):
+            lookup = self.get_lookup_filter()
+        else:
+            lookup = {self.lookup_field: kwargs[self.lookup_url_kwarg or self.lookup_field]}
+        queryset = self.filter_queryset(self.get_queryset()).order_by().prefetch_related(None)
+        row = queryset.filter(**lookup).values(
+            self.last_modified_field, *self.validator_extra_fields
+        ).first()
+        if row is None:
+            # Let the regular path raise the 404.
+            return super().retrieve(request, *args, **kwargs)
+        last_modified = row.pop(self.last_modified_field)
+        return self._conditional(last_modified, row, super().retrieve, request, *args, **kwargs)
+
+    def _conditional(self, last_modified, extra, respond, request, *args, **kwargs):
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        fingerprint = '|'.join(map(str, (
+            self.get_queryset().model._meta.label, request.get_full_path(),
+            request.accepted_renderer.format, last_modified, *sorted(extra.items()),
+        )))
+        etag = f'W/"{hashlib.md5(fingerprint.encode()).hexdigest()}"'
+
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = respond(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if timestamp is not None:
+                response['Last-Modified'] = http_date(timestamp)
+        return response
+
+
+class SlugOrPkLookupMixin:
+    """Detail routes accept either the primary key or the slug."""
+
+    def get_lookup_filter(self):
+        value = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+        return {'pk': value} if value.isdigit() else {'slug': value}
+
+    def get_object(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        obj = get_object_or_404(queryset, **self.get_lookup_filter())
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+
+class SparseFieldsetMixin:
+    """
+    Queries follow the request's ``?fields=`` and ``?expand=`` (see
+    app/fieldsets.py): only the columns behind the selected fields are
+    fetched and only the relations they use are prefetched. Columns the
+    view reads itself (ordering, validators, cache versions) are kept.
+    """
+    # Actions that render ``get_serializer()``; custom actions render other
+    # serializers, which check the selection themselves.
+    sparse_fieldset_actions = ('list', 'retrieve')
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action not in self.sparse_fieldset_actions or fieldsets.from_request(self.request) is None:
+            return queryset
+        return fieldsets.restrict(queryset, self.get_serializer(), self.get_required_columns(queryset))
+
+    def get_required_columns(self, queryset):
+        opts = queryset.model._meta
+        names = {
+            getattr(self, 'last_modified_field', None),
+            *getattr(self, 'validator_extra_fields', ()),
+            *getattr(self, 'representation_version_fields', ()),
+            # Pagination reads the ordering columns off the page's last row.
+            *queryset.query.order_by, *opts.ordering,
+            *(getattr(self, 'pagination_ordering', None) or ()), *(getattr(self, 'ordering', None) or ()),
+        }
+        columns = set()
+        for name in names:
+            if not isinstance(name, str):
+                continue
+            try:
+                field = opts.get_field(name.lstrip('-'))
+            except FieldDoesNotExist:
+                continue
+            if field.concrete and not field.many_to_many:
+                columns.add(field.name)
+        return columns
+
+
+class SerializationMetricsMixin:
+    """
+    Time ``serializer.data`` (instances to primitives, including any
+    queries it triggers) in list and retrieve for
+    ``http_response_serialize_seconds``; the renderer's share is
+    ``http_response_render_seconds``.
+    """
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(queryset if page is None else page, many=True)
+        data = metrics.serializer_data(serializer, request)
+        return Response(data) if page is None else self.get_paginated_response(data)
+
+    def retrieve(self, request, *args, **kwargs):
+        return Response(metrics.serializer_data(self.get_serializer(self.get_object()), request))
+
+
+class CachedRepresentationMixin:
+    """
+    list and retrieve assembled from per-object JSON fragments cached by
+    version (see app/representations.py); only objects missing from the
+    cache have their related lookups prefetched and are serialized.
+
+    ``representation_version_fields`` must change whenever the
+    representation does: ``updated_at``, which changes to children bump
+    (see ``touch_*`` in app/signals.py), plus any columns written with
+    update(). Each ``?fields=``/``?expand=`` selection is cached separately.
+    """
+    representation_version_fields = ('updated_at',)
+
+    def _caches_representations(self, queryset):
+        return self.get_serializer_class() in representations.SERIALIZERS.get(queryset.model, ())
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        if not self._caches_representations(queryset):
+            return super().list(request, *args, **kwargs)
+        page = self.paginate_queryset(queryset.prefetch_related(None))
+        if page is None:
+            return super().list(request, *args, **kwargs)
+        return self.get_paginated_response(self.cached_representations(page, queryset))
+
+    def retrieve(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        if not self._caches_representations(queryset):
+            return super().retrieve(request, *args, **kwargs)
+        if hasattr(self, 'get_lookup_filter'):
+            lookup = self.get_lookup_filter()
+        else:
+            lookup = {self.lookup_field: kwargs[self.lookup_url_kwarg or self.lookup_field]}
+        instance = get_object_or_404(queryset.prefetch_related(None), **lookup)
+        self.check_object_permissions(request, instance)
+        return Response(self.cached_representations([instance], queryset)[0])
+
+    def cached_representations(self, instances, queryset):
+        """``RawJSON`` for each of ``instances``, serializing only those not cached at their version."""
+        model, serializer_class = queryset.model, self.get_serializer_class()
+        # Absolute media URLs embed the site.
+        variant = self.request.build_absolute_uri('/')
+        selection = fieldsets.from_request(self.request)
+        if selection is not None:
+            variant = f'{variant}|{selection.key}'
+        versions = {
+            instance.pk: tuple(getattr(instance, field) for field in self.representation_version_fields)
+            for instance in instances
+        }
+        fragments = representations.get_many(model, serializer_class, variant, versions)
+        missing = [instance for instance in instances if instance.pk not in fragments]
+        if missing:
+            prefetch_related_objects(missing, *queryset._prefetch_related_lookups)
+            renderer = JSONRenderer()
+            fresh = {
+                instance.pk: renderer.render(data)
+                for instance, data in zip(
+                    missing, metrics.serializer_data(self.get_serializer(missing, many=True), self.request),
+                )
+            }
+            representations.set_many(model, serializer_class, variant, fresh, versions)
+            fragments.update(fresh)
+        return [RawJSON(fragments[instance.pk]) for instance in instances]
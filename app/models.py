@@ -4,12 +4,16 @@ from django.urls import reverse
 from django.utils.text import slugify
 from django.core.validators import MinValueValidator, MaxValueValidator
 
+from .counters import view_counter
+
 
 class Category(models.Model):
     name = models.CharField(max_length=100, unique=True)
     slug = models.SlugField(max_length=100, unique=True)
     icon = models.CharField(max_length=50, help_text="Font Awesome icon class")
     description = models.TextField(blank=True)
+    # Number of tools in the category, maintained by app/categories.py
+    tool_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -54,6 +58,8 @@ class AITool(models.Model):
     long_description = models.TextField()
     website_url = models.URLField()
     logo = models.ImageField(upload_to='tool_logos/', blank=True, null=True)
+    # SHA-256 of the uploaded file, addressing its resized variants; see app/images.py
+    logo_digest = models.CharField(max_length=64, blank=True, editable=False, db_index=True)
     logo_url = models.URLField(blank=True, null=True)
     featured = models.BooleanField(default=False)
     pricing_type = models.CharField(max_length=20, choices=PRICING_TYPES)
@@ -66,8 +72,25 @@ class AITool(models.Model):
     is_verified = models.BooleanField(default=False)
     views = models.PositiveIntegerField(default=0)
 
+    # Aggregates over approved reviews, maintained by app/ratings.py
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    rating_average = models.FloatField(default=0, editable=False)
+    rating_1_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_2_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_3_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_4_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_5_count = models.PositiveIntegerField(default=0, editable=False)
+
     class Meta:
         ordering = ['-featured', '-created_at']
+        indexes = [
+            models.Index(fields=['featured', 'created_at'], name='aitool_featured_created_idx'),
+            models.Index(fields=['pricing_type', 'featured', 'created_at'], name='aitool_pricing_order_idx'),
+            models.Index(fields=['is_verified', 'featured', 'created_at'], name='aitool_verified_order_idx'),
+            models.Index(fields=['rating_average'], name='aitool_rating_average_idx'),
+            models.Index(fields=['rating_count'], name='aitool_rating_count_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -81,13 +104,19 @@ class AITool(models.Model):
         return reverse('tool_detail', kwargs={'slug': self.slug})
 
     def increment_views(self):
+        # Buffered and written in batches; see app/counters.py.
+        view_counter.increment(self)
         self.views += 1
-        self.save()
+
+    @property
+    def rating_histogram(self):
+        return {rating: getattr(self, f'rating_{rating}_count') for rating in range(1, 6)}
 
 
 class ToolImage(models.Model):
     tool = models.ForeignKey(AITool, on_delete=models.CASCADE, related_name='images')
     image = models.ImageField(upload_to='tool_images/')
+    image_digest = models.CharField(max_length=64, blank=True, editable=False, db_index=True)
     caption = models.CharField(max_length=200, blank=True)
     is_featured = models.BooleanField(default=False)
 
@@ -115,6 +144,21 @@ class Feature(models.Model):
         return f"{self.name} - {self.tool.name}"
 
 
+class ToolSimilarity(models.Model):
+    """One of a tool's precomputed nearest neighbours; see app/similarity.py."""
+    tool = models.ForeignKey(AITool, on_delete=models.CASCADE, related_name='similarities')
+    related = models.ForeignKey(AITool, on_delete=models.CASCADE, related_name='similar_to')
+    score = models.FloatField()
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['tool', 'related'], name='toolsimilarity_unique')]
+        indexes = [models.Index(fields=['tool', '-score'], name='toolsimilarity_score_idx')]
+        verbose_name_plural = 'tool similarities'
+
+    def __str__(self):
+        return f"{self.tool_id} ~ {self.related_id} ({self.score:.3f})"
+
+
 class Review(models.Model):
     tool = models.ForeignKey(AITool, on_delete=models.CASCADE, related_name='reviews')
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
@@ -129,6 +173,7 @@ class Review(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [models.Index(fields=['created_at'], name='review_created_idx')]
 
     def __str__(self):
         return f"Review for {self.tool.name} by {self.user.username if self.user else 'Anonymous'}"
@@ -146,6 +191,7 @@ class Comparison(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [models.Index(fields=['created_at'], name='comparison_created_idx')]
 
     def __str__(self):
         return self.title
@@ -166,6 +212,7 @@ class Article(models.Model):
     excerpt = models.TextField(blank=True)
     author = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
     featured_image = models.ImageField(upload_to='article_images/', blank=True, null=True)
+    featured_image_digest = models.CharField(max_length=64, blank=True, editable=False, db_index=True)
     categories = models.ManyToManyField(Category, blank=True)
     related_tools = models.ManyToManyField(AITool, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -175,6 +222,7 @@ class Article(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [models.Index(fields=['created_at'], name='article_created_idx')]
 
     def __str__(self):
         return self.title
@@ -188,8 +236,9 @@ class Article(models.Model):
         return reverse('article_detail', kwargs={'slug': self.slug})
 
     def increment_views(self):
+        # Buffered and written in batches; see app/counters.py.
+        view_counter.increment(self)
         self.views += 1
-        self.save()
 
 
 class NewsletterSubscriber(models.Model):
@@ -203,6 +252,57 @@ class NewsletterSubscriber(models.Model):
         return self.email
 
 
+class NewsletterCampaign(models.Model):
+    """A newsletter issue; see app/newsletter.py for how it is sent."""
+    DRAFT = 'draft'
+    SENDING = 'sending'
+    SENT = 'sent'
+    STATUSES = [
+        (DRAFT, 'Draft'),
+        (SENDING, 'Sending'),
+        (SENT, 'Sent'),
+    ]
+
+    subject = models.CharField(max_length=200)
+    # Django templates; {{ subscriber.name }}, {{ subscriber.email }} and
+    # {{ unsubscribe_url }} are filled in per recipient.
+    body_text = models.TextField()
+    body_html = models.TextField(blank=True)
+    status = models.CharField(max_length=10, choices=STATUSES, default=DRAFT)
+    recipients = models.PositiveIntegerField(default=0)
+    sent_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return self.subject
+
+
+class NewsletterBatch(models.Model):
+    """
+    Subscribers ``first_id``..``last_id`` of a campaign, sent by one job.
+    ``cursor`` is the last subscriber id handed to the mail server, so a
+    retried job resumes after it.
+    """
+    campaign = models.ForeignKey(NewsletterCampaign, on_delete=models.CASCADE, related_name='batches')
+    first_id = models.PositiveIntegerField()
+    last_id = models.PositiveIntegerField()
+    cursor = models.PositiveIntegerField(default=0)
+    sent_count = models.PositiveIntegerField(default=0)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['campaign', 'first_id']
+        verbose_name_plural = 'newsletter batches'
+
+    def __str__(self):
+        return f"{self.campaign} #{self.first_id}-{self.last_id}"
+
+
 class ContactSubmission(models.Model):
     name = models.CharField(max_length=100)
     email = models.EmailField()
@@ -213,6 +313,7 @@ class ContactSubmission(models.Model):
 
     class Meta:
         ordering = ['-submitted_at']
+        indexes = [models.Index(fields=['submitted_at'], name='contact_submitted_idx')]
 
     def __str__(self):
         return f"Contact from {self.name} - {self.subject}"
@@ -228,6 +329,7 @@ class ToolSubmission(models.Model):
 
     class Meta:
         ordering = ['-submitted_at']
+        indexes = [models.Index(fields=['submitted_at'], name='toolsubmission_submitted_idx')]
 
     def __str__(self):
         return f"Submission for {self.tool_name}"
@@ -240,4 +342,39 @@ class SiteStat(models.Model):
     is_active = models.BooleanField(default=True)
 
     def __str__(self):
-        return f"{self.stat_name}: {self.stat_value}"
\ No newline at end of file
+        return f"{self.stat_name}: {self.stat_value}"
+
+
+class Job(models.Model):
+    """A unit of background work; see app/queue.py."""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    name = models.CharField(max_length=200)
+    payload = models.JSONField(default=dict, blank=True)
+    # Enqueueing again with a key that is already taken is a no-op.
+    idempotency_key = models.CharField(max_length=200, unique=True, null=True, blank=True)
+    status = models.CharField(max_length=10, choices=STATUSES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField()
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['run_at', 'pk']
+        indexes = [models.Index(fields=['status', 'run_at'], name='job_status_run_at_idx')]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
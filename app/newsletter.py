@@ -0,0 +1,234 @@
+# ai_tools/newsletter.py
+"""
+Newsletter sending.
+
+``dispatch()`` walks the active subscribers by primary key (keyset, never
+OFFSET) and splits them into ``NewsletterBatch`` rows of BATCH_SIZE; each
+batch is sent by its own background job, so ``run_workers`` processes
+send in parallel (see app/tasks.py). ``send_batch()``:
+
+- renders the campaign's templates once per process, with markers where
+  the per-recipient values go, and only substitutes strings per message;
+- sends over the worker's SMTP connection, kept open across messages and
+  jobs and reopened after MAX_MESSAGES;
+- paces itself to RATE messages per second per worker;
+- checkpoints the batch's ``cursor`` every CHECKPOINT messages and when a
+  send fails, so a retried (or reclaimed) job resumes where it stopped.
+"""
+import logging
+import re
+import smtplib
+import threading
+import time
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.template import Context, Template
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import NewsletterBatch, NewsletterCampaign, NewsletterSubscriber
+
+logger = logging.getLogger(__name__)
+
+# Per-recipient values, available to the templates as
+# {{ subscriber.name }}, {{ subscriber.email }} and {{ unsubscribe_url }}.
+FIELDS = ('name', 'email', 'unsubscribe_url')
+MARKER = re.compile('\x00(' + '|'.join(FIELDS) + ')\x00')
+
+
+def _config():
+    return {
+        'BATCH_SIZE': 1000,
+        'CHECKPOINT': 50,
+        # Messages per second per worker process; 0 for no limit.
+        'RATE': 10,
+        # Messages per SMTP connection before it is reopened.
+        'MAX_MESSAGES': 100,
+        'FROM_EMAIL': settings.DEFAULT_FROM_EMAIL,
+        'SITE_URL': 'http://localhost:8000',
+        **getattr(settings, 'NEWSLETTER', {}),
+    }
+
+
+def dispatch(campaign_id, batch_size=None):
+    """
+    Start sending a draft campaign: record its batches and return them.
+    Returns [] if the campaign is not a draft (already dispatched).
+    """
+    batch_size = batch_size or _config()['BATCH_SIZE']
+    now = timezone.now()
+    with transaction.atomic():
+        drafts = NewsletterCampaign.objects.filter(pk=campaign_id, status=NewsletterCampaign.DRAFT)
+        if not drafts.update(status=NewsletterCampaign.SENDING, started_at=now):
+            return []
+        subscriber_ids = (
+            NewsletterSubscriber.objects.filter(is_active=True).order_by('pk').values_list('pk', flat=True)
+        )
+        batches, last_id, recipients = [], 0, 0
+        while chunk := list(subscriber_ids.filter(pk__gt=last_id)[:batch_size]):
+            batches.append(NewsletterBatch(campaign_id=campaign_id, first_id=chunk[0], last_id=chunk[-1]))
+            last_id = chunk[-1]
+            recipients += len(chunk)
+        batches = NewsletterBatch.objects.bulk_create(batches)
+        NewsletterCampaign.objects.filter(pk=campaign_id).update(
+            recipients=recipients,
+            **({} if batches else {'status': NewsletterCampaign.SENT, 'finished_at': now}),
+        )
+    return batches
+
+
+class Rendered:
+    """A campaign rendered with markers in place of the per-recipient values."""
+
+    def __init__(self, campaign):
+        context = {
+            'campaign': campaign,
+            'subscriber': {field: mark_safe(f'\x00{field}\x00') for field in ('name', 'email')},
+            'unsubscribe_url': mark_safe('\x00unsubscribe_url\x00'),
+        }
+        self.subject = Template(campaign.subject).render(Context(context, autoescape=False))
+        self.text = Template(campaign.body_text).render(Context(context, autoescape=False))
+        self.html = Template(campaign.body_html).render(Context(context)) if campaign.body_html else ''
+
+    def personalize(self, values):
+        """Return ``(subject, text, html)`` for one recipient's ``values``."""
+        escaped = {field: escape(value) for field, value in values.items()}
+        # Header values must stay on one line.
+        subject = ' '.join(MARKER.sub(lambda match: values[match[1]], self.subject).split())
+        text = MARKER.sub(lambda match: values[match[1]], self.text)
+        return subject, text, MARKER.sub(lambda match: escaped[match[1]], self.html)
+
+
+# Keyed by (pk, started_at): a campaign's content is fixed once it is sent.
+_rendered = {}
+
+
+def _render(campaign):
+    key = (campaign.pk, campaign.started_at)
+    if key not in _rendered:
+        _rendered.clear()
+        _rendered[key] = Rendered(campaign)
+    return _rendered[key]
+
+
+class RateLimiter:
+    """Spaces calls to ``wait()`` at least ``1 / rate`` seconds apart."""
+
+    def __init__(self, rate, clock=time.monotonic, sleep=time.sleep):
+        self.interval = 1 / rate if rate else 0
+        self.clock = clock
+        self.sleep = sleep
+        self.next_at = 0
+
+    def wait(self):
+        if not self.interval:
+            return
+        now = self.clock()
+        if self.next_at > now:
+            self.sleep(self.next_at - now)
+        self.next_at = max(self.next_at, now) + self.interval
+
+
+# Per worker thread: the open SMTP connection, the messages it has sent
+# and the rate limiter, all reused across jobs.
+_local = threading.local()
+
+
+def _connection():
+    config = _config()
+    if getattr(_local, 'connection', None) is None or _local.sent >= config['MAX_MESSAGES']:
+        close_connection()
+        _local.connection = get_connection()
+        _local.connection.open()
+        _local.sent = 0
+    return _local.connection
+
+
+def close_connection():
+    connection = getattr(_local, 'connection', None)
+    _local.connection = None
+    if connection is not None:
+        try:
+            connection.close()
+        except Exception:
+            logger.warning('Closing the SMTP connection failed', exc_info=True)
+
+
+def _limiter():
+    rate = _config()['RATE']
+    if getattr(_local, 'limiter', None) is None or _local.rate != rate:
+        _local.limiter, _local.rate = RateLimiter(rate), rate
+    return _local.limiter
+
+
+def unsubscribe_url(token):
+    return _config()['SITE_URL'].rstrip('/') + reverse('newsletter_unsubscribe', args=[token])
+
+
+def _message(rendered, subscriber, connection):
+    pk, email, name, token = subscriber
+    url = unsubscribe_url(token)
+    subject, text, html = rendered.personalize({'name': name, 'email': email, 'unsubscribe_url': url})
+    message = EmailMultiAlternatives(
+        subject, text, _config()['FROM_EMAIL'], [email], connection=connection,
+        headers={'List-Unsubscribe': f'<{url}>', 'List-Unsubscribe-Post': 'List-Unsubscribe=One-Click'},
+    )
+    if html:
+        message.attach_alternative(html, 'text/html')
+    return message
+
+
+def _checkpoint(batch, cursor, sent):
+    NewsletterBatch.objects.filter(pk=batch.pk).update(cursor=cursor, sent_count=F('sent_count') + sent)
+    NewsletterCampaign.objects.filter(pk=batch.campaign_id).update(sent_count=F('sent_count') + sent)
+    batch.cursor = cursor
+
+
+def send_batch(batch_id):
+    """Send a batch from its checkpoint on; returns the number of messages sent."""
+    batch = NewsletterBatch.objects.select_related('campaign').get(pk=batch_id)
+    if batch.finished_at is not None:
+        return 0
+    config = _config()
+    rendered = _render(batch.campaign)
+    limiter = _limiter()
+    # Subscribers who unsubscribed since the dispatch are skipped.
+    subscribers = (
+        NewsletterSubscriber.objects.filter(is_active=True, pk__gte=batch.first_id, pk__lte=batch.last_id)
+        .order_by('pk').values_list('pk', 'email', 'name', 'unsubscribe_token')
+    )
+    total = 0
+    while chunk := list(subscribers.filter(pk__gt=batch.cursor)[:config['CHECKPOINT']]):
+        cursor, sent = batch.cursor, 0
+        try:
+            for subscriber in chunk:
+                limiter.wait()
+                connection = _connection()
+                try:
+                    connection.send_messages([_message(rendered, subscriber, connection)])
+                except smtplib.SMTPRecipientsRefused:
+                    logger.warning('Newsletter recipient %s refused', subscriber[1])
+                else:
+                    sent += 1
+                    _local.sent += 1
+                cursor = subscriber[0]
+        except Exception:
+            # The connection may be half-dead; the retry opens a new one.
+            close_connection()
+            raise
+        finally:
+            _checkpoint(batch, cursor, sent)
+            total += sent
+
+    now = timezone.now()
+    NewsletterBatch.objects.filter(pk=batch.pk).update(finished_at=now)
+    if not NewsletterBatch.objects.filter(campaign_id=batch.campaign_id, finished_at=None).exists():
+        NewsletterCampaign.objects.filter(pk=batch.campaign_id, status=NewsletterCampaign.SENDING).update(
+            status=NewsletterCampaign.SENT, finished_at=now,
+        )
+    return total
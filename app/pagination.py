@@ -0,0 +1,157 @@
+# ai_tools/pagination.py
+import datetime
+import decimal
+import json
+import uuid
+
+from django.db import connections
+from django.db.models import BooleanField, Q
+from django.db.models.expressions import RawSQL
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination over a composite key.
+
+    DRF's ``CursorPagination`` only positions on the first ordering field and
+    falls back to OFFSET for ties, so an ordering like ``-featured`` degrades
+    into scanning. Here the cursor holds the value of every ordering field
+    (plus ``pk`` as a tie-breaker), and the next page is selected with a
+    row-value comparison the database can answer from an index, so page 500
+    costs the same as page 1.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = None
+
+    def get_ordering(self, request, queryset, view):
+        opts = queryset.model._meta
+        self.ordering = getattr(view, 'pagination_ordering', None) or opts.ordering or ('pk',)
+        ordering = super().get_ordering(request, queryset, view)
+        if not any(field.lstrip('-') in ('pk', opts.pk.name) for field in ordering):
+            ordering += ('-pk' if ordering[-1].startswith('-') else 'pk',)
+        return ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        return self._paginate(list(self._page_queryset(queryset, request, view)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """``paginate_queryset`` for async views: the page is fetched with the async ORM."""
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        return self._paginate([obj async for obj in self._page_queryset(queryset, request, view)])
+
+    def _page_queryset(self, queryset, request, view):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            reverse, current_position = False, None
+        else:
+            reverse, current_position = self.cursor.reverse, self.cursor.position
+
+        ordering = _reverse_ordering(self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if current_position is not None:
+            queryset = queryset.filter(self._after_position(queryset, ordering, current_position))
+
+        # Fetch one extra row to find out whether another page follows. Keys
+        # are unique, so the inherited link builders always pick the page
+        # boundary itself as the marker and never need an offset.
+        return queryset[:self.page_size + 1]
+
+    def _paginate(self, results):
+        if self.cursor is None:
+            reverse, current_position = False, None
+        else:
+            reverse, current_position = self.cursor.reverse, self.cursor.position
+        self.page = results[:self.page_size]
+        has_following = len(results) > len(self.page)
+        following_position = (
+            self._get_position_from_instance(results[-1], self.ordering) if has_following else None
+        )
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = current_position is not None
+            self.has_previous = has_following
+            self.next_position = current_position
+            self.previous_position = following_position
+        else:
+            self.has_next = has_following
+            self.has_previous = current_position is not None
+            self.next_position = following_position
+            self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for field_name in ordering:
+            field_name = field_name.lstrip('-')
+            value = instance[field_name] if isinstance(instance, dict) else getattr(instance, field_name)
+            values.append(_encode_value(value))
+        return json.dumps(values, separators=(',', ':'))
+
+    def _after_position(self, queryset, ordering, position):
+        """Return a condition selecting the rows strictly after ``position``."""
+        try:
+            values = json.loads(position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        model = queryset.model
+        fields = [
+            model._meta.pk if name.lstrip('-') == 'pk' else model._meta.get_field(name.lstrip('-'))
+            for name in ordering
+        ]
+        try:
+            values = [field.to_python(value) for field, value in zip(fields, values)]
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+        descending = [name.startswith('-') for name in ordering]
+        if all(descending) or not any(descending):
+            # Uniform direction: a single row-value comparison keeps the
+            # lookup a plain index range scan.
+            connection = connections[queryset.db]
+            qn = connection.ops.quote_name
+            table = qn(model._meta.db_table)
+            columns = ', '.join(f'{table}.{qn(field.column)}' for field in fields)
+            params = [field.get_db_prep_value(value, connection) for field, value in zip(fields, values)]
+            placeholders = ', '.join(['%s'] * len(params))
+            operator = '<' if descending[0] else '>'
+            return RawSQL(f'({columns}) {operator} ({placeholders})', params, output_field=BooleanField())
+
+        condition = Q()
+        for index, field in enumerate(fields):
+            lookup = 'lt' if descending[index] else 'gt'
+            term = Q(**{f'{fields[i].attname}': values[i] for i in range(index)})
+            term &= Q(**{f'{field.attname}__{lookup}': values[index]})
+            condition |= term
+        return condition
+
+
+def _reverse_ordering(ordering):
+    return tuple(name[1:] if name.startswith('-') else '-' + name for name in ordering)
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    return value
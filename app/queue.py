@@ -0,0 +1,203 @@
+# ai_tools/queue.py
+"""
+Database-backed job queue for slow side effects.
+
+Tasks are plain functions registered with ``@task``; ``some_task.enqueue(...)``
+inserts a ``Job`` row, in the caller's transaction, so a job is never run
+for a write that rolled back. ``manage.py run_workers`` runs a pool of
+worker processes that claim due jobs, run them and record the outcome:
+
+- A failed job is retried after an exponential backoff
+  (``backoff * 2 ** (attempts - 1)`` seconds) until ``max_attempts``.
+- ``enqueue(key=...)`` is idempotent: a job whose key is taken is dropped.
+- Tasks declared with ``batch=N`` receive up to N payloads of the same task
+  in one call, so e.g. fifty recount requests become one recount.
+- A job whose worker died is claimed again once its lease expires.
+
+With ``TASKS['EAGER']`` jobs run as soon as they are enqueued, in the
+calling thread; ``run_pending()`` drains the queue synchronously.
+"""
+import logging
+import os
+import socket
+import threading
+import traceback
+from contextlib import nullcontext
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+REGISTRY = {}
+
+
+def _config():
+    return {
+        'EAGER': False,
+        # Seconds between polls when no job is due.
+        'POLL_INTERVAL': 1.0,
+        # Seconds a claimed job may run before another worker may take it.
+        'LEASE': 600,
+        # Days done jobs are kept (their idempotency keys stay taken).
+        'RETENTION_DAYS': 7,
+        **getattr(settings, 'TASKS', {}),
+    }
+
+
+class Task:
+    def __init__(self, func, name, max_attempts, backoff, batch):
+        self.func = func
+        self.name = name
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.batch = batch
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def __repr__(self):
+        return f'<Task {self.name}>'
+
+    def enqueue(self, key=None, delay=0, **payload):
+        """
+        Queue a run with ``payload`` (JSON-serializable keyword arguments;
+        batch tasks get a list of them). Returns the job, or the existing
+        one if ``key`` is already taken.
+        """
+        fields = {
+            'name': self.name, 'payload': payload, 'max_attempts': self.max_attempts,
+            'run_at': timezone.now() + timedelta(seconds=delay),
+        }
+        if key is None:
+            job = Job.objects.create(**fields)
+        else:
+            job, created = Job.objects.get_or_create(idempotency_key=key, defaults=fields)
+            if not created:
+                return job
+        if _config()['EAGER']:
+            execute(self, [job], savepoint=True)
+        return job
+
+
+def task(func=None, *, name=None, max_attempts=5, backoff=30, batch=None):
+    """Register ``func`` as a task; see the module docstring."""
+    def register(func):
+        task = Task(func, name or f'{func.__module__}.{func.__qualname__}', max_attempts, backoff, batch)
+        REGISTRY[task.name] = task
+        return task
+    return register(func) if func is not None else register
+
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}'
+
+
+def claim(worker=None):
+    """
+    Lock the oldest due job - plus, for a batch task, further due jobs of
+    the same task - for ``worker``. Returns ``(task, jobs)``; ``jobs`` is
+    empty when nothing is due.
+    """
+    now = timezone.now()
+    due = Job.objects.filter(
+        Q(status=Job.PENDING, run_at__lte=now)
+        | Q(status=Job.RUNNING, locked_at__lt=now - timedelta(seconds=_config()['LEASE']))
+    ).order_by('run_at', 'pk')
+    # SQLite locks the database for the whole transaction (see
+    # settings/database.py); elsewhere skip_locked keeps workers apart.
+    with transaction.atomic():
+        first = due.select_for_update(skip_locked=True).first()
+        if first is None:
+            return None, []
+        task = REGISTRY.get(first.name)
+        if task is None:
+            Job.objects.filter(pk=first.pk).update(
+                status=Job.FAILED, last_error=f'Unknown task {first.name!r}.', finished_at=now,
+            )
+            return None, [first]
+        if task.batch:
+            jobs = list(due.filter(name=first.name).select_for_update(skip_locked=True)[:task.batch])
+        else:
+            jobs = [first]
+        Job.objects.filter(pk__in=[job.pk for job in jobs]).update(
+            status=Job.RUNNING, locked_by=worker or worker_name(), locked_at=now,
+        )
+    return task, jobs
+
+
+def execute(task, jobs, savepoint=False):
+    """
+    Run ``jobs`` of ``task`` and record success, a retry or the failure.
+    Eager jobs run in a savepoint, so a failure leaves the caller's
+    transaction usable; otherwise tasks run in autocommit, so a long job
+    can checkpoint its progress and holds no database lock.
+    """
+    try:
+        with transaction.atomic() if savepoint else nullcontext():
+            if task.batch:
+                task.func([job.payload for job in jobs])
+            else:
+                task.func(**jobs[0].payload)
+    except Exception:
+        error = traceback.format_exc()
+        logger.exception('Task %s failed (jobs %s)', task.name, [job.pk for job in jobs])
+        now = timezone.now()
+        for job in jobs:
+            job.attempts += 1
+            job.last_error = error
+            job.locked_by, job.locked_at = '', None
+            if job.attempts >= job.max_attempts:
+                job.status, job.finished_at = Job.FAILED, now
+            else:
+                job.status = Job.PENDING
+                job.run_at = now + timedelta(seconds=task.backoff * 2 ** (job.attempts - 1))
+        Job.objects.bulk_update(
+            jobs, ['attempts', 'last_error', 'locked_by', 'locked_at', 'status', 'finished_at', 'run_at'],
+        )
+        return False
+    Job.objects.filter(pk__in=[job.pk for job in jobs]).update(
+        status=Job.DONE, attempts=F('attempts') + 1, locked_by='', locked_at=None,
+        finished_at=timezone.now(),
+    )
+    return True
+
+
+def purge(days=None):
+    """Delete done jobs older than ``days`` (the RETENTION_DAYS setting by default)."""
+    days = _config()['RETENTION_DAYS'] if days is None else days
+    cutoff = timezone.now() - timedelta(days=days)
+    return Job.objects.filter(status=Job.DONE, finished_at__lt=cutoff).delete()[0]
+
+
+def work(stop=None, once=False, worker=None):
+    """
+    Claim and run jobs until ``stop`` (a threading or multiprocessing
+    Event) is set or, with ``once``, until none are due. Returns the number
+    of jobs run.
+    """
+    stop = stop or threading.Event()
+    worker = worker or worker_name()
+    interval = _config()['POLL_INTERVAL']
+    count = 0
+    while not stop.is_set():
+        task, jobs = claim(worker)
+        if task is not None:
+            execute(task, jobs)
+            count += len(jobs)
+        elif not jobs:
+            if once:
+                break
+            close_old_connections()
+            stop.wait(interval)
+    return count
+
+
+def run_pending():
+    """Run every due job in this thread; for tests and one-off use."""
+    return work(once=True)
@@ -0,0 +1,79 @@
+# ai_tools/ratings.py
+from django.db.models import Case, Count, F, FloatField, Q, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce
+from django.utils import timezone
+
+from . import representations
+from .models import AITool, Comparison
+
+# Stored histogram column for each star value.
+HISTOGRAM_FIELDS = {rating: f'rating_{rating}_count' for rating in range(1, 6)}
+AGGREGATE_FIELDS = ('rating_count', 'rating_sum', 'rating_average', *HISTOGRAM_FIELDS.values())
+
+
+def apply_delta(tool_id, rating, sign):
+    """
+    Add (``sign=1``) or remove (``sign=-1``) one approved ``rating`` from the
+    stored aggregates of a tool, in a single atomic UPDATE.
+    """
+    count = F('rating_count') + sign
+    total = F('rating_sum') + sign * rating
+    AITool.objects.filter(pk=tool_id).update(
+        rating_count=count,
+        rating_sum=total,
+        # Right-hand sides see the pre-update values, so the average is
+        # computed from the same deltas.
+        rating_average=Case(
+            When(rating_count=-sign, then=Value(0.0)),
+            default=Cast(total, FloatField()) / count,
+            output_field=FloatField(),
+        ),
+        **{HISTOGRAM_FIELDS[rating]: F(HISTOGRAM_FIELDS[rating]) + sign},
+    )
+
+
+def recompute(tool_ids=None, dry_run=False):
+    """
+    Recompute the aggregates of ``tool_ids`` (all tools when None) from
+    approved reviews in one grouped query and fix any that drifted.
+
+    Returns ``[(tool_id, stored, actual), ...]`` for the tools that differed.
+    """
+    approved = Q(reviews__is_approved=True)
+    queryset = AITool.objects.all()
+    if tool_ids is not None:
+        queryset = queryset.filter(pk__in=tool_ids)
+    rows = queryset.order_by().values('pk', *AGGREGATE_FIELDS).annotate(
+        actual_count=Count('reviews', filter=approved),
+        actual_sum=Coalesce(Sum('reviews__rating', filter=approved), 0),
+        **{
+            f'actual_{rating}': Count('reviews', filter=approved & Q(reviews__rating=rating))
+            for rating in HISTOGRAM_FIELDS
+        },
+    )
+
+    drifted, updates, now = [], [], timezone.now()
+    for row in rows:
+        actual = {
+            'rating_count': row['actual_count'],
+            'rating_sum': row['actual_sum'],
+            'rating_average': row['actual_sum'] / row['actual_count'] if row['actual_count'] else 0.0,
+            **{field: row[f'actual_{rating}'] for rating, field in HISTOGRAM_FIELDS.items()},
+        }
+        stored = {field: row[field] for field in AGGREGATE_FIELDS}
+        if any(
+            abs(stored[field] - actual[field]) > 1e-9 if field == 'rating_average' else stored[field] != actual[field]
+            for field in AGGREGATE_FIELDS
+        ):
+            drifted.append((row['pk'], stored, actual))
+            updates.append(AITool(pk=row['pk'], updated_at=now, **actual))
+
+    if updates and not dry_run:
+        AITool.objects.bulk_update(updates, [*AGGREGATE_FIELDS, 'updated_at'], batch_size=500)
+        # bulk_update() skips the save signals: comparisons nest the fixed
+        # tools, and cached representations embed the old aggregates.
+        fixed = [tool.pk for tool in updates]
+        for start in range(0, len(fixed), 500):
+            Comparison.objects.filter(tools__in=fixed[start:start + 500]).update(updated_at=now)
+        representations.invalidate(AITool, fixed)
+    return drifted
@@ -0,0 +1,96 @@
+# ai_tools/renderers.py
+import functools
+import json
+import re
+from collections.abc import Mapping
+
+from rest_framework import renderers
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# A RawJSON placeholder as it comes out of the encoder.
+MARKER = re.compile(rb'"\\u0000(\d+)\\u0000"')
+# Dates and times go through DRF's encoder, which writes UTC as 'Z'.
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME if orjson else 0
+
+
+class RawJSON(Mapping):
+    """
+    An already-encoded JSON object (bytes), written into the output as is
+    by ``JSONRenderer``. Reading it as a mapping decodes it, for code that
+    inspects ``response.data``.
+    """
+
+    __slots__ = ('encoded', '_decoded')
+
+    def __init__(self, encoded):
+        self.encoded = encoded
+        self._decoded = None
+
+    def _data(self):
+        if self._decoded is None:
+            self._decoded = json.loads(self.encoded)
+        return self._decoded
+
+    def __getitem__(self, key):
+        return self._data()[key]
+
+    def __iter__(self):
+        return iter(self._data())
+
+    def __len__(self):
+        return len(self._data())
+
+
+class FragmentEncoder(JSONEncoder):
+    def __init__(self, *args, fragments, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fragments = fragments
+
+    def default(self, obj):
+        if isinstance(obj, RawJSON):
+            self.fragments.append(obj.encoded)
+            # NUL is always escaped and never gets through form or model
+            # validation, so the placeholder cannot clash with real text.
+            return f'\x00{len(self.fragments) - 1}\x00'
+        return super().default(obj)
+
+
+_encoder = JSONEncoder()
+
+
+def _orjson_default(obj):
+    if isinstance(obj, RawJSON):
+        return orjson.Fragment(obj.encoded)
+    return _encoder.default(obj)
+
+
+class JSONRenderer(renderers.JSONRenderer):
+    """
+    DRF's JSON renderer, plus ``RawJSON`` values (cached representations;
+    see app/representations.py) spliced into the output unchanged.
+
+    Compact output is encoded with orjson when it is installed, several
+    times faster than the json module; indented output (the browsable API,
+    ``?indent=``) and installs without orjson use DRF's encoder.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if orjson is not None and self.compact and not self.ensure_ascii and not indent:
+            rendered = orjson.dumps(data, default=_orjson_default, option=ORJSON_OPTIONS)
+            # As DRF does: these are valid in JSON but end a JavaScript line.
+            return rendered.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        fragments = []
+        # Renderers are instantiated per response.
+        self.encoder_class = functools.partial(FragmentEncoder, fragments=fragments)
+        rendered = super().render(data, accepted_media_type, renderer_context)
+        if not fragments:
+            return rendered
+        return MARKER.sub(lambda match: fragments[int(match[1])], rendered)
@@ -0,0 +1,156 @@
+# ai_tools/representations.py
+"""
+Cached JSON representations of API objects.
+
+An entry is keyed by model, serializer and primary key, and holds the
+object's version (see ``CachedRepresentationMixin`` in app/mixins.py) and
+one JSON fragment per variant: the scheme and host, which absolute media
+URLs embed, plus any ``?fields=``/``?expand=`` selection. Lookups go through two tiers:
+
+- a bounded in-process LRU of at most LOCAL_MAX_BYTES of fragments;
+- the shared Django cache CACHE, so workers fill each other's misses.
+
+An entry stored for another version is a miss, so whichever process
+changed an object, it is never served stale. Saves and deletes of a tool
+or its children also drop its entries outright (``invalidate``, called
+from app/signals.py) rather than leaving them to expire. Hits, misses and
+evictions are counted in the metrics registry (``/metrics``).
+"""
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .metrics import registry
+from .models import AITool
+from .serializers import AIToolListSerializer, AIToolSerializer
+
+KEY = 'repr:{}:{}:{}'
+
+# The representations cached for each model; ``invalidate`` drops all of them.
+SERIALIZERS = {
+    AITool: (AIToolSerializer, AIToolListSerializer),
+}
+
+
+def _config():
+    return {
+        'CACHE': 'default',
+        'LOCAL_MAX_BYTES': 32 * 1024 * 1024,
+        'TIMEOUT': 7 * 24 * 60 * 60,
+        **getattr(settings, 'REPRESENTATION_CACHE', {}),
+    }
+
+
+class LRU:
+    """Entries ``(version, {variant: bytes})``, least recently used dropped first over ``max_bytes``."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _size(entry):
+        return sum(map(len, entry[1].values()))
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        """Store ``entry``; returns the number of entries evicted to make room."""
+        evicted = 0
+        with self._lock:
+            self._pop(key)
+            self._entries[key] = entry
+            self.size += self._size(entry)
+            while self.size > self.max_bytes and len(self._entries) > 1:
+                self._pop(next(iter(self._entries)))
+                evicted += 1
+        return evicted
+
+    def delete(self, key):
+        with self._lock:
+            self._pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def _pop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= self._size(entry)
+
+
+local = LRU(_config()['LOCAL_MAX_BYTES'])
+
+
+def _count(event, serializer, amount):
+    if amount:
+        registry.increment('representation_cache_total', (('event', event), ('serializer', serializer)), amount)
+
+
+def _key(model, serializer_class, pk):
+    return KEY.format(model._meta.label_lower, serializer_class.__name__, pk)
+
+
+def get_many(model, serializer_class, variant, versions):
+    """
+    Return ``{pk: bytes}`` for the objects in ``versions`` (``{pk: version}``)
+    cached at that version for ``variant``.
+    """
+    serializer = serializer_class.__name__
+    keys = {pk: _key(model, serializer_class, pk) for pk in versions}
+    found, shared_keys = {}, []
+    for pk, key in keys.items():
+        entry = local.get(key)
+        if entry is not None and entry[0] == versions[pk] and variant in entry[1]:
+            found[pk] = entry[1][variant]
+        else:
+            shared_keys.append(key)
+    _count('local_hit', serializer, len(found))
+
+    shared_hits = 0
+    if shared_keys:
+        by_key = {key: pk for pk, key in keys.items()}
+        for key, entry in caches[_config()['CACHE']].get_many(shared_keys).items():
+            pk = by_key[key]
+            if entry[0] == versions[pk] and variant in entry[1]:
+                found[pk] = entry[1][variant]
+                shared_hits += 1
+                _count('eviction', serializer, local.set(key, entry))
+    _count('shared_hit', serializer, shared_hits)
+    _count('miss', serializer, len(versions) - len(found))
+    return found
+
+
+def set_many(model, serializer_class, variant, fragments, versions):
+    """Store ``fragments`` (``{pk: bytes}``) at their ``versions`` in both tiers."""
+    config = _config()
+    serializer = serializer_class.__name__
+    entries = {}
+    for pk, fragment in fragments.items():
+        key = _key(model, serializer_class, pk)
+        # Keep the other variants' fragments of the same version.
+        previous = local.get(key)
+        variants = dict(previous[1]) if previous is not None and previous[0] == versions[pk] else {}
+        variants[variant] = fragment
+        entries[key] = (versions[pk], variants)
+        _count('eviction', serializer, local.set(key, entries[key]))
+    caches[config['CACHE']].set_many(entries, timeout=config['TIMEOUT'])
+
+
+def invalidate(model, pks):
+    """Drop every cached representation of objects ``pks`` from both tiers."""
+    keys = [_key(model, serializer_class, pk) for pk in pks for serializer_class in SERIALIZERS[model]]
+    for key in keys:
+        local.delete(key)
+    caches[_config()['CACHE']].delete_many(keys)
@@ -4,7 +4,7 @@ from .viewsets import (
     CategoryViewSet, PricingPlanViewSet, AIToolViewSet, ToolImageViewSet,
     ToolVideoViewSet, FeatureViewSet, ReviewViewSet, ComparisonViewSet,
     ArticleViewSet, NewsletterSubscriberViewSet, ContactSubmissionViewSet,
-    ToolSubmissionViewSet, SiteStatViewSet
+    ToolSubmissionViewSet, SiteStatViewSet, SearchViewSet, AutocompleteViewSet
 )
 
 router = DefaultRouter()
@@ -21,5 +21,7 @@ router.register(r'newsletter-subscribers', NewsletterSubscriberViewSet)
 router.register(r'contact-submissions', ContactSubmissionViewSet)
 router.register(r'tool-submissions', ToolSubmissionViewSet)
 router.register(r'site-stats', SiteStatViewSet)
+router.register(r'search', SearchViewSet, basename='search')
+router.register(r'autocomplete', AutocompleteViewSet, basename='autocomplete')
 
 urlpatterns = router.urls
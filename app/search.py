@@ -0,0 +1,232 @@
+# ai_tools/search.py
+import re
+from functools import reduce
+from operator import or_
+
+from django.db import connections, router, transaction
+from django.db.models import Q
+
+from .models import AITool, Article, Comparison
+
+INDEX_TABLE = 'app_search_index'
+
+# How each searchable model maps onto the index columns.
+DOCUMENTS = {
+    'tool': {
+        'model': AITool,
+        'columns': ('name', 'short_description', 'long_description'),
+        'public': {},
+    },
+    'article': {
+        'model': Article,
+        'columns': ('title', 'excerpt', 'content'),
+        'public': {'is_published': True},
+    },
+    'comparison': {
+        'model': Comparison,
+        'columns': ('title', None, 'content'),
+        'public': {'is_published': True},
+    },
+}
+
+# BM25 weights for the title, summary and body columns.
+WEIGHTS = (10.0, 4.0, 1.0)
+
+CREATE_INDEX_SQL = (
+    f'CREATE VIRTUAL TABLE IF NOT EXISTS {INDEX_TABLE} USING fts5('
+    'kind UNINDEXED, object_id UNINDEXED, slug UNINDEXED, '
+    "title, summary, body, tokenize = 'porter unicode61')"
+)
+
+
+def kind_for_model(model):
+    for kind, document in DOCUMENTS.items():
+        if document['model'] is model:
+            return kind
+    return None
+
+
+# Aliases whose database is known to have the FTS5 table.
+_fts_aliases = set()
+
+
+def _connection(for_write=False):
+    alias = router.db_for_write(AITool) if for_write else router.db_for_read(AITool)
+    return connections[alias]
+
+
+def uses_fts(connection=None):
+    connection = connection or _connection()
+    if connection.vendor != 'sqlite':
+        return False
+    if connection.alias not in _fts_aliases:
+        if INDEX_TABLE not in connection.introspection.table_names():
+            return False
+        _fts_aliases.add(connection.alias)
+    return True
+
+
+def _row(kind, instance):
+    title, summary, body = (
+        getattr(instance, column) if column else '' for column in DOCUMENTS[kind]['columns']
+    )
+    return (kind, instance.pk, instance.slug, title, summary or '', body or '')
+
+
+def _is_public(kind, instance):
+    return all(getattr(instance, field) == value for field, value in DOCUMENTS[kind]['public'].items())
+
+
+def index_object(instance):
+    """Add, refresh or drop ``instance`` in the index depending on its state."""
+    kind = kind_for_model(type(instance))
+    connection = _connection(for_write=True)
+    if kind is None or not uses_fts(connection):
+        return
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {INDEX_TABLE} WHERE kind = %s AND object_id = %s', [kind, instance.pk]
+        )
+        if _is_public(kind, instance):
+            cursor.execute(
+                f'INSERT INTO {INDEX_TABLE} (kind, object_id, slug, title, summary, body) '
+                'VALUES (%s, %s, %s, %s, %s, %s)',
+                _row(kind, instance),
+            )
+
+
+def index_objects(model, pks, batch_size=1000):
+    """Refresh the index rows of many ``model`` objects at once (bulk writes skip signals)."""
+    kind = kind_for_model(model)
+    connection = _connection(for_write=True)
+    if kind is None or not uses_fts(connection) or not pks:
+        return
+    document = DOCUMENTS[kind]
+    columns = [column for column in document['columns'] if column]
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        for start in range(0, len(pks), batch_size):
+            chunk = list(pks[start:start + batch_size])
+            placeholders = ', '.join(['%s'] * len(chunk))
+            cursor.execute(
+                f'DELETE FROM {INDEX_TABLE} WHERE kind = %s AND object_id IN ({placeholders})',
+                [kind, *chunk],
+            )
+            queryset = model._default_manager.filter(pk__in=chunk, **document['public'])
+            _insert(cursor, [_row(kind, instance) for instance in queryset.only('slug', *columns)])
+
+
+def remove_object(instance):
+    kind = kind_for_model(type(instance))
+    connection = _connection(for_write=True)
+    if kind is None or not uses_fts(connection):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {INDEX_TABLE} WHERE kind = %s AND object_id = %s', [kind, instance.pk]
+        )
+
+
+def rebuild_index(batch_size=1000, using=None, models=None):
+    """Repopulate the index from scratch; return the number of indexed rows."""
+    connection = connections[using] if using else _connection(for_write=True)
+    if connection.vendor != 'sqlite':
+        return 0
+    total = 0
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(CREATE_INDEX_SQL)
+        cursor.execute(f'DELETE FROM {INDEX_TABLE}')
+        for kind, document in DOCUMENTS.items():
+            model = (models or {}).get(kind, document['model'])
+            columns = [column for column in document['columns'] if column]
+            queryset = model._default_manager.using(connection.alias).filter(**document['public'])
+            queryset = queryset.only('slug', *columns)
+            batch = []
+            for instance in queryset.iterator(chunk_size=batch_size):
+                batch.append(_row(kind, instance))
+                if len(batch) >= batch_size:
+                    total += _insert(cursor, batch)
+                    batch = []
+            total += _insert(cursor, batch)
+        # Merge the index b-trees written by the bulk load.
+        cursor.execute(f"INSERT INTO {INDEX_TABLE} ({INDEX_TABLE}) VALUES ('optimize')")
+    return total
+
+
+def _insert(cursor, rows):
+    if rows:
+        cursor.executemany(
+            f'INSERT INTO {INDEX_TABLE} (kind, object_id, slug, title, summary, body) '
+            'VALUES (%s, %s, %s, %s, %s, %s)',
+            rows,
+        )
+    return len(rows)
+
+
+def match_expression(query):
+    """
+    Turn free text into a safe FTS5 MATCH expression: every word must match,
+    and the last one is treated as a prefix so partial input finds results.
+    """
+    terms = re.findall(r'\w+', query.lower())
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+def search(query, kinds=None, limit=20, offset=0):
+    """
+    Return up to ``limit`` results for ``query`` as dicts, best match first.
+    """
+    kinds = [kind for kind in (kinds or DOCUMENTS) if kind in DOCUMENTS]
+    connection = _connection()
+    if uses_fts(connection):
+        return _search_fts(connection, query, kinds, limit, offset)
+    return _search_fallback(query, kinds, limit, offset)
+
+
+def _search_fts(connection, query, kinds, limit, offset):
+    expression = match_expression(query)
+    if expression is None or not kinds:
+        return []
+    placeholders = ', '.join(['%s'] * len(kinds))
+    weights = ', '.join(str(weight) for weight in WEIGHTS)
+    sql = (
+        f'SELECT kind, object_id, slug, title, summary, bm25({INDEX_TABLE}, 0, 0, 0, {weights}) AS score '
+        f'FROM {INDEX_TABLE} WHERE {INDEX_TABLE} MATCH %s AND kind IN ({placeholders}) '
+        'ORDER BY score LIMIT %s OFFSET %s'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [expression, *kinds, limit, offset])
+        return [
+            {'type': kind, 'id': object_id, 'slug': slug, 'title': title,
+             'summary': summary, 'score': -score}
+            for kind, object_id, slug, title, summary, score in cursor.fetchall()
+        ]
+
+
+def _search_fallback(query, kinds, limit, offset):
+    # Backends without FTS5: substring match on every word, title hits first.
+    terms = re.findall(r'\w+', query)
+    if not terms:
+        return []
+    results = []
+    for kind in kinds:
+        document = DOCUMENTS[kind]
+        title, summary, body = document['columns']
+        columns = [column for column in document['columns'] if column]
+        queryset = document['model']._default_manager.filter(**document['public'])
+        for term in terms:
+            queryset = queryset.filter(reduce(or_, (Q(**{f'{c}__icontains': term}) for c in columns)))
+        for row in queryset.values('pk', 'slug', *columns)[:offset + limit]:
+            score = sum(
+                weight for column, weight in zip((title, summary, body), WEIGHTS)
+                if column and any(term.lower() in (row[column] or '').lower() for term in terms)
+            )
+            results.append({
+                'type': kind, 'id': row['pk'], 'slug': row['slug'], 'title': row[title],
+                'summary': row[summary] if summary else '', 'score': score,
+            })
+    results.sort(key=lambda result: -result['score'])
+    return results[offset:offset + limit]
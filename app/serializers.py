@@ -1,79 +1,265 @@
 
+import operator
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import QuerySet
+from django.db.models.manager import BaseManager
 from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField, PrimaryKeyRelatedField
+
+from . import fieldsets, images
 from .models import (
     Category, PricingPlan, AITool, ToolImage, ToolVideo, Feature,
     Review, Comparison, Article, NewsletterSubscriber, ContactSubmission,
     ToolSubmission, SiteStat
 )
 
-class CategorySerializer(serializers.ModelSerializer):
+class ImageVariantsField(serializers.ReadOnlyField):
+    """
+    ``{format: {width: url}}`` for the resized variants of an image field,
+    built from its stored digest without touching storage; see app/images.py.
+    """
+
+    def __init__(self, image_field, **kwargs):
+        super().__init__(source=f'{image_field}_digest', **kwargs)
+
+    def to_representation(self, value):
+        return images.variant_urls(value)
+
+# Fields whose representation of a column's value is the value itself.
+PLAIN_FIELDS = {
+    serializers.BooleanField, serializers.CharField, serializers.ChoiceField, serializers.EmailField,
+    serializers.FloatField, serializers.IntegerField, serializers.ReadOnlyField, serializers.SlugField,
+    serializers.URLField,
+}
+
+class ValuesListSerializer(serializers.ListSerializer):
+    """
+    Read-only fast path for ``many=True`` on the hot list endpoints, set as
+    a serializer's ``Meta.list_serializer_class``.
+
+    Rather than dispatching every field of every object through
+    ``get_attribute`` and ``to_representation``, it reads the columns off the
+    instances in one ``attrgetter`` call (or as ``.values_list()`` rows when
+    given a queryset) and converts only the fields whose representation
+    differs from the stored value, with the child's own fields. Many-to-many
+    primary keys come from one query for the whole list unless prefetched.
+    The output is the same as ``ListSerializer``'s, which it falls back to
+    for children with fields that are not plain columns.
+    """
+
+    def to_representation(self, data):
+        plan = self._plan()
+        if plan is None:
+            return super().to_representation(data)
+        names, attnames, steps = plan
+        if isinstance(data, BaseManager):
+            data = data.all()
+        if isinstance(data, QuerySet):
+            instances, rows = None, list(data.values_list('pk', *attnames))
+        else:
+            instances = list(data)
+            get = operator.attrgetter('pk', *attnames)
+            rows = [get(instance) for instance in instances]
+        pks = [row[0] for row in rows]
+        related = {
+            name: self._related_pks(name, model_field, instances, pks)
+            for name, (kind, model_field) in steps.items() if kind == 'many'
+        }
+
+        results = []
+        for position, row in enumerate(rows):
+            values = []
+            for name in names:
+                kind, argument = steps[name]
+                if kind == 'many':
+                    values.append(related[name][position])
+                    continue
+                value = row[kind]
+                values.append(value if argument is None or value is None else argument(value))
+            results.append(dict(zip(names, values)))
+        return results
+
+    def _plan(self):
+        """
+        Return ``(field names, column attnames, {name: step})``, where a step
+        is ``(position in the row, converter or None)`` or ``('many', model
+        field)``; None if a field is not backed by a column.
+        """
+        opts = self.child.Meta.model._meta
+        names, attnames, steps = [], [], {}
+        for field in self.child._readable_fields:
+            if len(field.source_attrs) != 1:
+                return None
+            try:
+                model_field = opts.get_field(field.source)
+            except FieldDoesNotExist:
+                return None
+            if isinstance(field, ManyRelatedField):
+                child = field.child_relation
+                if not model_field.concrete or type(child) is not PrimaryKeyRelatedField or child.pk_field:
+                    return None
+                steps[field.field_name] = ('many', model_field)
+            elif not model_field.concrete or model_field.many_to_many:
+                return None
+            else:
+                if isinstance(field, PrimaryKeyRelatedField):
+                    if field.pk_field:
+                        return None
+                    convert = None
+                elif isinstance(field, serializers.FileField):
+                    convert = self._file_converter(field, model_field)
+                else:
+                    convert = None if type(field) in PLAIN_FIELDS else field.to_representation
+                attnames.append(model_field.attname)
+                steps[field.field_name] = (len(attnames), convert)
+            names.append(field.field_name)
+        return names, attnames, steps
+
+    def _file_converter(self, field, model_field):
+        # FileField.to_representation, from the stored name.
+        request = self.context.get('request')
+
+        def convert(value):
+            name = getattr(value, 'name', value)
+            if not name:
+                return None
+            if not getattr(field, 'use_url', True):
+                return name
+            url = model_field.storage.url(name)
+            return request.build_absolute_uri(url) if request is not None else url
+        return convert
+
+    @staticmethod
+    def _related_pks(name, model_field, instances, pks):
+        """For each of ``pks``, the primary keys of its related objects, in their model's ordering."""
+        prefetched = instances is not None and all(
+            name in getattr(obj, '_prefetched_objects_cache', ()) for obj in instances
+        )
+        if prefetched:
+            return [[related.pk for related in obj._prefetched_objects_cache[name]] for obj in instances]
+        source, target = model_field.m2m_field_name(), model_field.m2m_reverse_field_name()
+        ordering = [
+            f"{'-' if order.startswith('-') else ''}{target}__{order.lstrip('-')}"
+            for order in model_field.related_model._meta.ordering if isinstance(order, str)
+        ]
+        by_pk = {pk: [] for pk in pks}
+        links = model_field.remote_field.through.objects.filter(**{f'{source}__in': pks})
+        for source_pk, target_pk in links.order_by(*ordering, 'pk').values_list(source, target):
+            by_pk[source_pk].append(target_pk)
+        return [by_pk[pk] for pk in pks]
+
+class DynamicFieldsModelSerializer(serializers.ModelSerializer):
+    """
+    A ModelSerializer whose fields follow the request's ``?fields=`` and
+    ``?expand=`` on reads; see app/fieldsets.py.
+    """
+
+    def get_fields(self):
+        return fieldsets.select(self, super().get_fields())
+
+class CategorySerializer(DynamicFieldsModelSerializer):
     class Meta:
         model = Category
         fields = '__all__'
+        list_serializer_class = ValuesListSerializer
 
-class PricingPlanSerializer(serializers.ModelSerializer):
+class PricingPlanSerializer(DynamicFieldsModelSerializer):
     class Meta:
         model = PricingPlan
         fields = '__all__'
 
-class ToolImageSerializer(serializers.ModelSerializer):
+class ToolImageSerializer(DynamicFieldsModelSerializer):
+    image_variants = ImageVariantsField('image')
+
     class Meta:
         model = ToolImage
         fields = '__all__'
 
-class ToolVideoSerializer(serializers.ModelSerializer):
+class ToolVideoSerializer(DynamicFieldsModelSerializer):
     class Meta:
         model = ToolVideo
         fields = '__all__'
 
-class FeatureSerializer(serializers.ModelSerializer):
+class FeatureSerializer(DynamicFieldsModelSerializer):
     class Meta:
         model = Feature
         fields = '__all__'
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(DynamicFieldsModelSerializer):
     class Meta:
         model = Review
         fields = '__all__'
 
-class AIToolSerializer(serializers.ModelSerializer):
+class AIToolSerializer(DynamicFieldsModelSerializer):
     features = FeatureSerializer(many=True, read_only=True)
     images = ToolImageSerializer(many=True, read_only=True)
     videos = ToolVideoSerializer(many=True, read_only=True)
     reviews = ReviewSerializer(many=True, read_only=True)
+    rating_histogram = serializers.DictField(child=serializers.IntegerField(), read_only=True)
+    logo_variants = ImageVariantsField('logo')
 
     class Meta:
         model = AITool
         fields = '__all__'
 
-class ComparisonSerializer(serializers.ModelSerializer):
+class AIToolListSerializer(DynamicFieldsModelSerializer):
+    # Compact card representation used by the list endpoint; the full nested
+    # shape is only served on retrieve.
+    logo_variants = ImageVariantsField('logo')
+
+    class Meta:
+        model = AITool
+        fields = (
+            'id', 'name', 'slug', 'short_description', 'website_url', 'logo',
+            'logo_variants', 'logo_url', 'featured', 'pricing_type', 'categories', 'is_verified',
+            'views', 'rating_count', 'rating_average', 'created_at',
+        )
+        read_only_fields = fields
+        list_serializer_class = ValuesListSerializer
+
+class RelatedToolSerializer(AIToolListSerializer):
+    # A card plus its similarity to the tool the neighbours were asked for.
+    similarity = serializers.SerializerMethodField()
+
+    class Meta(AIToolListSerializer.Meta):
+        fields = AIToolListSerializer.Meta.fields + ('similarity',)
+        read_only_fields = fields
+
+    def get_similarity(self, tool):
+        return round(tool.similarity, 4)
+
+class ComparisonSerializer(DynamicFieldsModelSerializer):
     tools = AIToolSerializer(many=True, read_only=True)
 
     class Meta:
         model = Comparison
         fields = '__all__'
 
-class ArticleSerializer(serializers.ModelSerializer):
+class ArticleSerializer(DynamicFieldsModelSerializer):
+    featured_image_variants = ImageVariantsField('featured_image')
+
     class Meta:
         model = Article
         fields = '__all__'
+        list_serializer_class = ValuesListSerializer
 
-class NewsletterSubscriberSerializer(serializers.ModelSerializer):
+class NewsletterSubscriberSerializer(DynamicFieldsModelSerializer):
     class Meta:
         model = NewsletterSubscriber
         fields = '__all__'
 
-class ContactSubmissionSerializer(serializers.ModelSerializer):
+class ContactSubmissionSerializer(DynamicFieldsModelSerializer):
     class Meta:
         model = ContactSubmission
         fields = '__all__'
 
-class ToolSubmissionSerializer(serializers.ModelSerializer):
+class ToolSubmissionSerializer(DynamicFieldsModelSerializer):
     class Meta:
         model = ToolSubmission
         fields = '__all__'
 
-class SiteStatSerializer(serializers.ModelSerializer):
+class SiteStatSerializer(DynamicFieldsModelSerializer):
     class Meta:
         model = SiteStat
         fields = '__all__'
@@ -0,0 +1,291 @@
+# ai_tools/signals.py
+from django.db.models import QuerySet
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import autocomplete, categories, facets, homepage, images, ratings, representations, search, tasks
+from .models import (
+    Category, PricingPlan, AITool, SiteStat, Article, Comparison, Review, Feature, ToolImage, ToolVideo,
+    ContactSubmission, ToolSubmission
+)
+
+
+@receiver(post_save, sender=AITool)
+@receiver(post_delete, sender=AITool)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Article)
+@receiver(post_delete, sender=Article)
+@receiver(post_save, sender=SiteStat)
+@receiver(post_delete, sender=SiteStat)
+def invalidate_homepage(sender, **kwargs):
+    homepage.mark_stale(sender)
+
+
+@receiver(m2m_changed, sender=AITool.categories.through)
+def invalidate_homepage_categories(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        homepage.mark_stale(Category)
+
+
+@receiver(post_save, sender=AITool)
+@receiver(post_delete, sender=AITool)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=PricingPlan)
+@receiver(post_delete, sender=PricingPlan)
+def invalidate_facets(sender, raw=False, **kwargs):
+    if not raw:
+        facets.mark_stale()
+
+
+@receiver(m2m_changed, sender=AITool.categories.through)
+@receiver(m2m_changed, sender=AITool.pricing_plans.through)
+def invalidate_facets_on_m2m_change(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        facets.mark_stale()
+
+
+@receiver(post_save, sender=AITool)
+@receiver(post_delete, sender=AITool)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_autocomplete(sender, raw=False, **kwargs):
+    if not raw:
+        autocomplete.mark_stale()
+
+
+@receiver(post_save, sender=AITool)
+@receiver(post_save, sender=Article)
+@receiver(post_save, sender=Comparison)
+def update_search_index(sender, instance, **kwargs):
+    search.index_object(instance)
+
+
+@receiver(post_delete, sender=AITool)
+@receiver(post_delete, sender=Article)
+@receiver(post_delete, sender=Comparison)
+def remove_from_search_index(sender, instance, **kwargs):
+    search.remove_object(instance)
+
+
+@receiver(pre_save, sender=Review)
+def remember_review_rating(sender, instance, raw=False, **kwargs):
+    # What the row contributed before this save, so post_save can apply
+    # only the difference.
+    instance._rating_before = None
+    if instance.pk and not raw:
+        instance._rating_before = (
+            sender.objects.filter(pk=instance.pk)
+            .values_list('tool_id', 'rating', 'is_approved')
+            .first()
+        )
+
+
+@receiver(post_save, sender=Review)
+def update_rating_aggregates(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    before = getattr(instance, '_rating_before', None)
+    after = (instance.tool_id, instance.rating, instance.is_approved)
+    if before == after:
+        return
+    if before and before[2]:
+        ratings.apply_delta(before[0], before[1], -1)
+    if instance.is_approved:
+        ratings.apply_delta(instance.tool_id, instance.rating, 1)
+
+
+@receiver(post_delete, sender=Review)
+def remove_rating_from_aggregates(sender, instance, origin=None, **kwargs):
+    if instance.is_approved and not deleting_tools(origin):
+        ratings.apply_delta(instance.tool_id, instance.rating, -1)
+
+
+def touch_tools(tool_ids):
+    """
+    Bump ``updated_at`` on tools (and the comparisons nesting them) whose
+    serialized form changed through a related object, so their HTTP
+    validators change too, and drop their cached representations. Uses
+    update(), so no save signals fire.
+    """
+    now = timezone.now()
+    AITool.objects.filter(pk__in=tool_ids).update(updated_at=now)
+    Comparison.objects.filter(tools__in=tool_ids).update(updated_at=now)
+    representations.invalidate(AITool, tool_ids)
+
+
+def deleting_tools(origin):
+    """Whether a delete started from ``origin`` removes tools (so their children need no upkeep)."""
+    if isinstance(origin, QuerySet):
+        return origin.model is AITool
+    return isinstance(origin, AITool)
+
+
+@receiver(post_save, sender=Feature)
+@receiver(post_save, sender=ToolImage)
+@receiver(post_save, sender=ToolVideo)
+@receiver(post_save, sender=Review)
+def touch_parent_tool(sender, instance, raw=False, **kwargs):
+    if not raw:
+        touch_tools([instance.tool_id])
+
+
+@receiver(pre_delete, sender=Feature)
+@receiver(pre_delete, sender=ToolImage)
+@receiver(pre_delete, sender=ToolVideo)
+@receiver(pre_delete, sender=Review)
+def collect_parent_tool(sender, instance, origin=None, **kwargs):
+    # A delete sends every pre_delete before its first post_delete, so the
+    # parents are gathered on the delete's origin and touched once below.
+    if not deleting_tools(origin):
+        holder = instance if origin is None else origin
+        holder.__dict__.setdefault('_touch_tool_ids', set()).add(instance.tool_id)
+
+
+@receiver(post_delete, sender=Feature)
+@receiver(post_delete, sender=ToolImage)
+@receiver(post_delete, sender=ToolVideo)
+@receiver(post_delete, sender=Review)
+def touch_parent_tools_after_delete(sender, instance, origin=None, **kwargs):
+    tool_ids = getattr(instance if origin is None else origin, '_touch_tool_ids', None)
+    if tool_ids:
+        touch_tools(sorted(tool_ids))
+        tool_ids.clear()
+
+
+@receiver(post_save, sender=AITool)
+@receiver(post_delete, sender=AITool)
+def invalidate_tool_representations(sender, instance, raw=False, **kwargs):
+    if not raw:
+        representations.invalidate(AITool, [instance.pk])
+
+
+@receiver(post_save, sender=AITool)
+def touch_tool_comparisons(sender, instance, raw=False, **kwargs):
+    if not raw:
+        Comparison.objects.filter(tools=instance).update(updated_at=instance.updated_at)
+
+
+@receiver(m2m_changed, sender=AITool.categories.through)
+@receiver(m2m_changed, sender=AITool.pricing_plans.through)
+def touch_tools_on_m2m_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        touch_tools([instance.pk])
+    elif action == 'pre_clear':
+        # Clearing from the category/plan side: the tools are only known
+        # before the links go.
+        links = sender.objects.filter(**{instance._meta.model_name: instance})
+        touch_tools(list(links.values_list('aitool_id', flat=True)))
+    else:
+        touch_tools(pk_set)
+
+
+@receiver(post_save, sender=PricingPlan)
+def touch_plan_tools(sender, instance, raw=False, **kwargs):
+    if not raw:
+        links = AITool.pricing_plans.through.objects.filter(pricingplan=instance)
+        touch_tools(list(links.values_list('aitool_id', flat=True)))
+
+
+@receiver(m2m_changed, sender=Comparison.tools.through)
+def touch_comparison_on_tools_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    comparisons = Comparison.objects.filter(pk=instance.pk)
+    if reverse:
+        comparisons = Comparison.objects.filter(
+            pk__in=pk_set if action != 'pre_clear' else
+            sender.objects.filter(aitool=instance).values('comparison_id')
+        )
+    comparisons.update(updated_at=timezone.now())
+
+
+@receiver(m2m_changed, sender=AITool.categories.through)
+def update_category_tool_counts(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            categories.refresh_tool_counts([instance.pk])
+    elif action == 'pre_clear':
+        instance._cleared_category_ids = list(instance.categories.values_list('pk', flat=True))
+    elif action == 'post_clear':
+        categories.refresh_tool_counts(instance._cleared_category_ids)
+    elif action in ('post_add', 'post_remove'):
+        categories.refresh_tool_counts(pk_set)
+
+
+@receiver(pre_delete, sender=AITool)
+def remember_tool_categories(sender, instance, **kwargs):
+    # The M2M rows are removed by the cascade without m2m_changed.
+    instance._deleted_category_ids = list(instance.categories.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=AITool)
+def update_category_counts_after_delete(sender, instance, **kwargs):
+    categories.refresh_tool_counts(getattr(instance, '_deleted_category_ids', []))
+
+
+@receiver(pre_save, sender=AITool)
+@receiver(pre_save, sender=ToolImage)
+@receiver(pre_save, sender=Article)
+def update_image_digests(sender, instance, raw=False, **kwargs):
+    # New uploads are not written to storage yet; their digest addresses
+    # the resized variants. See app/images.py.
+    instance._new_images = []
+    if raw:
+        return
+    for field in images.IMAGE_FIELDS[sender._meta.label]:
+        file = getattr(instance, field)
+        if not file:
+            setattr(instance, f'{field}_digest', '')
+        elif not file._committed:
+            setattr(instance, f'{field}_digest', images.file_digest(file))
+            instance._new_images.append(field)
+
+
+@receiver(post_save, sender=AITool)
+@receiver(post_save, sender=ToolImage)
+@receiver(post_save, sender=Article)
+def queue_image_variants(sender, instance, **kwargs):
+    # Queued in the same transaction as the upload; one job per content.
+    for field in getattr(instance, '_new_images', ()):
+        digest = getattr(instance, f'{field}_digest')
+        tasks.generate_image_variants.enqueue(
+            key=f'image-variants:{digest}', name=getattr(instance, field).name, digest=digest,
+        )
+
+
+@receiver(post_save, sender=ContactSubmission)
+@receiver(post_save, sender=ToolSubmission)
+def queue_submission_notification(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        kind = 'contact' if sender is ContactSubmission else 'tool'
+        tasks.notify_managers_of_submissions.enqueue(
+            key=f'notify:{kind}:{instance.pk}', kind=kind, pk=instance.pk,
+        )
+
+
+@receiver(post_save, sender=AITool)
+def queue_similarity_update(sender, instance, raw=False, **kwargs):
+    if not raw:
+        tasks.update_similar_tools.enqueue(tool_ids=[instance.pk])
+
+
+@receiver(post_save, sender=Feature)
+@receiver(post_delete, sender=Feature)
+def queue_similarity_update_for_feature(sender, instance, raw=False, origin=None, **kwargs):
+    if not raw and not deleting_tools(origin):
+        tasks.update_similar_tools.enqueue(tool_ids=[instance.tool_id])
+
+
+@receiver(m2m_changed, sender=AITool.categories.through)
+def queue_similarity_update_for_categories(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        tasks.update_similar_tools.enqueue(tool_ids=[instance.pk])
+    elif pk_set:
+        tasks.update_similar_tools.enqueue(tool_ids=sorted(pk_set))
@@ -0,0 +1,460 @@
+# ai_tools/similarity.py
+"""
+Precomputed "related tools".
+
+Each tool is a vector of four weighted, separately L2-normalized groups,
+so the dot product of two tools is the weighted sum of four cosines:
+
+- categories, IDF-weighted one-hot (dense columns);
+- pricing type, one-hot (dense columns);
+- feature names, IDF-weighted one-hot (sparse);
+- TF-IDF over the short and long description, cut to the TOP_TERMS
+  heaviest terms per tool (sparse).
+
+``rebuild()`` fits the vocabulary and IDF over the whole catalog, scores
+every pair in blocks of rows - a matrix product for the dense columns, an
+inverted index over the sparse ones - keeps the top K neighbours of every
+tool in ``ToolSimilarity`` and saves the fitted model as .npy files that
+later processes memory-map. Each saved model lives in its own versioned
+directory and a rebuild only removes versions older than the one
+``model.json`` names, so overlapping rebuilds and readers between
+``model.json`` and the arrays keep their files.
+
+``update(tool_ids)`` re-vectorizes changed tools with the saved model,
+scores them against the saved vectors, replaces their own neighbour
+lists, refreshes their score in every other list they appear in and adds
+them to their new neighbours' lists. Other tools' vectors stay as of the
+last rebuild, so run ``manage.py rebuild_similarity`` periodically.
+"""
+import json
+import logging
+import math
+import os
+import re
+import shutil
+import time
+from collections import Counter, defaultdict
+
+import numpy as np
+from django.conf import settings
+from django.db import connections, router, transaction
+
+from .models import AITool, Feature, ToolSimilarity
+
+logger = logging.getLogger(__name__)
+
+TOKEN = re.compile(r'[a-z0-9]+')
+STOPWORDS = frozenset(
+    'a an and are as at be but by can for from has have in into is it its of on or our that the '
+    'their this to was were will with you your'.split()
+)
+ARRAYS = ('tool_ids', 'dense', 'col_indptr', 'col_rows', 'col_data', 'idf')
+
+
+def _config():
+    return {
+        'PATH': os.path.join(settings.BASE_DIR, 'cache', 'similarity'),
+        # Neighbours kept per tool.
+        'K': 10,
+        'WEIGHTS': {'categories': 0.35, 'pricing': 0.1, 'features': 0.2, 'text': 0.35},
+        'TOP_TERMS': 30,
+        # Sparse terms in more than this share of tools are dropped: they
+        # say little and would make the inverted index quadratic.
+        'MAX_DF': 0.5,
+        # Score matrix cells per block; bounds memory at 4 bytes a cell.
+        'BLOCK_CELLS': 4_000_000,
+        # Columns sampled per block to bound each row's k-th best score.
+        'SAMPLE': 2000,
+        **getattr(settings, 'SIMILARITY', {}),
+    }
+
+
+def tokenize(text):
+    return [token for token in TOKEN.findall(text.lower()) if len(token) > 1 and token not in STOPWORDS]
+
+
+def _feature_term(name):
+    return 'f:' + ' '.join(TOKEN.findall(name.lower()))
+
+
+def _load_catalog(tool_ids=None):
+    """Return ``{tool_id: (pricing_type, category_ids, feature_terms, token_counts)}``."""
+    tools = AITool.objects.order_by('pk')
+    categories = AITool.categories.through.objects.all()
+    features = Feature.objects.all()
+    if tool_ids is not None:
+        tools = tools.filter(pk__in=tool_ids)
+        categories = categories.filter(aitool_id__in=tool_ids)
+        features = features.filter(tool_id__in=tool_ids)
+    tool_categories, tool_features = defaultdict(set), defaultdict(set)
+    for tool_id, category_id in categories.values_list('aitool_id', 'category_id').iterator(chunk_size=10000):
+        tool_categories[tool_id].add(category_id)
+    for tool_id, name in features.values_list('tool_id', 'name').iterator(chunk_size=10000):
+        tool_features[tool_id].add(_feature_term(name))
+    return {
+        pk: (pricing_type, tool_categories[pk], tool_features[pk], Counter(tokenize(f'{short} {long}')))
+        for pk, pricing_type, short, long in tools.values_list(
+            'pk', 'pricing_type', 'short_description', 'long_description'
+        ).iterator(chunk_size=2000)
+    }
+
+
+def _idf(count, df):
+    return math.log((1 + count) / (1 + df)) + 1
+
+
+class Model:
+    """The fitted vocabulary, IDF and tool vectors; see the module docstring."""
+
+    def __init__(self, categories, pricing_types, vocabulary, idf, category_idf, config):
+        self.categories = categories  # category id -> dense column
+        self.pricing_types = pricing_types  # pricing type -> dense column, after the categories
+        self.vocabulary = vocabulary  # sparse term -> column
+        self.idf = idf
+        self.category_idf = category_idf
+        self.weights = {group: math.sqrt(weight) for group, weight in config['WEIGHTS'].items()}
+        self.top_terms = config['TOP_TERMS']
+
+    @classmethod
+    def fit(cls, catalog, config):
+        count = len(catalog)
+        category_df, term_df = Counter(), Counter()
+        for pricing_type, category_ids, feature_terms, tokens in catalog.values():
+            category_df.update(category_ids)
+            term_df.update(feature_terms)
+            term_df.update(tokens.keys())
+        # A term of a single tool cannot relate two tools.
+        vocabulary = sorted(term for term, df in term_df.items() if 1 < df <= config['MAX_DF'] * count)
+        idf = np.array([_idf(count, term_df[term]) for term in vocabulary], dtype=np.float32)
+        categories = sorted(category_df)
+        pricing_types = [pricing_type for pricing_type, _ in AITool.PRICING_TYPES]
+        return cls(
+            {category_id: column for column, category_id in enumerate(categories)},
+            {pricing_type: len(categories) + column for column, pricing_type in enumerate(pricing_types)},
+            {term: column for column, term in enumerate(vocabulary)},
+            idf,
+            {category_id: _idf(count, category_df[category_id]) for category_id in categories},
+            config,
+        )
+
+    @property
+    def dense_width(self):
+        return len(self.categories) + len(self.pricing_types)
+
+    def _group(self, weights, scale):
+        norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+        return {column: scale * weight / norm for column, weight in weights.items()} if norm else {}
+
+    def vectorize(self, entry):
+        """Return ``(dense row, {sparse column: weight})`` for one catalog entry."""
+        pricing_type, category_ids, feature_terms, tokens = entry
+        dense = np.zeros(self.dense_width, dtype=np.float32)
+        categories = {
+            self.categories[category_id]: self.category_idf[category_id]
+            for category_id in category_ids if category_id in self.categories
+        }
+        for column, weight in self._group(categories, self.weights['categories']).items():
+            dense[column] = weight
+        if pricing_type in self.pricing_types:
+            dense[self.pricing_types[pricing_type]] = self.weights['pricing']
+
+        vocabulary, idf = self.vocabulary, self.idf
+        features = {vocabulary[term]: idf[vocabulary[term]] for term in feature_terms if term in vocabulary}
+        text = {
+            vocabulary[token]: (1 + math.log(tf)) * idf[vocabulary[token]]
+            for token, tf in tokens.items() if token in vocabulary
+        }
+        if len(text) > self.top_terms:
+            text = dict(sorted(text.items(), key=lambda item: -item[1])[:self.top_terms])
+        sparse = self._group(features, self.weights['features'])
+        sparse.update(self._group(text, self.weights['text']))
+        return dense, sparse
+
+    def to_json(self):
+        return {
+            'categories': list(self.categories),
+            'category_idf': [self.category_idf[category_id] for category_id in self.categories],
+            'pricing_types': list(self.pricing_types),
+            'vocabulary': list(self.vocabulary),
+            'weights': {group: weight * weight for group, weight in self.weights.items()},
+            'top_terms': self.top_terms,
+        }
+
+    @classmethod
+    def from_json(cls, data, idf):
+        categories = {category_id: column for column, category_id in enumerate(data['categories'])}
+        pricing_types = data['pricing_types']
+        return cls(
+            categories,
+            {pricing_type: len(categories) + column for column, pricing_type in enumerate(pricing_types)},
+            {term: column for column, term in enumerate(data['vocabulary'])},
+            idf,
+            dict(zip(data['categories'], data['category_idf'])),
+            {'WEIGHTS': data['weights'], 'TOP_TERMS': data['top_terms']},
+        )
+
+
+class Index:
+    """Tool vectors: dense rows plus the sparse part as CSR and CSC arrays."""
+
+    def __init__(self, tool_ids, dense, col_indptr, col_rows, col_data, indptr=None, indices=None, data=None):
+        self.tool_ids = tool_ids
+        self.dense = dense
+        self.col_indptr, self.col_rows, self.col_data = col_indptr, col_rows, col_data
+        self.indptr, self.indices, self.data = indptr, indices, data
+
+    @classmethod
+    def build(cls, model, catalog):
+        tool_ids = np.fromiter(catalog, dtype=np.int64, count=len(catalog))
+        dense = np.zeros((len(catalog), model.dense_width), dtype=np.float32)
+        indptr, indices, data = [0], [], []
+        for row, entry in enumerate(catalog.values()):
+            dense[row], sparse = model.vectorize(entry)
+            indices.extend(sparse)
+            data.extend(sparse.values())
+            indptr.append(len(indices))
+        indptr = np.array(indptr, dtype=np.int64)
+        indices = np.array(indices, dtype=np.int64)
+        data = np.array(data, dtype=np.float32)
+        rows = np.repeat(np.arange(len(catalog), dtype=np.int64), np.diff(indptr))
+        order = np.argsort(indices, kind='stable')
+        col_indptr = np.zeros(len(model.vocabulary) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(indices, minlength=len(model.vocabulary)), out=col_indptr[1:])
+        return cls(tool_ids, dense, col_indptr, rows[order], data[order], indptr, indices, data)
+
+    def block_scores(self, start, stop):
+        """Scores of tools ``start:stop`` (rows) against every tool, self-pairs zeroed."""
+        scores = self.dense[start:stop] @ self.dense.T
+        begin, end = self.indptr[start], self.indptr[stop]
+        rows = np.repeat(np.arange(stop - start), np.diff(self.indptr[start:stop + 1]))
+        self._add_sparse(scores, rows, self.indices[begin:end], self.data[begin:end])
+        scores[np.arange(stop - start), np.arange(start, stop)] = 0
+        return scores
+
+    def _add_sparse(self, scores, rows, columns, weights):
+        # Each query entry (row, column, weight) meets the column's postings.
+        starts, ends = self.col_indptr[columns], self.col_indptr[columns + 1]
+        lengths = ends - starts
+        total = int(lengths.sum())
+        if not total:
+            return
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(total)
+        np.add.at(
+            scores,
+            (np.repeat(rows, lengths), self.col_rows[offsets]),
+            np.repeat(weights, lengths) * self.col_data[offsets],
+        )
+
+    def query(self, dense, sparse):
+        """Scores of one vectorized tool against every tool."""
+        scores = (dense @ self.dense.T)[np.newaxis]
+        columns = np.fromiter(sparse, dtype=np.int64, count=len(sparse))
+        weights = np.fromiter(sparse.values(), dtype=np.float32, count=len(sparse))
+        self._add_sparse(scores, np.zeros(len(columns), dtype=np.int64), columns, weights)
+        return scores[0]
+
+
+def top_k(scores, k):
+    """Return ``(columns, scores)`` of the ``k`` best scores per row, best first."""
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        empty = np.empty((scores.shape[0], 0), dtype=np.int64)
+        return empty, empty.astype(scores.dtype)
+    columns = np.argpartition(scores, -k, axis=1)[:, -k:]
+    values = np.take_along_axis(scores, columns, axis=1)
+    order = np.argsort(-values, axis=1, kind='stable')
+    return np.take_along_axis(columns, order, axis=1), np.take_along_axis(values, order, axis=1)
+
+
+def block_top_k(scores, k, sample):
+    """
+    Return ``(rows, columns, scores)`` of the ``k`` best positive scores per
+    row, best first. Partitioning every row is the slow part of a rebuild,
+    so each row's k-th best score among the ``sample`` columns - a lower
+    bound of its true k-th best - first filters the candidates.
+    """
+    if len(sample) > k:
+        threshold = np.partition(scores[:, sample], -k, axis=1)[:, -k]
+        threshold = np.maximum(threshold, np.finfo(scores.dtype).tiny)
+    else:
+        threshold = np.full(scores.shape[0], np.finfo(scores.dtype).tiny, dtype=scores.dtype)
+    # A flat nonzero is several times faster than a 2-D one.
+    rows, columns = np.divmod(np.flatnonzero(scores >= threshold[:, np.newaxis]), scores.shape[1])
+    values = scores[rows, columns]
+    order = np.lexsort((columns, -values, rows))
+    rows, columns, values = rows[order], columns[order], values[order]
+    rank = np.arange(len(rows)) - np.searchsorted(rows, rows)
+    keep = rank < k
+    return rows[keep], columns[keep], values[keep]
+
+
+def _save(model, index, path):
+    """
+    Write the arrays into a directory named after the new version; readers
+    switch over when ``model.json`` is replaced.
+    """
+    os.makedirs(path, exist_ok=True)
+    version = str(time.time_ns())
+    staging = os.path.join(path, f'.{version}.tmp')
+    os.makedirs(staging)
+    for name in ARRAYS:
+        array = model.idf if name == 'idf' else getattr(index, name)
+        np.save(os.path.join(staging, f'{name}.npy'), array)
+    os.rename(staging, os.path.join(path, version))
+    temporary = os.path.join(path, f'model-{version}.json')
+    with open(temporary, 'w') as file:
+        json.dump({'version': version, **model.to_json()}, file)
+    os.replace(temporary, os.path.join(path, 'model.json'))
+    _collect(path)
+
+
+def _collect(path):
+    """
+    Remove the versions older than the one ``model.json`` names. Newer ones
+    may belong to an overlapping rebuild about to switch over.
+    """
+    try:
+        with open(os.path.join(path, 'model.json')) as file:
+            current_version = int(json.load(file)['version'])
+    except FileNotFoundError:
+        return
+    for name in os.listdir(path):
+        if name.isdigit() and int(name) < current_version:
+            shutil.rmtree(os.path.join(path, name), ignore_errors=True)
+        elif name.endswith('.npy'):
+            # Arrays saved before models had their own directories.
+            os.remove(os.path.join(path, name))
+
+
+def load(path=None):
+    """
+    Return the saved ``(model, index)``, memory-mapped, or ``(None, None)``
+    before the first rebuild. Raises FileNotFoundError if the files
+    ``model.json`` names are gone, so a queued update fails and is retried
+    rather than skipped.
+    """
+    path = path or _config()['PATH']
+    previous = None
+    while True:
+        try:
+            with open(os.path.join(path, 'model.json')) as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return None, None
+        directory = os.path.join(path, data['version'])
+        try:
+            arrays = {name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r') for name in ARRAYS}
+            break
+        except FileNotFoundError:
+            # A newer rebuild switched over and collected this version
+            # between the two reads; follow it once.
+            if data['version'] == previous:
+                raise
+            previous = data['version']
+    idf = arrays.pop('idf')
+    return Model.from_json(data, idf), Index(**arrays)
+
+
+def rebuild(k=None, path=None):
+    """Recompute every tool's neighbours and save the model; returns timings in seconds."""
+    config = _config()
+    k = k or config['K']
+    timings, started = {}, time.perf_counter()
+    catalog = _load_catalog()
+    timings['load'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    model = Model.fit(catalog, config)
+    index = Index.build(model, catalog)
+    timings['vectorize'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    count = len(index.tool_ids)
+    block = max(1, config['BLOCK_CELLS'] // max(count, 1))
+    sample = np.unique(np.linspace(0, count - 1, min(count, config['SAMPLE'])).astype(np.int64))
+    tool_ids = index.tool_ids.tolist()
+    rows = []
+    for start in range(0, count, block):
+        stop = min(count, start + block)
+        block_rows, columns, scores = block_top_k(index.block_scores(start, stop), k, sample)
+        rows.extend(
+            (tool_ids[start + row], tool_ids[column], score)
+            for row, column, score in zip(block_rows.tolist(), columns.tolist(), scores.tolist())
+        )
+    timings['score'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    _replace_all(rows)
+    _save(model, index, path or config['PATH'])
+    timings['store'] = time.perf_counter() - started
+    timings['tools'], timings['pairs'] = count, len(rows)
+    return timings
+
+
+def _replace_all(rows):
+    """Replace the whole table with ``(tool_id, related_id, score)`` rows."""
+    # A million model instances would dominate the rebuild; executemany
+    # inserts the tuples as they are.
+    opts = ToolSimilarity._meta
+    connection = connections[router.db_for_write(ToolSimilarity)]
+    columns = ', '.join(connection.ops.quote_name(opts.get_field(name).column) for name in ('tool', 'related', 'score'))
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        ToolSimilarity.objects.using(connection.alias).all().delete()
+        cursor.executemany(
+            f'INSERT INTO {connection.ops.quote_name(opts.db_table)} ({columns}) VALUES (%s, %s, %s)', rows,
+        )
+
+
+def update(tool_ids, path=None):
+    """Refresh the neighbours of changed tools; see the module docstring. Returns the tools updated."""
+    model, index = load(path)
+    if model is None:
+        logger.info('No similarity model yet; run manage.py rebuild_similarity.')
+        return 0
+    k = _config()['K']
+    catalog = _load_catalog(tool_ids)
+    positions = {int(tool_id): row for row, tool_id in enumerate(index.tool_ids)}
+    for tool_id, entry in catalog.items():
+        scores = index.query(*model.vectorize(entry))
+        if tool_id in positions:
+            scores[positions[tool_id]] = 0
+        columns, values = top_k(scores[np.newaxis], k)
+        neighbours = {
+            int(index.tool_ids[column]): float(score)
+            for column, score in zip(columns[0], values[0]) if score > 0
+        }
+        # Existing links to deleted tools are gone with their rows.
+        existing = set(AITool.objects.filter(pk__in=neighbours).values_list('pk', flat=True))
+        neighbours = {related_id: score for related_id, score in neighbours.items() if related_id in existing}
+        with transaction.atomic():
+            ToolSimilarity.objects.filter(tool_id=tool_id).delete()
+            ToolSimilarity.objects.bulk_create(
+                ToolSimilarity(tool_id=tool_id, related_id=related_id, score=score)
+                for related_id, score in neighbours.items()
+            )
+            # This tool in other lists: refresh scores, join new neighbours' lists.
+            inbound = list(ToolSimilarity.objects.filter(related_id=tool_id))
+            for row in inbound:
+                row.score = float(scores[positions[row.tool_id]]) if row.tool_id in positions else row.score
+            ToolSimilarity.objects.bulk_update(inbound, ['score'])
+            listed = {row.tool_id for row in inbound}
+            ToolSimilarity.objects.bulk_create(
+                ToolSimilarity(tool_id=related_id, related_id=tool_id, score=score)
+                for related_id, score in neighbours.items() if related_id not in listed
+            )
+            _trim(set(neighbours) | listed, k)
+    return len(catalog)
+
+
+def _trim(tool_ids, k):
+    """Drop all but the ``k`` best neighbours (and any non-positive ones) of ``tool_ids``."""
+    ranked = defaultdict(list)
+    for pk, tool_id, score in ToolSimilarity.objects.filter(tool_id__in=tool_ids).values_list(
+        'pk', 'tool_id', 'score'
+    ):
+        ranked[tool_id].append((score, pk))
+    drop = [
+        pk for rows in ranked.values()
+        for position, (score, pk) in enumerate(sorted(rows, reverse=True)) if position >= k or score <= 0
+    ]
+    ToolSimilarity.objects.filter(pk__in=drop).delete()
@@ -0,0 +1,57 @@
+# ai_tools/tasks.py
+"""Background tasks; see app/queue.py for how they are queued and run."""
+from django.core.mail import mail_managers
+from django.template.defaultfilters import pluralize
+
+from . import categories, images, newsletter, ratings, similarity
+from .models import ContactSubmission, ToolSubmission
+from .queue import task
+
+
+@task(max_attempts=3)
+def generate_image_variants(name, digest):
+    images.generate(name, digest)
+
+
+@task(batch=100)
+def recompute_ratings(payloads):
+    tool_ids = {tool_id for payload in payloads for tool_id in payload['tool_ids']}
+    ratings.recompute(tool_ids)
+
+
+@task(batch=100)
+def refresh_category_counts(payloads):
+    category_ids = {category_id for payload in payloads for category_id in payload['category_ids']}
+    categories.refresh_tool_counts(category_ids)
+
+
+@task(batch=100)
+def update_similar_tools(payloads):
+    similarity.update({tool_id for payload in payloads for tool_id in payload['tool_ids']})
+
+
+SUBMISSION_MODELS = {'contact': ContactSubmission, 'tool': ToolSubmission}
+
+
+@task(batch=50, backoff=60)
+def notify_managers_of_submissions(payloads):
+    """One email to MANAGERS for a batch of new contact and tool submissions."""
+    lines = []
+    for kind, model in SUBMISSION_MODELS.items():
+        pks = [payload['pk'] for payload in payloads if payload['kind'] == kind]
+        lines.extend(f'[{kind}] {submission}' for submission in model.objects.filter(pk__in=pks))
+    if lines:
+        mail_managers(f'{len(lines)} new submission{pluralize(len(lines))}', '\n'.join(lines))
+
+
+@task(max_attempts=3)
+def send_newsletter(campaign_id):
+    """Split a campaign into batches and queue a send job for each."""
+    for batch in newsletter.dispatch(campaign_id):
+        send_newsletter_batch.enqueue(key=f'newsletter-batch:{batch.pk}', batch_id=batch.pk)
+
+
+# Retries resume from the batch's checkpoint; see app/newsletter.py.
+@task(max_attempts=10, backoff=60)
+def send_newsletter_batch(batch_id):
+    newsletter.send_batch(batch_id)
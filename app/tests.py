@@ -1,3 +1,1658 @@
-from django.test import TestCase
+import decimal
+import gzip
+import json
+import os
+import tempfile
+import random
+import shutil
+import threading
+import time
+import unittest
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import skipUnless
+from unittest.mock import patch
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.admin.sites import AdminSite
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core import mail
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError, connection, connections, transaction
+from django.db.models import Q
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+from rest_framework import renderers, serializers
+from rest_framework.exceptions import ParseError
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from . import (
+    autocomplete, exporters, facets, homepage, images, importers, metrics, newsletter, queue, ratings,
+    representations, search, similarity, tasks
+)
+from .admin import AIToolAdmin, JobAdmin, NewsletterCampaignAdmin, ReviewAdmin
+from .benchmarks import (
+    runner as bench_runner, seed as bench_seed, serialization as bench_serialization, stress as bench_stress
+)
+from .categories import refresh_tool_counts
+from .counters import ViewCounter, view_counter
+from .db_router import ReadWriteRouter
+from .models import (
+    Category, PricingPlan, AITool, Feature, ToolImage, ToolVideo, Review, Article,
+    Comparison, ContactSubmission, Job, NewsletterBatch, NewsletterCampaign, NewsletterSubscriber,
+    ToolSimilarity
+)
+from .parsers import JSONParser
+from .renderers import JSONRenderer, RawJSON
+from .serializers import AIToolListSerializer, ArticleSerializer, ValuesListSerializer
+
+run_benchmarks = skipUnless(os.environ.get('RUN_BENCHMARKS'), 'set RUN_BENCHMARKS=1 to run benchmarks')
+
+
+def create_tools(count, start=0, with_children=True):
+    """Bulk-create ``count`` tools with categories, plans and nested children."""
+    categories = [
+        Category.objects.get_or_create(name=f'Category {i}', slug=f'category-{i}', icon='fa-robot')[0]
+        for i in range(3)
+    ]
+    plan = PricingPlan.objects.get_or_create(name='Pro', price='9.99')[0]
+    tools = AITool.objects.bulk_create([
+        AITool(
+            name=f'Tool {i}', slug=f'tool-{i}', short_description='Short',
+            long_description='Long', website_url='https://example.com',
+            pricing_type='free', is_verified=True, featured=i % 5 == 0,
+        )
+        for i in range(start, start + count)
+    ])
+    through = AITool.categories.through
+    through.objects.bulk_create([
+        through(aitool_id=tool.pk, category_id=categories[i % 3].pk) for i, tool in enumerate(tools)
+    ])
+    refresh_tool_counts()
+    AITool.pricing_plans.through.objects.bulk_create([
+        AITool.pricing_plans.through(aitool_id=tool.pk, pricingplan_id=plan.pk) for tool in tools
+    ])
+    if with_children:
+        Feature.objects.bulk_create([Feature(tool=tool, name='Feature') for tool in tools])
+        ToolImage.objects.bulk_create([ToolImage(tool=tool, image='tool_images/a.png') for tool in tools])
+        ToolVideo.objects.bulk_create([ToolVideo(tool=tool, video_url='https://example.com/v') for tool in tools])
+        Review.objects.bulk_create([
+            Review(tool=tool, rating=5, title='Great', content='Great', is_approved=True) for tool in tools
+        ])
+        # Keep the stored aggregates consistent with the one 5-star review.
+        AITool.objects.filter(pk__in=[tool.pk for tool in tools]).update(
+            rating_count=1, rating_sum=5, rating_average=5.0, rating_5_count=1,
+        )
+    return tools
+
+
+class AIToolQueryBudgetTests(TestCase):
+    def test_list_query_count_is_constant(self):
+        seeded = 0
+        for total in (10, 100, 1000):
+            create_tools(total - seeded, start=seeded)
+            seeded = total
+            with self.subTest(tools=total):
+                # The validator aggregate, the tools and the categories prefetch.
+                with self.assertNumQueries(3):
+                    response = self.client.get(reverse('aitool-list'))
+                self.assertEqual(response.status_code, 200)
+
+    def test_detail_query_count_is_constant(self):
+        tools = create_tools(1000)
+        for tool in (tools[0], tools[99], tools[999]):
+            with self.subTest(tool=tool.slug):
+                # The validator lookup, the tool and one prefetch per nested relation.
+                with self.assertNumQueries(8):
+                    response = self.client.get(reverse('aitool-detail', args=[tool.pk]))
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.data['features']), 1)
+                self.assertEqual(len(response.data['reviews']), 1)
+
+    def test_list_uses_compact_representation(self):
+        create_tools(3)
+        response = self.client.get(reverse('aitool-list'))
+        item = response.data['results'][0]
+        self.assertIn('categories', item)
+        for nested in ('features', 'images', 'videos', 'reviews', 'long_description', 'pricing_plans'):
+            self.assertNotIn(nested, item)
+
+
+class KeysetPaginationTests(TestCase):
+    def test_pages_follow_model_ordering_without_gaps(self):
+        create_tools(45, with_children=False)
+        expected = list(AITool.objects.values_list('pk', flat=True))
+        seen, url = [], reverse('aitool-list')
+        while url:
+            response = self.client.get(url)
+            seen += [item['id'] for item in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(seen, expected)
+
+    def test_previous_link_returns_to_prior_page(self):
+        create_tools(30, with_children=False)
+        first = self.client.get(reverse('aitool-list'), {'page_size': 10})
+        second = self.client.get(first.data['next'])
+        back = self.client.get(second.data['previous'])
+        self.assertEqual(back.data['results'], first.data['results'])
+
+    def test_page_size_is_bounded(self):
+        create_tools(150, with_children=False)
+        response = self.client.get(reverse('aitool-list'), {'page_size': 1000})
+        self.assertEqual(len(response.data['results']), 100)
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(reverse('review-list'), {'cursor': 'cD1ub3QtYS1wb3NpdGlvbg=='})
+        self.assertEqual(response.status_code, 404)
+
+    def test_deep_page_costs_the_same_as_first_page(self):
+        # All rows share one submitted_at, so only the pk tie-breaker keeps
+        # the key unique; the cursor must still never fall back to OFFSET.
+        ContactSubmission.objects.bulk_create(
+            (ContactSubmission(name='n', email='a@example.com', subject='s', message='m')
+             for _ in range(100_000)),
+            batch_size=5000,
+        )
+        url, pages = reverse('contactsubmission-list'), []
+        for _ in range(500):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            pages.append((queries.captured_queries, response.data['results']))
+            url = response.data['next']
+
+        (first_queries, _), (deep_queries, deep_results) = pages[0], pages[-1]
+        self.assertEqual(len(first_queries), len(deep_queries))
+        self.assertEqual(len(deep_results), 20)
+        self.assertEqual(ContactSubmission.objects.filter(pk__gt=deep_results[0]['id']).count(), 499 * 20)
+        for query in (first_queries[0]['sql'], deep_queries[0]['sql']):
+            self.assertNotIn('OFFSET', query.upper())
+            if connection.vendor == 'sqlite':
+                with connection.cursor() as cursor:
+                    cursor.execute('EXPLAIN QUERY PLAN ' + query)
+                    plan = ' '.join(str(row[-1]) for row in cursor.fetchall())
+                self.assertIn('USING INDEX', plan)
+                self.assertNotIn('TEMP B-TREE', plan)
+
+
+@override_settings(VIEW_COUNTER={'FLUSH_INTERVAL': None, 'FLUSH_THRESHOLD': None})
+class ViewCounterTests(TestCase):
+    def setUp(self):
+        self.tool = create_tools(1, with_children=False)[0]
+        self.tool.refresh_from_db()
+
+    def test_concurrent_increments_are_exact(self):
+        counter = ViewCounter()
+        article = Article.objects.create(title='Post', slug='post', content='Body')
+
+        def hammer():
+            for _ in range(2500):
+                counter.increment(self.tool)
+                counter.increment(article)
+
+        threads = [threading.Thread(target=hammer) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(counter.flush(), 40_000)
+        updates = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 2)
+        self.tool.refresh_from_db()
+        article.refresh_from_db()
+        self.assertEqual(self.tool.views, 20_000)
+        self.assertEqual(article.views, 20_000)
+
+    def test_threshold_wakes_the_flusher_instead_of_flushing_inline(self):
+        counter = ViewCounter(flush_threshold=3, flush_interval=0)
+        with patch.object(counter, '_ensure_thread') as ensure_thread:
+            with self.assertRaises(ValueError), transaction.atomic():
+                for _ in range(3):
+                    counter.increment(self.tool)
+                raise ValueError('the request failed')
+        ensure_thread.assert_called_once()
+        self.assertTrue(counter._wake.is_set())
+        # The request's rollback cannot take buffered counts with it.
+        self.assertEqual(counter.pending(self.tool), 3)
+        self.assertEqual(counter.flush(), 3)
+        self.assertEqual(AITool.objects.get(pk=self.tool.pk).views, 3)
+
+    def test_increment_views_is_buffered_and_keeps_updated_at(self):
+        updated_at = self.tool.updated_at
+        with self.assertNumQueries(0):
+            self.tool.increment_views()
+        self.assertEqual(self.tool.views, 1)
+        self.assertEqual(view_counter.pending(self.tool), 1)
+        view_counter.flush()
+        self.tool.refresh_from_db()
+        self.assertEqual(self.tool.views, 1)
+        self.assertEqual(self.tool.updated_at, updated_at)
+
+
+@override_settings(HOMEPAGE_SNAPSHOT={'ASYNC_REBUILD': False})
+class HomepageSnapshotTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.tool = create_tools(3, with_children=False)[0]
+
+    def test_hot_path_runs_no_queries(self):
+        self.client.get(reverse('index'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('index'))
+        self.assertContains(response, 'AI Tool Hub')
+
+    def test_change_rebuilds_only_dependent_sections(self):
+        self.client.get(reverse('index'))
+        self.tool.name = 'Renamed'
+        self.tool.save()
+        # categories, featured and latest; stats and articles are reused
+        # from the previous snapshot.
+        with self.assertNumQueries(3):
+            self.client.get(reverse('index'))
+        names = [tool['name'] for tool in cache.get(homepage.SNAPSHOT_KEY)['context']['latest_tools']]
+        self.assertIn('Renamed', names)
+        with self.assertNumQueries(0):
+            self.client.get(reverse('index'))
+
+    def test_stale_snapshot_is_served_while_rebuild_runs(self):
+        self.client.get(reverse('index'))
+        cache.add(homepage.REBUILD_LOCK_KEY, True)
+        for i in range(5):
+            Article.objects.create(title=f'Post {i}', slug=f'post-{i}', content='Body', is_published=True)
+        with self.assertNumQueries(0):
+            self.client.get(reverse('index'))
+        self.assertEqual(cache.get(homepage.SNAPSHOT_KEY)['context']['articles'], [])
+
+    def test_rebuild_command(self):
+        call_command('rebuild_homepage', stdout=StringIO())
+        snapshot = cache.get(homepage.SNAPSHOT_KEY)
+        self.assertEqual(len(snapshot['context']['latest_tools']), 3)
+        self.assertEqual(sum(c['tool_count'] for c in snapshot['context']['categories']), 3)
+
+
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.tools = create_tools(25)
+        search.index_objects(AITool, [tool.pk for tool in self.tools])
+
+    async def test_list_and_detail_match_the_sync_endpoints(self):
+        params = {'ordering': '-views', 'pricing_type': 'free', 'page_size': 10}
+        response = await self.async_client.get(reverse('async-aitool-list'), params)
+        expected = await self.async_client.get(reverse('aitool-list'), params)
+        data = response.json()
+        self.assertEqual(data['results'], expected.json()['results'])
+        following = await self.async_client.get(data['next'])
+        self.assertEqual(len(following.json()['results']), 10)
+
+        pk = self.tools[0].pk
+        response = await self.async_client.get(reverse('async-aitool-detail', args=[pk]))
+        expected = await self.async_client.get(reverse('aitool-detail', args=[pk]))
+        self.assertEqual(response.json(), expected.json())
+
+        categories = await self.async_client.get(reverse('async-category-list'))
+        self.assertEqual(len(categories.json()['results']), 3)
+
+    async def test_errors_are_json(self):
+        response = await self.async_client.get(reverse('async-aitool-detail', args=[0]))
+        self.assertEqual(response.status_code, 404)
+        response = await self.async_client.get(reverse('async-aitool-list'), {'featured': 'maybe'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('featured', response.json())
+        response = await self.async_client.get(reverse('async-search'))
+        expected = await self.async_client.get(reverse('search-list'))
+        self.assertEqual((response.status_code, response.json()), (400, expected.json()))
+
+    async def test_homepage_data_and_search(self):
+        response = await self.async_client.get(reverse('async-homepage'))
+        self.assertEqual(set(response.json()), set(homepage.SECTIONS))
+        self.assertEqual(len(response.json()['latest_tools']), 6)
+        response = await self.async_client.get(reverse('async-search'), {'q': 'tool'})
+        self.assertEqual(len(response.json()['results']), 20)
+        self.assertIsNotNone(response.json()['next'])
+
+
+class RepresentationCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        representations.local.clear()
+        metrics.registry.clear()
+        self.tools = create_tools(3)
+        self.url = reverse('aitool-detail', args=[self.tools[0].slug])
+
+    def events(self, serializer='AIToolSerializer'):
+        return {
+            event: metrics.registry.get('representation_cache_total', event=event, serializer=serializer)
+            for event in ('local_hit', 'shared_hit', 'miss', 'eviction')
+        }
+
+    def test_detail_is_served_from_the_cache_until_the_tool_changes(self):
+        first = self.client.get(self.url).json()
+        # Validators and the row; no prefetches, no serialization.
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get(self.url).json(), first)
+        self.assertEqual(self.events(), {'local_hit': 1, 'shared_hit': None, 'miss': 1, 'eviction': None})
+
+        # Another worker finds it in the shared cache.
+        representations.local.clear()
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get(self.url).json(), first)
+        self.assertEqual(self.events()['shared_hit'], 1)
+
+        Feature.objects.create(tool=self.tools[0], name='Upscaling')
+        self.assertIn('Upscaling', [feature['name'] for feature in self.client.get(self.url).json()['features']])
+        # Columns written with update() are part of the version.
+        AITool.objects.filter(pk=self.tools[0].pk).update(views=41)
+        self.assertEqual(self.client.get(self.url).json()['views'], 41)
+        self.assertEqual(self.events()['miss'], 3)
+
+    def test_list_is_assembled_from_cached_cards(self):
+        url = reverse('aitool-list')
+        first = self.client.get(url).json()
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get(url).json(), first)
+        self.assertEqual(self.events('AIToolListSerializer')['local_hit'], 3)
+
+        self.tools[1].categories.clear()
+        results = self.client.get(url).json()['results']
+        self.assertEqual([tool['categories'] for tool in results if tool['id'] == self.tools[1].pk], [[]])
+        self.assertEqual(self.events('AIToolListSerializer')['miss'], 4)
+
+    def test_lru_evicts_least_recently_used(self):
+        lru = representations.LRU(max_bytes=10)
+        self.assertEqual(lru.set('a', (1, {'s': b'1234'})), 0)
+        self.assertEqual(lru.set('b', (1, {'s': b'1234'})), 0)
+        lru.get('a')
+        self.assertEqual(lru.set('c', (1, {'s': b'1234'})), 1)
+        self.assertIsNone(lru.get('b'))
+        self.assertEqual((lru.get('a')[0], lru.size), (1, 8))
+
+    def test_renderer_splices_raw_fragments(self):
+        data = {'results': [RawJSON(b'{"id":1,"name":"\u00e9"}')], 'next': None}
+        for media_type in ('application/json', 'application/json; indent=2'):
+            rendered = JSONRenderer().render(data, media_type)
+            self.assertEqual(json.loads(rendered), {'results': [{'id': 1, 'name': 'é'}], 'next': None})
+        self.assertEqual(dict(data['results'][0]), {'id': 1, 'name': 'é'})
+
+
+class FastSerializationTests(TestCase):
+    def setUp(self):
+        self.tools = create_tools(4)
+        AITool.objects.filter(pk=self.tools[0].pk).update(logo='tool_logos/a.png', logo_digest='abc123')
+        article = Article.objects.create(
+            title='Guide', slug='guide', content='x', featured_image='article_images/a.png',
+        )
+        article.categories.set(Category.objects.all())
+        article.related_tools.set(self.tools[:2])
+        self.context = {'request': Request(APIRequestFactory().get('/api/'))}
+
+    def test_values_list_serializer_matches_drf(self):
+        for serializer_class, queryset, relations in (
+            (AIToolListSerializer, AITool.objects.all(), 1),
+            (ArticleSerializer, Article.objects.all(), 2),
+        ):
+            with self.subTest(serializer=serializer_class.__name__):
+                expected = serializers.ListSerializer(
+                    list(queryset), child=serializer_class(), context=self.context,
+                ).data
+                fast = serializer_class(list(queryset), many=True, context=self.context)
+                self.assertIsInstance(fast, ValuesListSerializer)
+                self.assertEqual(fast.data, expected)
+                # From a queryset: the rows plus one query per many-to-many field.
+                with self.assertNumQueries(1 + relations):
+                    data = serializer_class(queryset, many=True, context=self.context).data
+                self.assertEqual(data, expected)
+
+    def test_renderer_output_matches_drf(self):
+        data = {
+            'when': timezone.now(), 'price': decimal.Decimal('9.99'), 'text': 'line\u2028break \u00e9',
+            'tags': {'b'}, 3: None, 'nested': [{'ok': True, 'ratio': 0.1}],
+        }
+        self.assertEqual(JSONRenderer().render(data), renderers.JSONRenderer().render(data))
+        data['raw'] = RawJSON(b'{"id":1}')
+        self.assertEqual(json.loads(JSONRenderer().render(data))['raw'], {'id': 1})
+
+    def test_parser_reads_utf8_and_rejects_invalid_json(self):
+        parse = JSONParser().parse
+        self.assertEqual(parse(BytesIO('{"name": "\u00e9"}'.encode())), {'name': 'é'})
+        self.assertEqual(
+            parse(BytesIO('{"name": "\u00e9"}'.encode('latin-1')), parser_context={'encoding': 'latin-1'}),
+            {'name': 'é'},
+        )
+        for body in (b'{"a": NaN}', b'{"a":'):
+            with self.assertRaises(ParseError):
+                parse(BytesIO(body))
+
+
+class SparseFieldsetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        representations.local.clear()
+        self.tools = create_tools(3)
+        self.detail_url = reverse('aitool-detail', args=[self.tools[0].slug])
+
+    def test_fields_limit_the_representation_and_the_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('aitool-list'), {'fields': 'name,slug'})
+        self.assertEqual([set(tool) for tool in response.json()['results']], [{'name', 'slug'}] * 3)
+        page = next(query['sql'] for query in queries if 'LIMIT' in query['sql'])
+        self.assertNotIn('long_description', page)
+        # The categories prefetch is dropped with the field.
+        self.assertEqual(len(queries), 2)
+        # Each selection is cached separately.
+        self.assertIn('categories', self.client.get(reverse('aitool-list')).json()['results'][0])
+
+    def test_expand_selects_nested_relations(self):
+        # Validators, the row, and the categories, plans and reviews prefetches.
+        with self.assertNumQueries(5):
+            data = self.client.get(self.detail_url, {'expand': 'reviews'}).json()
+        self.assertEqual(len(data['reviews']), 1)
+        for nested in ('features', 'images', 'videos'):
+            self.assertNotIn(nested, data)
+        self.assertNotIn('reviews', self.client.get(self.detail_url, {'expand': ''}).json())
+        self.assertIn('images', self.client.get(self.detail_url).json())
+
+    def test_dotted_names_reach_nested_serializers(self):
+        comparison = Comparison.objects.create(title='A vs B', slug='a-vs-b', content='x')
+        comparison.tools.set(self.tools[:2])
+        url = reverse('comparison-detail', args=[comparison.slug])
+        data = self.client.get(url, {'fields': 'title,tools.name', 'expand': 'tools'}).json()
+        self.assertEqual(data, {'tools': [{'name': tool.name} for tool in comparison.tools.all()], 'title': 'A vs B'})
+        self.assertEqual(set(self.client.get(url, {'expand': ''}).json()) & {'tools', 'title'}, {'title'})
+        data = self.client.get(url, {'fields': 'tools.name,tools.features', 'expand': 'tools.features'}).json()
+        self.assertEqual(set(data['tools'][0]), {'name', 'features'})
+
+    def test_custom_actions_check_the_serializer_they_render(self):
+        url = reverse('category-tools', args=['category-0'])
+        # The category, its tools and their categories; nothing deferred is loaded later.
+        with self.assertNumQueries(3):
+            response = self.client.get(url, {'fields': 'name,pricing_type'})
+        self.assertEqual(response.json()['results'], [{'name': self.tools[0].name, 'pricing_type': 'free'}])
+        similarity.rebuild()
+        response = self.client.get(reverse('aitool-related', args=[self.tools[0].slug]), {'fields': 'slug,similarity'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json()[0]), {'slug', 'similarity'})
+
+    def test_unknown_names_are_rejected(self):
+        response = self.client.get(reverse('aitool-list'), {'fields': 'name,nope'})
+        self.assertEqual((response.status_code, response.json()), (400, {'fields': 'Unknown fields: nope.'}))
+        response = self.client.get(reverse('comparison-list'), {'expand': 'tools.nope'})
+        self.assertEqual(response.json(), {'expand': 'Unknown fields: tools.nope.'})
+
+    def test_writes_use_every_field(self):
+        url = reverse('category-list') + '?fields=name'
+        response = self.client.post(url, {'name': 'Video', 'slug': 'video', 'icon': 'fa-video'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['slug'], 'video')
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        metrics.registry.clear()
+        create_tools(3)
+
+    def test_records_per_route_timings_queries_and_size(self):
+        self.client.get('/api/ai-tools/')
+        labels = {'method': 'GET', 'view': 'aitool-list'}
+        queries = metrics.registry.get('http_request_db_queries', **labels)
+        self.assertEqual((queries.count, queries.sum), (1, 3))
+        self.assertGreater(metrics.registry.get('http_request_db_duration_seconds', **labels).sum, 0)
+        self.assertEqual(metrics.registry.get('http_response_serialize_seconds', **labels).count, 1)
+        self.assertEqual(metrics.registry.get('http_response_render_seconds', **labels).count, 1)
+        self.assertGreater(metrics.registry.get('http_response_size_bytes', **labels).sum, 0)
+        self.assertEqual(metrics.registry.get('http_requests_total', status=200, **labels), 1)
+
+    def test_prometheus_endpoint(self):
+        self.client.get('/api/ai-tools/')
+        text = self.client.get(reverse('metrics')).content.decode()
+        self.assertIn('# TYPE http_request_duration_seconds histogram', text)
+        self.assertIn('http_requests_total{method="GET",status="200",view="aitool-list"} 1', text)
+        self.assertIn('http_request_db_queries_bucket{method="GET",view="aitool-list",le="3"} 1', text)
+        self.assertIn('http_request_db_queries_bucket{method="GET",view="aitool-list",le="2"} 0', text)
+        self.assertEqual(self.client.get(reverse('metrics'), REMOTE_ADDR='10.0.0.1').status_code, 403)
+
+    @override_settings(METRICS={'SLOW_REQUEST_MS': 0, 'SLOW_SAMPLE_RATE': 1.0})
+    def test_slow_requests_are_logged_with_sql(self):
+        with self.assertLogs('app.metrics', 'WARNING') as logs:
+            self.client.get('/api/ai-tools/')
+        self.assertIn('aitool-list', logs.output[0])
+        self.assertIn('SELECT', logs.output[0])
+
+    @override_settings(METRICS={'ENABLED': False})
+    def test_can_be_disabled(self):
+        self.client.get('/api/ai-tools/')
+        self.assertIsNone(metrics.registry.get('http_request_db_queries', method='GET', view='aitool-list'))
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.tool = AITool.objects.create(
+            name='Midjourney', short_description='Image generation from prompts',
+            long_description='Creates artwork.', website_url='https://example.com', pricing_type='paid',
+        )
+        AITool.objects.create(
+            name='Copy helper', short_description='Writes marketing text',
+            long_description='Mentions midjourney prompts once.', website_url='https://example.com',
+            pricing_type='free',
+        )
+        Article.objects.create(title='Image generators compared', slug='images', content='Midjourney and more',
+                               is_published=True)
+        Article.objects.create(title='Draft on image tools', slug='draft', content='Unpublished', is_published=False)
+
+    def test_results_are_ranked_and_signals_keep_index_in_sync(self):
+        response = self.client.get(reverse('search-list'), {'q': 'midjourney'})
+        titles = [result['title'] for result in response.data['results']]
+        self.assertEqual(titles[0], 'Midjourney')
+        self.assertEqual(set(titles), {'Midjourney', 'Copy helper', 'Image generators compared'})
+
+        self.tool.name = 'Renamed'
+        self.tool.save()
+        Comparison.objects.create(title='Midjourney vs DALL-E', slug='mj-dalle', content='x', is_published=True)
+        titles = [result['title'] for result in search.search('midjourney')]
+        self.assertEqual(titles[0], 'Midjourney vs DALL-E')
+        self.assertNotIn('Renamed', [result['title'] for result in search.search('renamed midjourney')])
+
+        self.tool.delete()
+        self.assertEqual(search.search('artwork'), [])
+
+    def test_prefix_type_filter_and_unpublished(self):
+        self.assertEqual([r['title'] for r in search.search('imag', kinds=['article'])],
+                         ['Image generators compared'])
+
+    def test_pagination_and_validation(self):
+        first = self.client.get(reverse('search-list'), {'q': 'midjourney', 'page_size': 2})
+        self.assertEqual(len(first.data['results']), 2)
+        second = self.client.get(first.data['next'])
+        self.assertEqual(len(second.data['results']), 1)
+        self.assertIsNone(second.data['next'])
+        self.assertEqual(self.client.get(reverse('search-list')).status_code, 400)
+        self.assertEqual(self.client.get(reverse('search-list'), {'q': '"*'}).data['results'], [])
+
+    def test_rebuild_command_restores_bulk_created_rows(self):
+        AITool.objects.bulk_create([AITool(
+            name='Bulk tool', slug='bulk-tool', short_description='Loaded in bulk',
+            long_description='', website_url='https://example.com', pricing_type='free',
+        )])
+        self.assertEqual(search.search('bulk'), [])
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual([r['slug'] for r in search.search('bulk')], ['bulk-tool'])
+
+
+@run_benchmarks
+class SearchBenchmark(TestCase):
+    rows = 100_000
+
+    def test_fts_against_icontains(self):
+        # Zipf-distributed vocabulary so terms range from common to rare.
+        rng = random.Random(42)
+        vocabulary = [f'term{n}' for n in range(5000)]
+        weights = [1 / (n + 1) for n in range(5000)]
+        AITool.objects.bulk_create(
+            (AITool(
+                name=f'Tool {i}', slug=f'tool-{i}',
+                short_description=' '.join(rng.choices(vocabulary, weights, k=8)),
+                long_description=' '.join(rng.choices(vocabulary, weights, k=60)),
+                website_url='https://example.com', pricing_type='free',
+            ) for i in range(self.rows)),
+            batch_size=5000,
+        )
+        search.rebuild_index()
+
+        for query in ('term4000', 'term300', 'term40 term90', 'term4 term8'):
+            started = time.perf_counter()
+            search.search(query, kinds=['tool'])
+            fts_time = time.perf_counter() - started
+
+            started = time.perf_counter()
+            queryset = AITool.objects.all()
+            for term in query.split():
+                queryset = queryset.filter(
+                    Q(name__icontains=term) | Q(short_description__icontains=term)
+                    | Q(long_description__icontains=term)
+                )
+            list(queryset[:20])
+            scan_time = time.perf_counter() - started
+
+            print(f'\n{query!r} over {self.rows} tools: fts5 {fts_time * 1000:.1f}ms (ranked), '
+                  f'icontains {scan_time * 1000:.1f}ms (unranked)')
+
+
+class RatingAggregateTests(TestCase):
+    def setUp(self):
+        self.tool, self.other = create_tools(2, with_children=False)
+
+    def review(self, rating, approved=True, tool=None):
+        return Review.objects.create(tool=tool or self.tool, rating=rating, title='t', content='c',
+                                     is_approved=approved)
+
+    def assertAggregates(self, tool, count, total, histogram):
+        tool.refresh_from_db()
+        self.assertEqual((tool.rating_count, tool.rating_sum), (count, total))
+        self.assertAlmostEqual(tool.rating_average, total / count if count else 0)
+        self.assertEqual(tool.rating_histogram, {r: histogram.get(r, 0) for r in range(1, 6)})
+
+    def test_create_update_and_delete_are_applied_incrementally(self):
+        first = self.review(5)
+        self.review(3)
+        self.review(1, approved=False)
+        self.assertAggregates(self.tool, 2, 8, {5: 1, 3: 1})
+
+        first.rating = 4
+        first.save()
+        self.assertAggregates(self.tool, 2, 7, {4: 1, 3: 1})
+
+        first.tool = self.other
+        first.save()
+        self.assertAggregates(self.tool, 1, 3, {3: 1})
+        self.assertAggregates(self.other, 1, 4, {4: 1})
+
+        first.delete()
+        self.assertAggregates(self.other, 0, 0, {})
+
+    def test_admin_bulk_actions_refresh_aggregates(self):
+        pending = [self.review(2, approved=False), self.review(4, approved=False)]
+        admin = ReviewAdmin(Review, AdminSite())
+        admin.approve_reviews(None, Review.objects.filter(pk__in=[r.pk for r in pending]))
+        self.assertAggregates(self.tool, 2, 6, {2: 1, 4: 1})
+        admin.disapprove_reviews(None, Review.objects.filter(pk=pending[0].pk))
+        self.assertAggregates(self.tool, 1, 4, {4: 1})
+        self.assertFalse(Job.objects.exists())
+
+        # Large selections are recounted in the background, as one batch.
+        with patch('app.admin.INLINE_RATING_RECOMPUTE_LIMIT', 0):
+            admin.approve_reviews(None, Review.objects.filter(pk=pending[0].pk))
+            admin.disapprove_reviews(None, Review.objects.filter(pk=pending[1].pk))
+        self.assertAggregates(self.tool, 1, 4, {4: 1})
+        self.assertEqual(queue.run_pending(), 2)
+        self.assertAggregates(self.tool, 1, 2, {2: 1})
+
+    def test_reconcile_reports_and_fixes_drift(self):
+        self.review(5)
+        comparison = Comparison.objects.create(title='A vs B', slug='a-vs-b', content='x')
+        comparison.tools.add(self.tool)
+        Review.objects.filter(tool=self.tool).update(rating=1)
+        out = StringIO()
+        call_command('reconcile_ratings', '--dry-run', stdout=out)
+        self.assertIn('Found drift on 1 tools', out.getvalue())
+        self.assertAggregates(self.tool, 1, 5, {5: 1})
+        detail_url = reverse('aitool-detail', args=[self.tool.pk])
+        self.assertEqual(self.client.get(detail_url).data['rating_average'], 5)
+        compared_at = Comparison.objects.get().updated_at
+        with self.assertNumQueries(3):  # one grouped read, one bulk update, one comparison touch
+            drifted = ratings.recompute()
+        self.assertEqual([tool_id for tool_id, _, _ in drifted], [self.tool.pk])
+        self.assertAggregates(self.tool, 1, 1, {1: 1})
+        self.assertEqual(self.client.get(detail_url).data['rating_average'], 1)
+        self.assertGreater(Comparison.objects.get().updated_at, compared_at)
+        self.assertEqual(ratings.recompute(), [])
+
+    def test_api_sorts_and_filters_on_aggregates(self):
+        self.review(2)
+        self.review(5, tool=self.other)
+        self.review(4, tool=self.other)
+        response = self.client.get(reverse('aitool-list'), {'ordering': '-rating_average'})
+        self.assertEqual([t['id'] for t in response.data['results']], [self.other.pk, self.tool.pk])
+        response = self.client.get(reverse('aitool-list'), {'min_rating': '3', 'min_reviews': '2'})
+        self.assertEqual([t['id'] for t in response.data['results']], [self.other.pk])
+        detail = self.client.get(reverse('aitool-detail', args=[self.other.pk])).data
+        self.assertEqual(detail['rating_histogram'], {'1': 0, '2': 0, '3': 0, '4': 1, '5': 1})
+        self.assertEqual(self.client.get(reverse('aitool-list'), {'min_rating': 'x'}).status_code, 400)
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.tool = create_tools(3)[0]
+        self.detail_url = reverse('aitool-detail', args=[self.tool.pk])
+
+    def assertNotModified(self, url, etag, queries=1):
+        with self.assertNumQueries(queries):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_unchanged_detail_and_list_return_304_without_serializing(self):
+        for url in (self.detail_url, reverse('aitool-list')):
+            response = self.client.get(url)
+            self.assertTrue(response['ETag'].startswith('W/'))
+            self.assertIn('Last-Modified', response)
+            self.assertNotModified(url, response['ETag'])
+
+    def test_if_modified_since(self):
+        response = self.client.get(self.detail_url)
+        response = self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_child_changes_invalidate_parent_validators(self):
+        changes = [
+            lambda: Feature.objects.create(tool=self.tool, name='New feature'),
+            lambda: ToolImage.objects.create(tool=self.tool, image='tool_images/b.png'),
+            lambda: self.tool.features.first().delete(),
+            lambda: Review.objects.create(tool=self.tool, rating=3, title='t', content='c'),
+            lambda: self.tool.categories.clear(),
+            lambda: Category.objects.first().aitool_set.add(self.tool),
+        ]
+        for change in changes:
+            etag = self.client.get(self.detail_url)['ETag']
+            list_etag = self.client.get(reverse('aitool-list'))['ETag']
+            time.sleep(0.001)
+            change()
+            self.assertNotEqual(self.client.get(self.detail_url)['ETag'], etag)
+            self.assertNotEqual(self.client.get(reverse('aitool-list'))['ETag'], list_etag)
+
+    def test_child_deletes_touch_each_parent_once(self):
+        other = AITool.objects.exclude(pk=self.tool.pk).first()
+        Feature.objects.bulk_create([Feature(tool=tool, name='Extra') for tool in (self.tool, other) * 5])
+        before = dict(AITool.objects.values_list('pk', 'updated_at'))
+        with CaptureQueriesContext(connection) as queries:
+            Feature.objects.filter(tool__in=[self.tool, other]).delete()
+        touches = [query for query in queries if query['sql'].startswith('UPDATE "app_aitool"')]
+        self.assertEqual(len(touches), 1)
+        after = dict(AITool.objects.values_list('pk', 'updated_at'))
+        self.assertGreater(after[self.tool.pk], before[self.tool.pk])
+        self.assertGreater(after[other.pk], before[other.pk])
+
+    def test_deleting_a_tool_skips_its_childrens_upkeep(self):
+        def delete_queries(tool):
+            with CaptureQueriesContext(connection) as queries:
+                tool.delete()
+            return len(queries)
+
+        few = delete_queries(self.tool)
+        crowded = AITool.objects.exclude(pk=self.tool.pk).first()
+        Feature.objects.bulk_create([Feature(tool=crowded, name='Extra') for _ in range(20)])
+        Review.objects.bulk_create([
+            Review(tool=crowded, rating=4, title='t', content='c', is_approved=True) for _ in range(20)
+        ])
+        self.assertEqual(delete_queries(crowded), few)
+
+    def test_view_counts_change_validators(self):
+        etag = self.client.get(self.detail_url)['ETag']
+        AITool.objects.filter(pk=self.tool.pk).update(views=10)
+        self.assertNotEqual(self.client.get(self.detail_url)['ETag'], etag)
+
+    def test_comparison_follows_nested_tool_changes(self):
+        comparison = Comparison.objects.create(title='A vs B', slug='a-vs-b', content='x')
+        comparison.tools.add(self.tool)
+        url = reverse('comparison-detail', args=[comparison.pk])
+        etag = self.client.get(url)['ETag']
+        time.sleep(0.001)
+        Feature.objects.create(tool=self.tool, name='Another')
+        self.assertNotEqual(self.client.get(url)['ETag'], etag)
+
+    def test_validators_depend_on_query_string(self):
+        first = self.client.get(reverse('aitool-list'))
+        second = self.client.get(reverse('aitool-list'), {'page_size': 1})
+        self.assertNotEqual(first['ETag'], second['ETag'])
+
+
+class CategoryToolsTests(TestCase):
+    def setUp(self):
+        self.tools = create_tools(9, with_children=False)
+        self.category = Category.objects.get(slug='category-0')
+        self.url = reverse('category-tools', args=['category-0'])
+
+    def test_lists_tools_by_slug_with_filters(self):
+        expected = [t.pk for t in AITool.objects.filter(categories=self.category)]
+        response = self.client.get(self.url)
+        self.assertEqual([t['id'] for t in response.data['results']], expected)
+        self.assertEqual(self.client.get(reverse('category-tools', args=[self.category.pk])).data,
+                         response.data)
+
+        AITool.objects.filter(pk=expected[0]).update(pricing_type='paid', is_verified=False)
+        response = self.client.get(self.url, {'pricing_type': 'paid', 'is_verified': 'false'})
+        self.assertEqual([t['id'] for t in response.data['results']], [expected[0]])
+        response = self.client.get(self.url, {'featured': 'true'})
+        self.assertTrue(all(t['featured'] for t in response.data['results']))
+        self.assertEqual(self.client.get(self.url, {'pricing_type': 'bogus'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('category-tools', args=['missing'])).status_code, 404)
+
+    def test_large_categories_page_through_the_ordering_index(self):
+        with patch('app.categories.PROBE_THRESHOLD', 1):
+            response = self.client.get(self.url, {'page_size': 2})
+            self.assertEqual(
+                [t['id'] for t in response.data['results']],
+                [t.pk for t in AITool.objects.filter(categories=self.category)[:2]],
+            )
+            response = self.client.get(response.data['next'])
+            self.assertEqual(len(response.data['results']), 1)
+
+    def test_stored_counts_follow_m2m_changes(self):
+        def counts():
+            return dict(Category.objects.values_list('slug', 'tool_count'))
+
+        self.assertEqual(counts(), {'category-0': 3, 'category-1': 3, 'category-2': 3})
+        tool = self.tools[0]
+        other = Category.objects.get(slug='category-1')
+        tool.categories.add(other)
+        self.assertEqual(counts()['category-1'], 4)
+        tool.categories.clear()
+        self.assertEqual(counts(), {'category-0': 2, 'category-1': 3, 'category-2': 3})
+        other.aitool_set.remove(self.tools[1], tool)
+        self.assertEqual(counts()['category-1'], 2)
+        self.tools[2].delete()
+        self.assertEqual(counts()['category-2'], 2)
+        self.assertEqual(sum(counts().values()), AITool.categories.through.objects.count())
+
+
+class ImportToolsTests(TestCase):
+    def setUp(self):
+        Category.objects.create(name='Chat', slug='chat', icon='x')
+        Category.objects.create(name='Image', slug='image', icon='x')
+        PricingPlan.objects.create(name='Pro Monthly', price='9.99')
+
+    def record(self, i, **extra):
+        return {
+            'name': f'Tool {i}', 'short_description': 'Short', 'long_description': 'Long',
+            'website_url': 'https://example.com', 'pricing_type': 'free',
+            'categories': ['chat'], 'pricing_plans': ['pro-monthly'],
+            'features': ['Fast', {'name': 'Cheap', 'icon': 'fa-coins'}], **extra,
+        }
+
+    def jsonl(self, records):
+        return StringIO(''.join(json.dumps(record) + '\n' for record in records))
+
+    def test_creates_then_upserts_by_slug_in_batches(self):
+        report = importers.import_tools(
+            self.jsonl(self.record(i) for i in range(5)), 'jsonl', batch_size=2
+        )
+        self.assertEqual((report['created'], report['updated'], report['batches']), (5, 0, 3))
+        tool = AITool.objects.get(slug='tool-1')
+        self.assertEqual(list(tool.categories.values_list('slug', flat=True)), ['chat'])
+        self.assertEqual(tool.features.count(), 2)
+        self.assertEqual(Category.objects.get(slug='chat').tool_count, 5)
+        self.assertEqual(search.search('tool')[0]['type'], 'tool')
+
+        report = importers.import_tools(
+            self.jsonl([self.record(1, short_description='New', categories=['image'], features=[])]), 'jsonl'
+        )
+        self.assertEqual((report['created'], report['updated']), (0, 1))
+        tool.refresh_from_db()
+        self.assertEqual(tool.short_description, 'New')
+        self.assertEqual(list(tool.categories.values_list('slug', flat=True)), ['image'])
+        self.assertFalse(tool.features.exists())
+        counts = dict(Category.objects.values_list('slug', 'tool_count'))
+        self.assertEqual(counts, {'chat': 4, 'image': 1})
+        # One similar-tools job per batch, as the per-row signals are skipped.
+        payloads = [job.payload for job in Job.objects.filter(name='app.tasks.update_similar_tools')]
+        self.assertEqual([len(payload['tool_ids']) for payload in payloads], [2, 2, 1, 1])
+
+    def test_imported_images_get_digests_and_variant_jobs(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(self.settings(MEDIA_ROOT=media.name))
+        name = default_storage.save('tool_images/shot.png', png_upload())
+        importers.import_tools(self.jsonl([self.record(0, images=[name, 'tool_images/missing.png'])]), 'jsonl')
+        digests = dict(ToolImage.objects.values_list('image', 'image_digest'))
+        self.assertEqual(len(digests[name]), 64)
+        self.assertEqual(digests['tool_images/missing.png'], '')
+        job = Job.objects.get(name='app.tasks.generate_image_variants')
+        self.assertEqual(job.payload, {'name': name, 'digest': digests[name]})
+
+    def test_upserts_keep_the_fields_a_record_leaves_out(self):
+        importers.import_tools(self.jsonl([self.record(
+            0, featured=True, logo_url='https://example.com/logo.png', launch_date='2024-05-01',
+        )]), 'jsonl')
+        partial = {key: value for key, value in self.record(0, short_description='New').items()
+                   if key not in ('categories', 'pricing_plans', 'features')}
+        report = importers.import_tools(self.jsonl([partial]), 'jsonl')
+        self.assertEqual(report['updated'], 1)
+        tool = AITool.objects.get(slug='tool-0')
+        self.assertEqual(tool.short_description, 'New')
+        self.assertEqual((tool.featured, tool.logo_url, str(tool.launch_date)),
+                         (True, 'https://example.com/logo.png', '2024-05-01'))
+        self.assertEqual(list(tool.categories.values_list('slug', flat=True)), ['chat'])
+        self.assertEqual(tool.features.count(), 2)
+
+        # Included but empty clears.
+        importers.import_tools(self.jsonl([{**partial, 'featured': False, 'launch_date': None}]), 'jsonl')
+        tool.refresh_from_db()
+        self.assertEqual((tool.featured, tool.launch_date), (False, None))
+
+    def test_plan_slugs_shared_by_several_plans_are_errors(self):
+        PricingPlan.objects.create(name='Pro-Monthly', price='19.99')
+        report = importers.import_tools(self.jsonl([self.record(0)]), 'jsonl')
+        self.assertEqual(report['failed'], 1)
+        self.assertIn('pro-monthly', report['errors'][0]['errors'][0])
+
+    def test_integrity_errors_fail_only_their_batch(self):
+        bulk_create = Feature.objects.bulk_create
+        calls = []
+
+        def failing_once(*args, **kwargs):
+            calls.append(1)
+            if len(calls) == 1:
+                raise IntegrityError('UNIQUE constraint failed')
+            return bulk_create(*args, **kwargs)
+
+        with patch.object(Feature.objects, 'bulk_create', failing_once):
+            report = importers.import_tools(self.jsonl(self.record(i) for i in range(3)), 'jsonl', batch_size=2)
+        self.assertEqual((report['created'], report['failed']), (1, 2))
+        self.assertEqual([error['line'] for error in report['errors']], [1, 2])
+        self.assertEqual(list(AITool.objects.values_list('slug', flat=True)), ['tool-2'])
+
+    def test_invalid_records_are_reported_and_skipped(self):
+        stream = StringIO('\n'.join([
+            json.dumps(self.record(0)),
+            '{not json',
+            json.dumps(self.record(1, pricing_type='bogus')),
+            json.dumps(self.record(2, categories=['missing'])),
+        ]))
+        report = importers.import_tools(stream, 'jsonl')
+        self.assertEqual((report['created'], report['failed']), (1, 3))
+        self.assertEqual([error['line'] for error in report['errors']], [2, 3, 4])
+
+    def test_dry_run_rolls_back(self):
+        report = importers.import_tools(self.jsonl([self.record(0)]), 'jsonl', dry_run=True)
+        self.assertEqual(report['created'], 1)
+        self.assertFalse(AITool.objects.exists())
+
+    def test_csv_command(self):
+        stream = StringIO(
+            'name,short_description,long_description,website_url,pricing_type,featured,categories,features\n'
+            'Tool A,Short,Long,https://a.example,paid,true,chat;image,Fast;Cheap\n'
+        )
+        out = StringIO()
+        with patch('sys.stdin', stream):
+            call_command('import_tools', '-', file_format='csv', stdout=out)
+        self.assertIn('Imported 1 tools', out.getvalue())
+        tool = AITool.objects.get(slug='tool-a')
+        self.assertTrue(tool.featured)
+        self.assertEqual(tool.categories.count(), 2)
+        self.assertEqual(tool.features.count(), 2)
+
+    def test_bulk_import_endpoint_requires_staff(self):
+        url = reverse('aitool-bulk-import')
+        upload = lambda: SimpleUploadedFile('tools.jsonl', json.dumps(self.record(0)).encode())
+        self.assertEqual(self.client.post(url, {'file': upload()}).status_code, 403)
+
+        self.client.force_login(User.objects.create_user('admin', is_staff=True))
+        response = self.client.post(url, {'file': upload()})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['created'], 1)
+        self.assertTrue(AITool.objects.filter(slug='tool-0').exists())
+
+
+def png_upload(name='logo.png', size=(200, 100), color=(255, 0, 0, 128)):
+    output = BytesIO()
+    Image.new('RGBA', size, color).save(output, 'PNG')
+    return SimpleUploadedFile(name, output.getvalue(), content_type='image/png')
+
+
+@override_settings(IMAGE_DERIVATIVES={'WIDTHS': (32, 64), 'FORMATS': ('webp', 'jpeg')}, TASKS={'EAGER': True})
+class ImageVariantTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(self.settings(MEDIA_ROOT=media.name))
+        self.tool = create_tools(1, with_children=False)[0]
+
+    def upload_logo(self):
+        self.tool.logo = png_upload()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tool.save()
+        return self.tool.logo_digest
+
+    def test_upload_generates_content_addressed_variants(self):
+        digest = self.upload_logo()
+        self.assertEqual(len(digest), 64)
+        for width in (32, 64):
+            for file_format in ('webp', 'jpeg'):
+                path = images.variant_path(digest, width, file_format)
+                with default_storage.open(path) as file:
+                    self.assertEqual(Image.open(file).size, (width, width // 2))
+
+        item = self.client.get(reverse('aitool-list')).data['results'][0]
+        self.assertEqual(item['logo_variants']['webp']['64'], images.variant_url(digest, 64))
+        self.assertIn(images.variant_url(digest, 64), AIToolAdmin(AITool, AdminSite()).display_logo(self.tool))
+
+        # The same bytes under another name reuse the address.
+        tool_image = ToolImage(tool=self.tool, image=png_upload('copy.png'))
+        tool_image.save()
+        self.assertEqual(tool_image.image_digest, digest)
+
+    def test_missing_variant_is_generated_on_request(self):
+        digest = self.upload_logo()
+        path = images.variant_path(digest, 32, 'webp')
+        default_storage.delete(path)
+        response = self.client.get(images.variant_url(digest, 32))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertTrue(default_storage.exists(path))
+
+        self.assertEqual(self.client.get(images.variant_url(digest, 33)).status_code, 404)
+        self.assertEqual(self.client.get(images.variant_url('ab' * 32, 32)).status_code, 404)
+
+    def test_backfill_command_digests_existing_files(self):
+        name = default_storage.save('tool_logos/old.png', png_upload())
+        AITool.objects.filter(pk=self.tool.pk).update(logo=name)
+        other = create_tools(1, start=1, with_children=False)[0]
+        ToolImage.objects.bulk_create([ToolImage(tool=other, image=name)])
+        before = dict(AITool.objects.values_list('pk', 'updated_at'))
+        call_command('generate_image_variants', stdout=StringIO())
+        self.tool.refresh_from_db()
+        self.assertTrue(default_storage.exists(images.variant_path(self.tool.logo_digest, 64, 'jpeg')))
+        self.assertEqual(ToolImage.objects.get(tool=other).image_digest, self.tool.logo_digest)
+        # The new variant URLs change the tools' representations and ETags.
+        after = dict(AITool.objects.values_list('pk', 'updated_at'))
+        self.assertGreater(after[self.tool.pk], before[self.tool.pk])
+        self.assertGreater(after[other.pk], before[other.pk])
+
+
+flaky_calls = []
+
+
+@queue.task(name='tests.flaky', max_attempts=2, backoff=10)
+def flaky(value):
+    flaky_calls.append(value)
+    raise ValueError(value)
+
+
+class TaskQueueTests(TestCase):
+    def setUp(self):
+        self.categories = [Category.objects.create(name=f'C{i}', slug=f'c{i}') for i in range(3)]
+        flaky_calls.clear()
+
+    def test_idempotency_key_and_batching(self):
+        first = tasks.refresh_category_counts.enqueue(key='recount', category_ids=[self.categories[0].pk])
+        again = tasks.refresh_category_counts.enqueue(key='recount', category_ids=[0])
+        self.assertEqual(again.pk, first.pk)
+        tasks.refresh_category_counts.enqueue(category_ids=[self.categories[1].pk])
+        Category.objects.update(tool_count=9)
+
+        with patch('app.categories.refresh_tool_counts') as refresh:
+            self.assertEqual(queue.run_pending(), 2)
+        refresh.assert_called_once_with({self.categories[0].pk, self.categories[1].pk})
+        self.assertEqual(Job.objects.filter(status=Job.DONE, attempts=1).count(), 2)
+        self.assertEqual(queue.run_pending(), 0)
+
+    def test_failed_job_backs_off_then_fails(self):
+        job = flaky.enqueue(value=1)
+        with self.assertLogs('app.queue', 'ERROR'):
+            self.assertEqual(queue.run_pending(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.PENDING, 1))
+        self.assertIn('ValueError', job.last_error)
+        self.assertAlmostEqual((job.run_at - timezone.now()).total_seconds(), 10, delta=2)
+        self.assertEqual(queue.run_pending(), 0)  # not due yet
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        with self.assertLogs('app.queue', 'ERROR'):
+            queue.run_pending()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 2))
+        self.assertEqual(flaky_calls, [1, 1])
+
+        JobAdmin(Job, AdminSite()).retry_jobs(None, Job.objects.filter(pk=job.pk))
+        with self.assertLogs('app.queue', 'ERROR'):
+            self.assertEqual(queue.run_pending(), 1)
+
+    def test_expired_lease_is_reclaimed(self):
+        job = tasks.refresh_category_counts.enqueue(category_ids=[])
+        task, jobs = queue.claim('dead-worker')
+        self.assertEqual([j.pk for j in jobs], [job.pk])
+        self.assertEqual(queue.claim(), (None, []))
+        Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(hours=1))
+        task, jobs = queue.claim('live-worker')
+        self.assertEqual([j.pk for j in jobs], [job.pk])
+
+    @override_settings(TASKS={'EAGER': True})
+    def test_eager_mode_runs_on_enqueue(self):
+        Category.objects.update(tool_count=9)
+        tasks.refresh_category_counts.enqueue(category_ids=[self.categories[0].pk])
+        self.assertEqual(Category.objects.get(pk=self.categories[0].pk).tool_count, 0)
+        self.assertEqual(Job.objects.get().status, Job.DONE)
+
+        ContactSubmission.objects.create(name='A', email='a@example.com', subject='Hi', message='Hello')
+        job = Job.objects.get(name='app.tasks.notify_managers_of_submissions')
+        self.assertEqual(job.status, Job.DONE)
+
+
+@override_settings(
+    NEWSLETTER={'BATCH_SIZE': 2, 'CHECKPOINT': 2, 'RATE': 0, 'SITE_URL': 'https://example.com'},
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+)
+class NewsletterTests(TestCase):
+    def setUp(self):
+        self.subscribers = NewsletterSubscriber.objects.bulk_create([
+            NewsletterSubscriber(email=f'reader{i}@example.com', name=f'<Reader {i}>', unsubscribe_token=f't{i}')
+            for i in range(7)
+        ])
+        NewsletterSubscriber.objects.filter(pk__in=[self.subscribers[1].pk, self.subscribers[4].pk]).update(
+            is_active=False,
+        )
+        self.campaign = NewsletterCampaign.objects.create(
+            subject='News for {{ subscriber.name }}',
+            body_text='Hi {{ subscriber.name }}.\nLeave: {{ unsubscribe_url }}',
+            body_html='<p>Hi {{ subscriber.name }}</p><a href="{{ unsubscribe_url }}">Leave</a>',
+        )
+        self.addCleanup(newsletter.close_connection)
+
+    @override_settings(TASKS={'EAGER': True})
+    def test_campaign_is_sent_once_per_active_subscriber(self):
+        admin = NewsletterCampaignAdmin(NewsletterCampaign, AdminSite())
+        with patch('app.newsletter.Template', wraps=newsletter.Template) as template:
+            admin.send_campaigns(None, NewsletterCampaign.objects.all())
+        self.assertEqual(template.call_count, 3)  # subject, text and HTML, once each
+
+        self.assertEqual([m.to for m in mail.outbox], [[f'reader{i}@example.com'] for i in (0, 2, 3, 5, 6)])
+        message = mail.outbox[0]
+        self.assertEqual(message.subject, 'News for <Reader 0>')
+        self.assertEqual(message.body, 'Hi <Reader 0>.\nLeave: https://example.com/newsletter/unsubscribe/t0/')
+        self.assertIn('<p>Hi &lt;Reader 0&gt;</p>', message.alternatives[0][0])
+        self.assertEqual(message.extra_headers['List-Unsubscribe'], '<https://example.com/newsletter/unsubscribe/t0/>')
+
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.status, NewsletterCampaign.SENT)
+        self.assertEqual((self.campaign.recipients, self.campaign.sent_count), (5, 5))
+        self.assertEqual(NewsletterBatch.objects.count(), 3)
+        admin.send_campaigns(None, NewsletterCampaign.objects.all())
+        self.assertEqual(len(mail.outbox), 5)
+
+    def test_interrupted_batch_resumes_after_checkpoint(self):
+        tasks.send_newsletter.enqueue(campaign_id=self.campaign.pk)
+        send = mail.get_connection().__class__.send_messages
+        calls = []
+
+        def flaky_send(connection, messages):
+            calls.append(messages)
+            if len(calls) == 4:
+                raise ConnectionResetError
+            return send(connection, messages)
+
+        with patch('django.core.mail.backends.locmem.EmailBackend.send_messages', flaky_send):
+            with self.assertLogs('app.queue', 'ERROR'):
+                queue.run_pending()
+        self.assertEqual(len(mail.outbox), 4)
+        Job.objects.filter(status=Job.PENDING).update(run_at=timezone.now())
+        queue.run_pending()
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), [f'reader{i}@example.com' for i in (0, 2, 3, 5, 6)])
+        self.assertEqual(NewsletterCampaign.objects.get().status, NewsletterCampaign.SENT)
+
+    def test_unsubscribe_link(self):
+        url = reverse('newsletter_unsubscribe', args=['t0'])
+        self.assertContains(self.client.get(url), 'reader0@example.com')
+        self.assertTrue(NewsletterSubscriber.objects.get(pk=self.subscribers[0].pk).is_active)
+        self.client.post(url)
+        self.assertFalse(NewsletterSubscriber.objects.get(pk=self.subscribers[0].pk).is_active)
+        self.assertEqual(self.client.post(reverse('newsletter_unsubscribe', args=['nope'])).status_code, 404)
+
+    def test_rate_limiter_spaces_sends(self):
+        now, slept = [0.0], []
+
+        def sleep(seconds):
+            slept.append(seconds)
+            now[0] += seconds
+
+        limiter = newsletter.RateLimiter(4, clock=lambda: now[0], sleep=sleep)
+        for _ in range(3):
+            limiter.wait()
+        self.assertEqual(slept, [0.25, 0.25])
+
+
+class SimilarityTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.enterContext(self.settings(SIMILARITY={'PATH': directory.name, 'K': 2}))
+        self.image, self.video, self.writing = [
+            Category.objects.create(name=name, slug=name.lower()) for name in ('Image', 'Video', 'Writing')
+        ]
+        self.tools = {}
+        for slug, pricing, categories, text in (
+            ('painter', 'free', [self.image], 'generate photorealistic images from prompts'),
+            ('sketcher', 'free', [self.image], 'generate sketches and images from prompts'),
+            ('upscaler', 'paid', [self.image], 'upscale low resolution photos'),
+            ('clipper', 'paid', [self.video], 'cut video clips automatically'),
+            ('scribe', 'freemium', [self.writing], 'draft blog posts and emails'),
+        ):
+            tool = AITool.objects.create(
+                name=slug.title(), slug=slug, short_description=text, long_description=text,
+                website_url='https://example.com', pricing_type=pricing,
+            )
+            tool.categories.set(categories)
+            self.tools[slug] = tool
+        Feature.objects.create(tool=self.tools['painter'], name='Prompt library')
+        Feature.objects.create(tool=self.tools['sketcher'], name='Prompt Library')
+
+    def related(self, slug):
+        return list(
+            ToolSimilarity.objects.filter(tool=self.tools[slug]).order_by('-score')
+            .values_list('related__slug', flat=True)
+        )
+
+    def test_rebuild_ranks_similar_tools_first(self):
+        timings = similarity.rebuild()
+        self.assertEqual(timings['tools'], 5)
+        self.assertEqual(self.related('painter'), ['sketcher', 'upscaler'])
+        self.assertEqual(self.related('scribe'), [])
+
+        response = self.client.get(reverse('aitool-related', args=['painter']))
+        self.assertEqual([tool['slug'] for tool in response.data], ['sketcher', 'upscaler'])
+        self.assertGreater(response.data[0]['similarity'], response.data[1]['similarity'])
+        with self.assertNumQueries(3):  # the tool, the neighbours, their categories
+            self.client.get(reverse('aitool-related', args=[self.tools['painter'].pk]), {'limit': 1})
+        self.assertEqual(self.client.get(reverse('aitool-related', args=['nope'])).status_code, 404)
+
+    def test_update_moves_a_changed_tool(self):
+        similarity.rebuild()
+        clipper = self.tools['clipper']
+        clipper.short_description = clipper.long_description = 'generate images and sketches from prompts'
+        clipper.save()
+        clipper.categories.set([self.image])
+        self.assertEqual(similarity.update([clipper.pk]), 1)
+        self.assertEqual(self.related('clipper')[0], 'sketcher')
+        self.assertIn('clipper', self.related('sketcher'))
+        self.assertEqual(len(self.related('sketcher')), 2)
+
+    def version(self, path):
+        with open(os.path.join(path, 'model.json')) as file:
+            return json.load(file)['version']
+
+    def test_overlapping_rebuilds_keep_each_others_files(self):
+        path = settings.SIMILARITY['PATH']
+        similarity.rebuild()
+        first = self.version(path)
+        # A slower rebuild's newer version, not switched to yet.
+        os.makedirs(os.path.join(path, str(int(first) * 10)))
+        similarity.rebuild()
+        versions = sorted(name for name in os.listdir(path) if name.isdigit())
+        self.assertNotIn(first, versions)
+        self.assertEqual(len(versions), 2)
+        self.assertEqual(similarity.update([self.tools['painter'].pk]), 1)
+
+    def test_update_fails_when_the_model_files_are_gone(self):
+        path = settings.SIMILARITY['PATH']
+        self.assertEqual(similarity.update([self.tools['painter'].pk]), 0)
+        similarity.rebuild()
+        shutil.rmtree(os.path.join(path, self.version(path)))
+        # Not "no model yet": the job must fail and be retried.
+        with self.assertRaises(FileNotFoundError):
+            similarity.update([self.tools['painter'].pk])
+
+    def test_signals_queue_updates(self):
+        Job.objects.all().delete()
+        Feature.objects.create(tool=self.tools['scribe'], name='Tone')
+        self.tools['scribe'].categories.add(self.image)
+        self.assertEqual(
+            [job.payload for job in Job.objects.filter(name='app.tasks.update_similar_tools')],
+            [{'tool_ids': [self.tools['scribe'].pk]}] * 2,
+        )
+
+
+class AutocompleteTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.enterContext(self.settings(AUTOCOMPLETE={'PATH': directory.name, 'ASYNC_REBUILD': False}))
+        cache.clear()
+        self.tools = create_tools(6, with_children=False)
+        names = ['Chat GPT', 'ChatBot Pro', 'Image Chat', 'Charts', 'Writer', 'Chat Hidden']
+        for tool, name, views in zip(self.tools, names, [5, 50, 20, 500, 1, 1000]):
+            AITool.objects.filter(pk=tool.pk).update(name=name, views=views)
+        AITool.objects.filter(pk=self.tools[5].pk).update(is_verified=False)
+        Category.objects.filter(slug='category-1').update(name='Chatbots')
+
+    def names(self, response, kind='tools'):
+        return [row['name'] for row in response.data[kind]]
+
+    def test_prefix_ranking(self):
+        autocomplete.rebuild()
+        url = reverse('autocomplete-list')
+        # Featured (Chat GPT, tool 0) first, then by views; words inside
+        # names and slugs match too, unverified tools never.
+        response = self.client.get(url, {'q': 'Cha'})
+        self.assertEqual(self.names(response), ['Chat GPT', 'Charts', 'ChatBot Pro', 'Image Chat'])
+        self.assertEqual(self.names(response, 'categories'), ['Chatbots'])
+        self.assertEqual(self.names(self.client.get(url, {'q': 'chat', 'limit': 2})), ['Chat GPT', 'ChatBot Pro'])
+        self.assertEqual(self.names(self.client.get(url, {'q': 'tool 4'})), ['Writer'])
+        self.assertEqual(self.names(self.client.get(url, {'q': 'chat-g'})), ['Chat GPT'])
+        self.assertEqual(self.client.get(url, {'q': 'zebra'}).data['tools'], [])
+        self.assertEqual(self.client.get(url).status_code, 400)
+        self.assertEqual(self.client.get(url, {'q': 'chat', 'limit': '0'}).status_code, 400)
+
+    def test_matches_a_brute_force_ranking(self):
+        random.seed(7)
+        items = [
+            ({'id': entry}, [''.join(random.choice('ab ') for _ in range(6))], random.randrange(5))
+            for entry in range(300)
+        ]
+        index = autocomplete.PrefixIndex.build(items, 32)
+        for prefix in ('a', 'b', 'ab', 'ba', 'aab', 'bbb'):
+            expected = sorted(
+                (entry for entry, (record, texts, rank) in enumerate(items)
+                 if any(key.startswith(prefix) for key in autocomplete._suffixes(texts[0]))),
+                key=lambda entry: -items[entry][2],
+            )
+            top = [record['id'] for record in index.top(prefix.encode(), 10)]
+            self.assertEqual([items[entry][2] for entry in top], [items[entry][2] for entry in expected[:10]])
+            self.assertEqual(len(set(top)), len(top))
+
+    def test_processes_switch_to_a_rebuilt_snapshot(self):
+        url = reverse('autocomplete-list')
+        # The first request builds the missing index.
+        self.assertEqual(self.names(self.client.get(url, {'q': 'writer'})), ['Writer'])
+        with self.assertNumQueries(0):
+            self.client.get(url, {'q': 'writer'})
+        AITool.objects.create(
+            name='Writer Deluxe', slug='writer-deluxe', short_description='s', long_description='l',
+            website_url='https://example.com', pricing_type='free', is_verified=True, featured=True,
+        )
+        self.assertEqual(self.names(self.client.get(url, {'q': 'writer'})), ['Writer Deluxe', 'Writer'])
+        # Another process sees the new snapshot without rebuilding.
+        autocomplete._current = (None, None, None)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.names(self.client.get(url, {'q': 'writer'})), ['Writer Deluxe', 'Writer'])
+
+    def version(self, path):
+        with open(os.path.join(path, 'index.json')) as file:
+            return json.load(file)['version']
+
+    def test_overlapping_rebuilds_keep_each_others_files(self):
+        path = settings.AUTOCOMPLETE['PATH']
+        autocomplete.rebuild()
+        first = self.version(path)
+        # A slower rebuild's newer version, not switched to yet.
+        os.makedirs(os.path.join(path, str(int(first) * 10)))
+        autocomplete.rebuild()
+        versions = sorted(name for name in os.listdir(path) if name.isdigit())
+        self.assertNotIn(first, versions)
+        self.assertEqual(len(versions), 2)
+
+    def test_rebuilds_when_the_snapshot_files_are_gone(self):
+        path = settings.AUTOCOMPLETE['PATH']
+        autocomplete.rebuild()
+        version = self.version(path)
+        shutil.rmtree(os.path.join(path, version))
+        autocomplete._current = (None, None, None)
+        self.assertEqual(self.names(self.client.get(reverse('autocomplete-list'), {'q': 'writer'})), ['Writer'])
+        self.assertIsNone(cache.get(autocomplete.REBUILD_LOCK_KEY))
+
+
+@override_settings(FACETS={'REBUILD_INTERVAL': 0})
+class FacetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.tools = create_tools(9, with_children=False)
+        AITool.objects.filter(pk__in=[tool.pk for tool in self.tools[:3]]).update(pricing_type='paid')
+        for index, tool in enumerate(self.tools[:6]):
+            AITool.objects.filter(pk=tool.pk).update(launch_date=f'{2023 + index % 2}-06-01')
+        free = PricingPlan.objects.create(name='Free', is_free=True)
+        AITool.pricing_plans.through.objects.create(aitool=self.tools[0], pricingplan=free)
+
+    def test_counts_match_database_filters(self):
+        index = facets.Index.build()
+        for selection in (
+            {},
+            {'category': {'category-0', 'category-1'}},
+            {'pricing_type': {'free'}, 'price_band': {'free'}},
+            {'launch_year': {2023}, 'featured': {True}, 'category': {'category-0'}},
+        ):
+            total, counts = index.counts(selection)
+            self.assertEqual(total, facets.filter_queryset(AITool.objects.all(), selection).count())
+            for facet, rows in counts.items():
+                for row in rows:
+                    query = {**selection, facet: {row['value']}}
+                    self.assertEqual(
+                        row['count'], facets.filter_queryset(AITool.objects.all(), query).count(), (facet, row),
+                    )
+
+    def test_browse(self):
+        url = reverse('aitool-browse')
+        response = self.client.get(url, {'category': 'category-0,category-1', 'pricing_type': 'free'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 4)
+        self.assertEqual(
+            {tool['slug'] for tool in response.data['results']}, {'tool-3', 'tool-4', 'tool-6', 'tool-7'},
+        )
+        # A facet is counted without its own selection.
+        self.assertEqual(
+            [(row['value'], row['count']) for row in response.data['facets']['category']],
+            [('category-0', 2), ('category-1', 2), ('category-2', 2)],
+        )
+        self.assertEqual(
+            [(row['value'], row['count']) for row in response.data['facets']['pricing_type']],
+            [('free', 4), ('paid', 2)],
+        )
+        self.assertEqual(
+            [(row['value'], row['count']) for row in response.data['facets']['price_band']], [('under-10', 4)],
+        )
+        self.assertEqual(
+            [(row['value'], row['count']) for row in response.data['facets']['launch_year']],
+            [(2024, 1), (2023, 1)],
+        )
+
+        # With the index built, the counts cost no queries: the page and
+        # its categories only.
+        with self.assertNumQueries(2):
+            self.client.get(url, {'price_band': 'free,under-10', 'launch_year': '2023'})
+
+        self.assertEqual(self.client.get(url, {'price_band': 'cheap'}).status_code, 400)
+
+    def test_changes_rebuild_the_index(self):
+        url = reverse('aitool-browse')
+        self.assertEqual(self.client.get(url, {'category': 'category-2'}).data['count'], 3)
+        self.tools[0].categories.add(Category.objects.get(slug='category-2'))
+        self.assertEqual(self.client.get(url, {'category': 'category-2'}).data['count'], 4)
+
+
+class ComparisonMatrixTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.tools = create_tools(6, with_children=False)
+        self.free = PricingPlan.objects.create(name='Free', price='0', is_free=True)
+        for index, tool in enumerate(self.tools):
+            Feature.objects.create(tool=tool, name='Text to image' if index % 2 else 'Text-to-Image ')
+            if index == 0:
+                Feature.objects.create(tool=tool, name='API')
+                tool.pricing_plans.add(self.free)
+        self.comparison = Comparison.objects.create(title='Image tools', slug='image-tools', content='...')
+        self.comparison.tools.set(self.tools[:3])
+
+    def test_matrix_grid(self):
+        AITool.objects.filter(pk=self.tools[0].pk).update(rating_count=1, rating_average=5, rating_5_count=1)
+        data = self.client.get(reverse('comparison-matrix', args=['image-tools'])).data
+        self.assertEqual(data['comparison']['slug'], 'image-tools')
+        self.assertEqual([tool['id'] for tool in data['tools']], [tool.pk for tool in self.tools[:3]])
+        self.assertEqual(data['tools'][0]['rating_histogram'], {'1': 0, '2': 0, '3': 0, '4': 0, '5': 1})
+        self.assertEqual(data['features'], [
+            {'name': 'Text-to-Image', 'tools': [True, True, True]},
+            {'name': 'API', 'tools': [True, False, False]},
+        ])
+        self.assertEqual(
+            [(plan['name'], plan['tools']) for plan in data['pricing_plans']],
+            [('Free', [True, False, False]), ('Pro', [True, True, True])],
+        )
+
+    def test_query_count_is_constant_and_cached(self):
+        url = reverse('comparison-adhoc-matrix')
+        small = ','.join(tool.slug for tool in self.tools[:2])
+        large = ','.join(str(tool.pk) for tool in self.tools)
+        for tools in (small, large):
+            with self.assertNumQueries(4):
+                response = self.client.get(url, {'tools': tools})
+            with self.assertNumQueries(1):
+                self.assertEqual(self.client.get(url, {'tools': tools}).data, response.data)
+        self.assertEqual(len(response.data['tools']), 6)
+
+        # A new feature touches the tool, which changes the cache key.
+        Feature.objects.create(tool=self.tools[1], name='Upscaling')
+        with self.assertNumQueries(4):
+            response = self.client.get(url, {'tools': small})
+        self.assertIn('Upscaling', [row['name'] for row in response.data['features']])
+
+    def test_adhoc_matrix_validation(self):
+        url = reverse('comparison-adhoc-matrix')
+        self.assertEqual(self.client.get(url, {'tools': 'tool-0'}).status_code, 400)
+        response = self.client.get(url, {'tools': 'tool-0,missing'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('missing', response.data['tools'])
+
+
+class ExportToolsTests(TestCase):
+    def setUp(self):
+        self.tools = create_tools(5)
+        self.url = reverse('aitool-export')
+
+    def lines(self, response):
+        return b''.join(response.streaming_content).decode().splitlines()
+
+    def test_jsonl_export_streams_every_tool_with_related_data(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        records = [json.loads(line) for line in self.lines(response)]
+        self.assertEqual([record['slug'] for record in records], [tool.slug for tool in self.tools])
+        first = records[0]
+        self.assertEqual(first['categories'], list(self.tools[0].categories.values_list('slug', flat=True)))
+        self.assertEqual(first['pricing_plans'], ['pro'])
+        self.assertEqual(len(first['features']), self.tools[0].features.count())
+        self.assertIn('rating_average', first)
+
+    async def test_export_streams_chunk_by_chunk_under_asgi(self):
+        produced = []
+        export_tools = exporters.export_tools
+
+        def counted(*args, **kwargs):
+            for chunk in export_tools(*args, **kwargs):
+                produced.append(chunk)
+                yield chunk
+
+        with patch('app.exporters.BUFFER_SIZE', 1), patch('app.exporters.export_tools', counted):
+            response = await self.async_client.get(self.url)
+            self.assertTrue(response.is_async)
+            first = await anext(response.streaming_content)
+            self.assertEqual(produced, [first])
+            rest = [chunk async for chunk in response.streaming_content]
+        self.assertEqual(len(rest), len(self.tools) - 1)
+        self.assertEqual(b''.join([first, *rest]), b''.join(produced))
+
+    def test_queries_grow_per_chunk_not_per_tool(self):
+        # One query for the rows, then one per prefetched relation per chunk.
+        with self.assertNumQueries(1 + 4 * 3):
+            list(exporters.export_records(chunk_size=2))
+
+    def test_since_csv_and_gzip(self):
+        AITool.objects.filter(pk=self.tools[0].pk).update(updated_at='2000-01-01T00:00:00Z')
+        AITool.objects.exclude(pk=self.tools[0].pk).update(updated_at='2030-01-01T00:00:00Z')
+        response = self.client.get(self.url, {'since': '2020-01-01', 'file_format': 'csv', 'gzip': 'true'})
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        rows = gzip.decompress(b''.join(response.streaming_content)).decode().splitlines()
+        self.assertEqual(rows[0].split(',')[:3], ['id', 'name', 'slug'])
+        self.assertEqual(len(rows), 1 + 4)
+        self.assertEqual(self.client.get(self.url, {'since': 'yesterday'}).status_code, 400)
+
+    def test_command_output_round_trips_through_import(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'tools.jsonl')
+            call_command('export_tools', path, stdout=StringIO())
+            AITool.objects.all().delete()
+            call_command('import_tools', path, stdout=StringIO())
+        self.assertEqual(AITool.objects.count(), 5)
+        self.assertEqual(AITool.categories.through.objects.count(), 5)
+
+
+class BenchmarkSuiteTests(TestCase):
+    def seeded(self):
+        with transaction.atomic():
+            counts = bench_seed.seed(tools=20, seed=1)
+            rows = list(AITool.objects.order_by('slug').values_list(
+                'slug', 'name', 'pricing_type', 'rating_count', 'rating_average'
+            ))
+            transaction.set_rollback(True)
+        return counts, rows
+
+    def test_seeder_is_deterministic(self):
+        counts, rows = self.seeded()
+        self.assertEqual(counts['app.AITool'], 20)
+        self.assertEqual(counts['app.Feature'], 20 * bench_seed.RATIOS['features'])
+        self.assertEqual(self.seeded(), (counts, rows))
+
+    def test_runner_measures_scenarios(self):
+        bench_seed.seed(tools=10)
+        results = bench_runner.run(iterations=2, warmup=0, only='api:aitool-*')
+        self.assertEqual(set(results), {'api:aitool-list', 'api:aitool-detail'})
+        self.assertEqual(results['api:aitool-list']['status'], 200)
+        # Validators and the page; the cards come from cached representations.
+        self.assertEqual(results['api:aitool-list']['queries'], 2)
+        self.assertGreater(results['api:aitool-detail']['peak_kb'], 0)
+
+    def test_serialization_throughput(self):
+        bench_seed.seed(tools=5)
+        results = bench_serialization.run(tools=5, repeat=1)
+        self.assertEqual(set(results), {'serialize list cards', 'render full tools', 'parse full tools'})
+        for result in results.values():
+            self.assertGreater(result['before'], 0)
+            self.assertGreater(result['after'], 0)
+
+    def test_compare_flags_regressions_but_not_uniform_slowdowns(self):
+        def result(p50, queries=1):
+            return {'status': 200, 'p50_ms': p50, 'queries': queries, 'peak_kb': 100}
+
+        baseline = {'a': result(10), 'b': result(10), 'c': result(10)}
+        slower_machine = {'a': result(20), 'b': result(20), 'c': result(20)}
+        self.assertEqual(bench_runner.compare(baseline, slower_machine), [])
+        regressed = {'a': result(10, queries=2), 'b': result(10), 'c': result(30)}
+        self.assertEqual(bench_runner.compare(baseline, regressed), [
+            ('a', 'queries', 1, 2), ('c', 'p50_ms', 10, 30),
+        ])
+
+
+class DatabaseRoutingTests(TestCase):
+    def test_reads_go_to_replica_outside_transactions(self):
+        router = ReadWriteRouter()
+        with patch.object(connections['default'], 'in_atomic_block', False):
+            self.assertEqual(router.db_for_read(AITool), 'replica')
+        with transaction.atomic():
+            self.assertEqual(router.db_for_read(AITool), 'default')
+        self.assertEqual(router.db_for_write(AITool), 'default')
+        self.assertFalse(router.allow_migrate('replica', 'app'))
+
+
+# Not a django TestCase: it must open its own scratch connections.
+class DatabaseStressTests(unittest.TestCase):
+    def test_tuned_config_survives_concurrent_writers(self):
+        result = bench_stress.stress('tuned', threads=4, duration=0.5, tools=20)
+        self.assertGreater(result['by_operation']['contact']['ok'], 0)
+        self.assertEqual(result['locked'], 0)
+        self.assertNotIn('stress-tuned-default', connections.settings)
+
+
+@run_benchmarks
+class CategoryListingBenchmark(TestCase):
+    def test_latency_stays_flat_as_catalog_grows(self):
+        categories = [Category.objects.create(name=f'C{i}', slug=f'c{i}', icon='x') for i in range(20)]
+        through, seeded = AITool.categories.through, 0
+        for total in (1_000, 10_000, 100_000, 500_000):
+            for start in range(seeded, total, 10_000):
+                tools = AITool.objects.bulk_create([
+                    AITool(name=f'Tool {i}', slug=f'tool-{i}', short_description='s', long_description='l',
+                           website_url='https://example.com', pricing_type=('free', 'paid')[i % 2],
+                           is_verified=i % 3 != 0, featured=i % 50 == 0)
+                    for i in range(start, min(start + 10_000, total))
+                ])
+                through.objects.bulk_create([
+                    through(aitool_id=tool.pk, category_id=categories[(tool.pk // 2) % 20].pk) for tool in tools
+                ])
+            seeded = total
+            refresh_tool_counts()
+
+            url = reverse('category-tools', args=['c7'])
+            for params in ({}, {'pricing_type': 'paid'}, {'is_verified': 'true', 'featured': 'false'}):
+                self.client.get(url, params)
+                samples = []
+                for _ in range(20):
+                    started = time.perf_counter()
+                    response = self.client.get(url, params)
+                    samples.append(time.perf_counter() - started)
+                    self.assertEqual(response.status_code, 200)
+                samples.sort()
+                print(f'\n{total:>7} tools {params or "no filter"}: '
+                      f'p50 {samples[10] * 1000:.1f}ms p95 {samples[18] * 1000:.1f}ms')
@@ -1,8 +1,24 @@
+from django.conf import settings
 from django.urls import path,include
 # ai_tool_hub/app/urls.py
 from .router import router
-from .import views
+from .import async_views, images, views
 urlpatterns = [
     path('', views.index, name='index'),
+    path('metrics', views.metrics, name='metrics'),
+    # Same path as the stored file, so a front server can serve existing
+    # variants and pass misses through.
+    path(
+        f'{settings.MEDIA_URL.lstrip("/")}{images.DIRECTORY}/<str:shard>/<str:digest>/<str:variant>',
+        views.image_variant, name='image_variant',
+    ),
+    path(
+        'newsletter/unsubscribe/<str:token>/', views.newsletter_unsubscribe, name='newsletter_unsubscribe',
+    ),
+    path('api/async/ai-tools/', async_views.tool_list, name='async-aitool-list'),
+    path('api/async/ai-tools/<int:pk>/', async_views.tool_detail, name='async-aitool-detail'),
+    path('api/async/categories/', async_views.category_list, name='async-category-list'),
+    path('api/async/homepage/', async_views.homepage_data, name='async-homepage'),
+    path('api/async/search/', async_views.search, name='async-search'),
     path('api/', include(router.urls))
 ] 
\ No newline at end of file
@@ -1,34 +1,61 @@
 # views.py
-from django.shortcuts import render
-from django.db.models import Count
-from .models import Category, AITool, SiteStat, Article
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseForbidden
+from django.shortcuts import get_object_or_404
+from django.utils.html import format_html
+from django.views.decorators.csrf import csrf_exempt
+from django.utils.cache import patch_cache_control
+
+from . import homepage, images, metrics as metrics_registry
+from .models import NewsletterSubscriber
+
 
 def index(request):
-    # Get all categories with tool counts
-    categories = Category.objects.annotate(tool_count=Count('aitool')).order_by('name')
-    
-    # Get featured tools
-    featured_tools = AITool.objects.filter(featured=True).order_by('-created_at')[:6]
-    
-    # Get latest tools
-    latest_tools = AITool.objects.filter(is_verified=True).order_by('-created_at')[:6]
-    
-    # Get site statistics
-    stats = SiteStat.objects.filter(is_active=True)
-    
-    # Get latest articles
-    articles = Article.objects.filter(is_published=True).order_by('-created_at')[:3]
-    
-    # Get all tools for the search functionality
-    all_tools = AITool.objects.filter(is_verified=True).order_by('name')
-    
-    context = {
-        'categories': categories,
-        'featured_tools': featured_tools,
-        'latest_tools': latest_tools,
-        'stats': stats,
-        'articles': articles,
-        'all_tools': all_tools,
-    }
-    
-    return render(request, 'index.html', context)
\ No newline at end of file
+    # Served from the precomputed snapshot; see app/homepage.py
+    snapshot = homepage.get_snapshot()
+    return HttpResponse(snapshot['html'])
+
+
+def metrics(request):
+    # Prometheus scrape target; limited to INTERNAL_IPS and staff users.
+    if request.META.get('REMOTE_ADDR') not in settings.INTERNAL_IPS and not request.user.is_staff:
+        return HttpResponseForbidden()
+    return HttpResponse(
+        metrics_registry.registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
+
+
+def image_variant(request, shard, digest, variant):
+    # Serves a resized image, generating it first if storage does not have
+    # it yet; see app/images.py. Variants never change, so they are cached
+    # for good.
+    parsed = images.parse_variant(shard, digest, variant)
+    if parsed is None:
+        raise Http404
+    width, file_format = parsed
+    path = images.variant_path(digest, width, file_format)
+    if not default_storage.exists(path):
+        name = images.find_source(digest)
+        if name is None:
+            raise Http404
+        images.generate(name, digest, [(width, file_format)])
+    response = FileResponse(default_storage.open(path, 'rb'), content_type=images.CONTENT_TYPES[file_format])
+    patch_cache_control(response, public=True, max_age=365 * 24 * 60 * 60, immutable=True)
+    return response
+
+
+@csrf_exempt
+def newsletter_unsubscribe(request, token):
+    # Linked from every newsletter. Mail clients POST here for one-click
+    # unsubscribes (RFC 8058) without a CSRF token; a plain GET, which
+    # link scanners also send, only shows the confirmation button.
+    subscriber = get_object_or_404(NewsletterSubscriber, unsubscribe_token=token)
+    if request.method == 'POST':
+        NewsletterSubscriber.objects.filter(pk=subscriber.pk).update(is_active=False)
+        return HttpResponse(format_html('<p>{} has been unsubscribed.</p>', subscriber.email))
+    return HttpResponse(format_html(
+        '<form method="post"><p>Unsubscribe {} from the newsletter?</p>'
+        '<button type="submit">Unsubscribe</button></form>',
+        subscriber.email,
+    ))
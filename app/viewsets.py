@@ -1,65 +1,298 @@
 # ai_tools/viewsets.py
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import F
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
 from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.filters import OrderingFilter
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from . import autocomplete, comparisons, exporters, facets, importers, metrics, search
+from .categories import tools_in_category
+from .filters import AIToolFilter
+from .mixins import (
+    CachedRepresentationMixin, ConditionalGetMixin, SerializationMetricsMixin, SlugOrPkLookupMixin,
+    SparseFieldsetMixin,
+)
 from .models import (
     Category, PricingPlan, AITool, ToolImage, ToolVideo, Feature,
     Review, Comparison, Article, NewsletterSubscriber, ContactSubmission,
     ToolSubmission, SiteStat
 )
 from .serializers import (
-    CategorySerializer, PricingPlanSerializer, AIToolSerializer, ToolImageSerializer,
+    CategorySerializer, PricingPlanSerializer, AIToolSerializer, AIToolListSerializer,
+    RelatedToolSerializer, ToolImageSerializer,
     ToolVideoSerializer, FeatureSerializer, ReviewSerializer, ComparisonSerializer,
     ArticleSerializer, NewsletterSubscriberSerializer, ContactSubmissionSerializer,
     ToolSubmissionSerializer, SiteStatSerializer
 )
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(
+    SlugOrPkLookupMixin, ConditionalGetMixin, SparseFieldsetMixin, SerializationMetricsMixin, viewsets.ModelViewSet,
+):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
 
-class PricingPlanViewSet(viewsets.ModelViewSet):
+    @action(detail=True, url_path='tools')
+    def tools(self, request, *args, **kwargs):
+        """Tools in the category, filterable by ``pricing_type``, ``is_verified`` and ``featured``."""
+        category = self.get_object()
+        queryset = tools_in_category(category).prefetch_related(*AIToolViewSet.list_prefetch)
+        queryset = AIToolFilter().filter_queryset(request, queryset, self)
+        page = self.paginate_queryset(queryset)
+        serializer = AIToolListSerializer(page, many=True, context=self.get_serializer_context())
+        return self.get_paginated_response(metrics.serializer_data(serializer, request))
+
+class PricingPlanViewSet(SparseFieldsetMixin, SerializationMetricsMixin, viewsets.ModelViewSet):
     queryset = PricingPlan.objects.all()
     serializer_class = PricingPlanSerializer
 
-class AIToolViewSet(viewsets.ModelViewSet):
+class AIToolViewSet(
+    SlugOrPkLookupMixin, ConditionalGetMixin, CachedRepresentationMixin, SparseFieldsetMixin,
+    SerializationMetricsMixin, viewsets.ModelViewSet,
+):
     queryset = AITool.objects.all()
     serializer_class = AIToolSerializer
+    filter_backends = [AIToolFilter, OrderingFilter]
+    ordering_fields = ['rating_average', 'rating_count', 'views', 'created_at', 'name']
+    validator_extra_fields = ('views',)
+    # The buffered view counter and the rating aggregates are written with
+    # update(); see app/counters.py and app/ratings.py.
+    representation_version_fields = ('updated_at', 'views', 'rating_count', 'rating_sum')
+
+    # Related lookups needed by each action's serializer, so the number of
+    # queries stays fixed regardless of how many tools are returned.
+    list_prefetch = ('categories',)
+    detail_prefetch = ('categories', 'pricing_plans', 'features', 'images', 'videos', 'reviews')
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            return queryset.prefetch_related(*self.list_prefetch)
+        if self.action == 'related':
+            return queryset
+        return queryset.prefetch_related(*self.detail_prefetch)
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return AIToolListSerializer
+        return super().get_serializer_class()
+
+    @action(detail=False, url_path='browse')
+    def browse(self, request):
+        """
+        Tools filtered by ``category`` (slugs), ``pricing_type``,
+        ``price_band``, ``launch_year``, ``is_verified`` and ``featured``
+        (comma-separated values of one facet match any of them), with the
+        total and per-facet counts from the index in app/facets.py.
+        """
+        selection = facets.parse_selection(request.query_params)
+        queryset = facets.filter_queryset(AITool.objects.prefetch_related(*self.list_prefetch), selection)
+        page = self.paginate_queryset(queryset)
+        serializer = AIToolListSerializer(page, many=True, context=self.get_serializer_context())
+        total, counts = facets.get_index().counts(selection)
+        response = self.get_paginated_response(metrics.serializer_data(serializer, request))
+        response.data['count'] = total
+        response.data['facets'] = counts
+        return response
+
+    @action(detail=True, url_path='related')
+    def related(self, request, *args, **kwargs):
+        """
+        The tools most similar to this one (up to ``limit``), best first,
+        from the precomputed index in app/similarity.py.
+        """
+        tool = self.get_object()
+        limit = request.query_params.get('limit', '10')
+        if not limit.isdigit() or int(limit) < 1:
+            raise ValidationError({'limit': 'A positive integer is required.'})
+        tools = (
+            AITool.objects.filter(similar_to__tool=tool)
+            .annotate(similarity=F('similar_to__score'))
+            .order_by('-similarity', 'pk')
+            .prefetch_related(*self.list_prefetch)[:int(limit)]
+        )
+        serializer = RelatedToolSerializer(tools, many=True, context=self.get_serializer_context())
+        return Response(metrics.serializer_data(serializer, request))
+
+    @action(detail=False, methods=['post'], url_path='bulk-import',
+            parser_classes=[MultiPartParser], permission_classes=[IsAdminUser])
+    def bulk_import(self, request):
+        """
+        Upsert tools by slug from an uploaded JSONL or CSV ``file``; see
+        app/importers.py. ``file_format`` overrides the extension and
+        ``dry_run`` validates without keeping any writes.
+        """
+        upload = request.FILES.get('file')
+        if upload is None:
+            raise ValidationError({'file': 'Upload a JSONL or CSV file.'})
+        file_format = request.data.get('file_format') or importers.format_for_filename(upload.name)
+        if file_format not in ('jsonl', 'csv'):
+            raise ValidationError({'file_format': 'Must be "jsonl" or "csv".'})
+        report = importers.import_tools(
+            importers.text_stream(upload), file_format,
+            dry_run=request.data.get('dry_run', '').lower() in ('1', 'true', 'yes'),
+        )
+        return Response(report)
+
+    @action(detail=False, url_path='export')
+    def export(self, request):
+        """
+        Stream the whole catalog (or tools changed since ``since``) as JSONL
+        or CSV (``file_format``), gzip-compressed with ``gzip=true``; see
+        app/exporters.py.
+        """
+        file_format = request.query_params.get('file_format', 'jsonl')
+        if file_format not in exporters.RENDERERS:
+            raise ValidationError({'file_format': 'Must be "jsonl" or "csv".'})
+        since = request.query_params.get('since')
+        if since is not None:
+            since = exporters.parse_since(since)
+            if since is None:
+                raise ValidationError({'since': 'Must be an ISO 8601 date or date and time.'})
+        compress = request.query_params.get('gzip', '').lower() in ('1', 'true', 'yes')
+
+        chunks = exporters.export_tools(file_format, since=since, compress=compress)
+        if isinstance(request._request, ASGIRequest):
+            chunks = exporters.async_chunks(chunks)
+        response = StreamingHttpResponse(
+            chunks,
+            content_type='application/gzip' if compress else exporters.CONTENT_TYPES[file_format],
+        )
+        filename = f"ai-tools.{file_format}{'.gz' if compress else ''}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
 
-class ToolImageViewSet(viewsets.ModelViewSet):
+class ToolImageViewSet(SparseFieldsetMixin, SerializationMetricsMixin, viewsets.ModelViewSet):
     queryset = ToolImage.objects.all()
     serializer_class = ToolImageSerializer
 
-class ToolVideoViewSet(viewsets.ModelViewSet):
+class ToolVideoViewSet(SparseFieldsetMixin, SerializationMetricsMixin, viewsets.ModelViewSet):
     queryset = ToolVideo.objects.all()
     serializer_class = ToolVideoSerializer
 
-class FeatureViewSet(viewsets.ModelViewSet):
+class FeatureViewSet(SparseFieldsetMixin, SerializationMetricsMixin, viewsets.ModelViewSet):
     queryset = Feature.objects.all()
     serializer_class = FeatureSerializer
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ConditionalGetMixin, SparseFieldsetMixin, SerializationMetricsMixin, viewsets.ModelViewSet):
     queryset = Review.objects.all()
     serializer_class = ReviewSerializer
 
-class ComparisonViewSet(viewsets.ModelViewSet):
+class ComparisonViewSet(
+    SlugOrPkLookupMixin, ConditionalGetMixin, SparseFieldsetMixin, SerializationMetricsMixin, viewsets.ModelViewSet,
+):
     queryset = Comparison.objects.all()
     serializer_class = ComparisonSerializer
 
-class ArticleViewSet(viewsets.ModelViewSet):
+    def get_queryset(self):
+        # Each comparison nests its tools' full representation.
+        return super().get_queryset().prefetch_related(
+            'tools', *(f'tools__{lookup}' for lookup in AIToolViewSet.detail_prefetch)
+        )
+
+    @action(detail=True, url_path='matrix', url_name='matrix')
+    def matrix(self, request, *args, **kwargs):
+        """The comparison's tools side by side; see app/comparisons.py."""
+        comparison = get_object_or_404(Comparison.objects.only('pk', 'title', 'slug'), **self.get_lookup_filter())
+        tool_ids = list(
+            Comparison.tools.through.objects.filter(comparison=comparison)
+            .order_by('pk').values_list('aitool_id', flat=True)
+        )
+        data = comparisons.matrix(tool_ids) if tool_ids else comparisons.build([])
+        header = {'id': comparison.pk, 'title': comparison.title, 'slug': comparison.slug}
+        return Response({'comparison': header, **data})
+
+    @action(detail=False, url_path='matrix', url_name='adhoc-matrix')
+    def adhoc_matrix(self, request):
+        """The same matrix for an ad-hoc ``?tools=`` list of tool slugs or ids."""
+        identifiers = [value.strip() for value in request.query_params.get('tools', '').split(',') if value.strip()]
+        max_tools = comparisons.max_tools()
+        if not 2 <= len(identifiers) <= max_tools:
+            raise ValidationError({'tools': f'Give between 2 and {max_tools} comma-separated tool slugs or ids.'})
+        try:
+            data = comparisons.matrix(identifiers)
+        except comparisons.UnknownTools as exc:
+            raise ValidationError({'tools': f"Unknown tools: {', '.join(exc.args[0])}."})
+        return Response({'comparison': None, **data})
+
+class ArticleViewSet(ConditionalGetMixin, SparseFieldsetMixin, SerializationMetricsMixin, viewsets.ModelViewSet):
     queryset = Article.objects.all()
     serializer_class = ArticleSerializer
 
-class NewsletterSubscriberViewSet(viewsets.ModelViewSet):
+class NewsletterSubscriberViewSet(SparseFieldsetMixin, SerializationMetricsMixin, viewsets.ModelViewSet):
     queryset = NewsletterSubscriber.objects.all()
     serializer_class = NewsletterSubscriberSerializer
 
-class ContactSubmissionViewSet(viewsets.ModelViewSet):
+class ContactSubmissionViewSet(SparseFieldsetMixin, SerializationMetricsMixin, viewsets.ModelViewSet):
     queryset = ContactSubmission.objects.all()
     serializer_class = ContactSubmissionSerializer
 
-class ToolSubmissionViewSet(viewsets.ModelViewSet):
+class ToolSubmissionViewSet(SparseFieldsetMixin, SerializationMetricsMixin, viewsets.ModelViewSet):
     queryset = ToolSubmission.objects.all()
     serializer_class = ToolSubmissionSerializer
 
-class SiteStatViewSet(viewsets.ModelViewSet):
+class SiteStatViewSet(SparseFieldsetMixin, SerializationMetricsMixin, viewsets.ModelViewSet):
     queryset = SiteStat.objects.all()
     serializer_class = SiteStatSerializer
+
+class SearchViewSet(viewsets.ViewSet):
+    """Full-text search over tools, articles and comparisons: ``?q=`` and optional ``?type=``."""
+    page_size = 20
+    max_page_size = 100
+
+    def list(self, request):
+        query, kinds, page, page_size = self.search_params()
+        # One extra row tells us whether there is a next page without a COUNT.
+        results = search.search(query, kinds, limit=page_size + 1, offset=(page - 1) * page_size)
+        return Response(self.paginated(results, page, page_size))
+
+    def search_params(self):
+        """Return ``(query, kinds, page, page_size)`` from the query string."""
+        query = self.request.query_params.get('q', '').strip()
+        if not query:
+            raise ValidationError({'q': 'This query parameter is required.'})
+        kinds = self.request.query_params.getlist('type') or None
+        page = self._positive_int('page', 1)
+        page_size = min(self._positive_int('page_size', self.page_size), self.max_page_size)
+        return query, kinds, page, page_size
+
+    def paginated(self, results, page, page_size):
+        url = self.request.build_absolute_uri()
+        return {
+            'next': replace_query_param(url, 'page', page + 1) if len(results) > page_size else None,
+            'previous': (
+                None if page == 1 else
+                remove_query_param(url, 'page') if page == 2 else replace_query_param(url, 'page', page - 1)
+            ),
+            'results': results[:page_size],
+        }
+
+    def _positive_int(self, name, default):
+        try:
+            value = int(self.request.query_params.get(name, default))
+        except ValueError:
+            raise ValidationError({name: 'A positive integer is required.'})
+        if value < 1:
+            raise ValidationError({name: 'A positive integer is required.'})
+        return value
+
+class AutocompleteViewSet(viewsets.ViewSet):
+    """
+    Typeahead: the best-ranked tools and categories starting with ``?q=``,
+    up to ``?limit=`` of each; see app/autocomplete.py.
+    """
+
+    def list(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            raise ValidationError({'q': 'This query parameter is required.'})
+        limit = request.query_params.get('limit', '')
+        if limit and (not limit.isdigit() or int(limit) < 1):
+            raise ValidationError({'limit': 'A positive integer is required.'})
+        return Response({'query': query, **autocomplete.complete(query, int(limit) if limit else None)})
@@ -0,0 +1,26 @@
+# gunicorn.conf.py
+# Production server for ai_tool_hub:
+#   gunicorn ai_tool_hub.wsgi                                   (sync WSGI workers)
+#   gunicorn ai_tool_hub.asgi -k uvicorn.workers.UvicornWorker  (ASGI workers)
+# Every value can be overridden from the environment.
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+
+# The usual 2 x cores + 1: one worker can wait on I/O while another runs.
+# An empty WEB_CONCURRENCY counts as unset.
+workers = int(os.environ.get('WEB_CONCURRENCY') or multiprocessing.cpu_count() * 2 + 1)
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'sync')
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+keepalive = 5
+# Recycle workers now and then so slow leaks cannot build up.
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = max_requests // 10
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+
+raw_env = ['DJANGO_ENV=' + os.environ.get('DJANGO_ENV', 'production')]